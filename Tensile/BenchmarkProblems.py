@@ -19,25 +19,46 @@
 # CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 ################################################################################
 
+import collections
 import os, sys
 from copy import deepcopy
 from copy import copy as shallowcopy
 import shutil
 from shutil import copy as shutil_copy
 import filecmp
-import csv
 from subprocess import Popen
 import time
 from .BenchmarkStructs import BenchmarkProcess
-from .Common import globalParameters, HR, pushWorkingPath, popWorkingPath, print1, print2, printExit, printWarning, ensurePath, startTime, ProgressBar
-from .SolutionStructs import Solution, ProblemType
+from .Common import globalParameters, HR, pushWorkingPath, popWorkingPath, print1, print2, printExit, printWarning, ensurePath, startTime, ProgressBar, ParallelMap
+from .SolutionStructs import Solution, ProblemType, rejectionCounts
 from .SolutionWriter import SolutionWriter
 from .KernelWriterSource import KernelWriterSource
 from .KernelWriterAssembly import KernelWriterAssembly
 from .ClientWriter import writeRunScript, writeClientParameters
 from .TensileCreateLibrary import writeSolutionsAndKernels, writeCMake
+from . import ResultsIO
+from . import Utils
 from . import YAMLIO
 
+################################################################################
+# Enumerate Solutions
+# Constructs the solutions of a chunk of (hardcodedIdx, config) candidates and
+# returns the valid ones along with the rejection counts, since this runs in
+# a worker process.
+################################################################################
+EnumerationChunkSize = 256
+
+def enumerateSolutions(candidates):
+  rejectionCounts.clear()
+  solutions = []
+  for hardcodedIdx, config in candidates:
+    solutionObject = Solution(config)
+    if solutionObject["Valid"]:
+      solutions.append((hardcodedIdx, solutionObject))
+    elif globalParameters["PrintSolutionRejectionReason"]:
+      print1("rejecting solution %s" % str(solutionObject))
+  return solutions, collections.Counter(rejectionCounts)
+
 ################################################################################
 # Benchmark Problem Type
 ################################################################################
@@ -190,15 +211,13 @@ def benchmarkProblemType( problemTypeConfig, problemSizeGroupConfig, \
     # Enumerate Solutions = Hardcoded * Benchmark
     ############################################################################
     print1("# Enumerating Solutions")
-    if globalParameters["PrintLevel"] >= 1:
-      progressBar = ProgressBar(maxPossibleSolutions)
-    solutionSet = set() # avoid duplicates for nlca=-1, 1
+    candidates = []
     for hardcodedIdx in range(0, numHardcoded):
       solutions.append([])
       hardcodedParamDict = benchmarkStep.hardcodedParameters[hardcodedIdx]
       for benchmarkIdx in range(0, len(benchmarkPermutations)):
         benchmarkPermutation = benchmarkPermutations[benchmarkIdx]
-        solution = {"ProblemType": deepcopy(benchmarkProcess.problemType.state)}
+        solution = {"ProblemType": benchmarkProcess.problemType}
         solution.update(benchmarkPermutation)
         solution.update(hardcodedParamDict)
         if benchmarkStepIdx > 0:
@@ -214,16 +233,23 @@ def benchmarkProblemType( problemTypeConfig, problemSizeGroupConfig, \
             solution[initialSolutionParameterName] = \
                 benchmarkStep.initialSolutionParameters[initialSolutionParameterName]
         # TODO check if solution matches problem size for exact tile kernels
-        solutionObject = Solution(solution)
-        if solutionObject["Valid"]:
-          if solutionObject not in solutionSet:
-            solutionSet.add(solutionObject)
-            solutions[hardcodedIdx].append(solutionObject)
-        else:
-          if globalParameters["PrintSolutionRejectionReason"]:
-            print1("rejecting solution %s" % str(solutionObject))
-        if globalParameters["PrintLevel"] >= 1:
-          progressBar.increment()
+        candidates.append((hardcodedIdx, solution))
+
+    # validate candidates in parallel; chunks come back in order, so solutions
+    # are de-duplicated and grouped in the same order as a serial enumeration
+    chunks = [candidates[i:i+EnumerationChunkSize] \
+        for i in range(0, len(candidates), EnumerationChunkSize)]
+    parallel = len(chunks) > 1 and not globalParameters["PrintSolutionRejectionReason"]
+    results = ParallelMap(enumerateSolutions, chunks, "Enumerating solutions", enable=parallel)
+
+    rejectionCounts.clear()
+    solutionSet = set() # avoid duplicates for nlca=-1, 1
+    for chunkSolutions, chunkRejectionCounts in results:
+      rejectionCounts.update(chunkRejectionCounts)
+      for hardcodedIdx, solutionObject in chunkSolutions:
+        if solutionObject not in solutionSet:
+          solutionSet.add(solutionObject)
+          solutions[hardcodedIdx].append(solutionObject)
 
     # remove hardcoded that don't have any valid benchmarks
     removeHardcoded = []
@@ -253,6 +279,11 @@ def benchmarkProblemType( problemTypeConfig, problemSizeGroupConfig, \
 
     print1("# Actual Solutions: %u / %u\n" % ( len(solutions), \
         maxPossibleSolutions ))
+    if rejectionCounts:
+      print1("# Rejection Reasons:")
+      for reason, count in rejectionCounts.most_common():
+        print1("#   %7u %s" % (count, reason))
+      print1("")
 
 
     # create linear list
@@ -311,6 +342,10 @@ def benchmarkProblemType( problemTypeConfig, problemSizeGroupConfig, \
     solutionsFileName = resultsFileBase + ".yaml"
     if not os.path.exists(resultsFileName) or \
         globalParameters["ForceRedoBenchmarkProblems"]:
+      # client doesn't overwrite the binary results if they are disabled
+      binaryResultsFileName = ResultsIO.binaryFileNameFor(resultsFileName)
+      if os.path.isfile(binaryResultsFileName):
+        os.remove(binaryResultsFileName)
       pushWorkingPath("build")
 
       # write runScript
@@ -360,11 +395,6 @@ def benchmarkProblemType( problemTypeConfig, problemSizeGroupConfig, \
 # Read GFlop/s from file
 ################################################################################
 def getResults(resultsFileName, solutions):
-  try:
-    resultsFile = open(resultsFileName, "r")
-  except IOError:
-    printExit("Can't open \"%s\" to get results" % resultsFileName )
-
   # setup data structures
   numSolutions = 0
   results = []
@@ -376,31 +406,22 @@ def getResults(resultsFileName, solutions):
       numSolutions += 1
 
   # read results in gflops
-  csvFile = csv.reader(resultsFile)
   startIdx = problemSizeIdx + 1
   rowLength = startIdx + numSolutions
-
-  rowIdx = 0
-  for row in csvFile:
-    rowIdx+=1
-    if rowIdx == 1:
-      continue
-    else:
-      if len(row) < rowLength:
-        printWarning("CSV File %s row %u doesn't have %u elements; ignoring remainer of file." \
-            % (resultsFileName, rowIdx, rowLength) )
-        break
-      idx = startIdx
-      for i in range(0, len(solutions)):
-        solutionsForHardcoded = solutions[i]
-        for j in range(0, len(solutionsForHardcoded)):
-          solution = solutionsForHardcoded[j]
-          gflops = float(row[idx])
-          results[i][j].append(gflops)
-          idx += 1
-  if rowIdx < 2:
+  try:
+    table = ResultsIO.readResults(resultsFileName, rowLength)
+  except IOError:
+    printExit("Can't open \"%s\" to get results" % resultsFileName )
+  if len(table) < 1:
     printExit("CSV File %s only has %u row(s); prior benchmark must not have run long enough to produce data." \
-        % (resultsFileName, rowIdx) )
+        % (resultsFileName, len(table)+1) )
+
+  idx = startIdx
+  for i in range(0, len(solutions)):
+    solutionsForHardcoded = solutions[i]
+    for j in range(0, len(solutionsForHardcoded)):
+      results[i][j] = ResultsIO.column(table, idx)
+      idx += 1
   return results
 
 
@@ -415,17 +436,13 @@ def writeBenchmarkFiles(stepBaseDir, solutions, problemSizes, stepName, filesToC
   ##############################################################################
   # Min Naming
   ##############################################################################
-  kernels = []
-  kernelsBetaOnly = []
+  kernels = Utils.OrderedRegistry()
+  kernelsBetaOnly = Utils.OrderedRegistry()
   for solution in solutions:
-    solutionKernels = solution.getKernels()
-    for kernel in solutionKernels:
-      if kernel not in kernels:
-        kernels.append(kernel)
-    solutionKernelsBetaOnly = solution.getKernelsBetaOnly()
-    for kernel in solutionKernelsBetaOnly:
-      if kernel not in kernelsBetaOnly:
-        kernelsBetaOnly.append(kernel)
+    kernels.extend(solution.getKernels())
+    kernelsBetaOnly.extend(solution.getKernelsBetaOnly())
+  kernels = kernels.list()
+  kernelsBetaOnly = kernelsBetaOnly.list()
 
   solutionSerialNaming = Solution.getSerialNaming(solutions)
   kernelSerialNaming = Solution.getSerialNaming(kernels)
@@ -688,7 +705,7 @@ def main( config ):
     for problemSizeGroupIdx in range(0, len(problemSizeGroupConfigs)):
       problemSizeGroupConfig = problemSizeGroupConfigs[problemSizeGroupIdx]
       print2("ProblemTypeConfig: %s" % problemTypeConfig)
-      problemTypeObj = ProblemType(problemTypeConfig)
+      problemTypeObj = ProblemType.FromConfig(problemTypeConfig)
       globalParameters["EnableHalf"] = problemTypeObj["DataType"].isHalf()
 
       # results files will be named
@@ -716,6 +733,12 @@ def main( config ):
         solutionsFileName = "%s.yaml" % (resultsFileBase)
         shutil_copy( resultsFileName, newResultsFileName )
         shutil_copy( solutionsFileName, newSolutionsFileName )
+        binaryResultsFileName = ResultsIO.binaryFileNameFor(resultsFileName)
+        newBinaryResultsFileName = ResultsIO.binaryFileNameFor(newResultsFileName)
+        if os.path.isfile(binaryResultsFileName):
+          shutil_copy( binaryResultsFileName, newBinaryResultsFileName )
+        elif os.path.isfile(newBinaryResultsFileName):
+          os.remove(newBinaryResultsFileName)
       else:
         print1("# %s_%02u already benchmarked; skipping." % (str(problemTypeObj), problemSizeGroupIdx) )
 
@@ -43,7 +43,7 @@ class BenchmarkProcess:
     #else:
     #  problemTypeConfig = {}
     #  print2("No ProblemType in config: %s; using defaults." % str(config) )
-    self.problemType = ProblemType(problemTypeConfig)
+    self.problemType = ProblemType.FromConfig(problemTypeConfig)
     self.isBatched = True \
         if "Batched" in problemTypeConfig and problemTypeConfig["Batched"] \
         else False
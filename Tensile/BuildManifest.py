@@ -0,0 +1,184 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from . import __version__
+from . import Common
+from . import Utils
+from . import YAMLIO
+from .Common import globalParameters, print1
+from .Utils import fileDigest
+
+import hashlib
+import json
+import os
+import pickle
+
+################################################################################
+# Build Manifest
+# Records what an incremental TensileCreateLibrary run produced, so that the
+# next run into the same output directory can skip unchanged work:
+#
+#   logicFiles:  key of each logic file, a hash of its contents, the Tensile
+#                version, the sources which parse logic and the
+#                globalParameters read while deriving solution parameters; the
+#                parsed logic is pickled under ManifestDir and reused while the
+#                key matches.
+#   kernels:     KernelCache key of each assembly kernel; kernels whose key is
+#                unchanged and whose .o/.co still exist are not regenerated.
+#   codeObjects: link key of each merged code object, from the keys of the
+#                kernels it contains; unchanged code objects are not relinked.
+#   outputs:     content hash and mtime of every output file.  Files rewritten
+#                with identical content get their previous mtime back so that
+#                downstream builds don't consider them modified.
+################################################################################
+class BuildManifest:
+
+  FileName = "TensileManifest.json"
+  ManifestDir = ".TensileManifest"
+
+  # what parsed logic depends on besides the logic file
+  LogicSources = ["Common.py", "Contractions.py", "DataType.py", "Hardware.py", "Properties.py",
+                  "SolutionLibrary.py", "SolutionStructs.py", "YAMLIO.py"]
+  LogicParameters = ["ArchCaps", "CurrentISA", "DeviceLDS", "IndexChars", "MaxDepthU", "MaxLDS",
+                     "WavefrontWidth"]
+
+  _logicSourcesDigest = None
+
+  def __init__(self, outputPath):
+    self.outputPath = os.path.abspath(outputPath)
+    self.manifestFile = os.path.join(self.outputPath, self.FileName)
+    self.manifestDir = Common.ensurePath(os.path.join(self.outputPath, self.ManifestDir))
+
+    self.previous = {"logicFiles": {}, "kernels": {}, "codeObjects": {}, "outputs": {}}
+    try:
+      with open(self.manifestFile) as f:
+        previous = json.load(f)
+      if previous.get("version") == __version__:
+        self.previous = previous
+    except (OSError, ValueError):
+      pass
+
+    self.current = {"version": __version__, "logicFiles": {}, "kernels": {}, "codeObjects": {}, "outputs": {}}
+
+  ##############################################################################
+  # Logic Files
+  ##############################################################################
+  @classmethod
+  def logicKey(cls, logicFile):
+    if cls._logicSourcesDigest is None:
+      sha = hashlib.sha256()
+      for fileName in cls.LogicSources:
+        with open(os.path.join(globalParameters["ScriptPath"], fileName), "rb") as f:
+          sha.update(f.read())
+      cls._logicSourcesDigest = sha.hexdigest()
+    parameters = [globalParameters.get(name) for name in cls.LogicParameters]
+    return Utils.digest(__version__, cls._logicSourcesDigest, parameters, fileDigest(logicFile))
+
+  def logicPicklePath(self, key):
+    return os.path.join(self.manifestDir, key + ".pickle")
+
+  def readLogicFiles(self, logicFiles):
+    """
+    Equivalent to mapping YAMLIO.readLibraryLogicForSchedule over logicFiles,
+    but only parses files whose keys changed since the previous run.
+    """
+    keys = [self.logicKey(logicFile) for logicFile in logicFiles]
+
+    libraries = [None] * len(logicFiles)
+    changed = []
+    for idx, (logicFile, key) in enumerate(zip(logicFiles, keys)):
+      if self.previous["logicFiles"].get(logicFile) == key:
+        try:
+          with open(self.logicPicklePath(key), "rb") as f:
+            libraries[idx] = pickle.load(f)
+          continue
+        except (OSError, pickle.UnpicklingError, EOFError):
+          pass
+      changed.append(idx)
+
+    print1("# Incremental: %u/%u logic files changed" % (len(changed), len(logicFiles)))
+
+    changedLibraries = Common.ParallelMap(YAMLIO.readLibraryLogicForSchedule, \
+        [logicFiles[idx] for idx in changed], "Reading logic files")
+    for idx, library in zip(changed, changedLibraries):
+      libraries[idx] = library
+      with open(self.logicPicklePath(keys[idx]), "wb") as f:
+        pickle.dump(library, f, pickle.HIGHEST_PROTOCOL)
+
+    self.current["logicFiles"] = dict(zip(logicFiles, keys))
+    return libraries
+
+  ##############################################################################
+  # Kernels and Code Objects
+  ##############################################################################
+  def kernelUpToDate(self, kernelName, key, asmDir):
+    """ True if the artifacts of kernelName in asmDir were built from key. """
+    self.current["kernels"][kernelName] = key
+    if self.previous["kernels"].get(kernelName) != key:
+      return False
+    return all([os.path.isfile(os.path.join(asmDir, kernelName + ext)) for ext in [".o", ".co"]])
+
+  def codeObjectUpToDate(self, coFile, key):
+    """ True if coFile was linked from objects with link key key. """
+    relPath = os.path.relpath(coFile, self.outputPath)
+    self.current["codeObjects"][relPath] = key
+    return self.previous["codeObjects"].get(relPath) == key and os.path.isfile(coFile)
+
+  ##############################################################################
+  # Outputs
+  ##############################################################################
+  def restoreUnchangedOutputs(self):
+    """
+    Records every output file and restores the previous mtime of the ones
+    whose contents did not change.
+    """
+    restored = 0
+    for dirPath, dirNames, fileNames in os.walk(self.outputPath):
+      if dirPath == self.outputPath:
+        dirNames[:] = [d for d in dirNames if d != self.ManifestDir]
+      for fileName in fileNames:
+        filePath = os.path.join(dirPath, fileName)
+        relPath = os.path.relpath(filePath, self.outputPath)
+        if relPath == self.FileName:
+          continue
+
+        digest = fileDigest(filePath)
+        mtime = os.stat(filePath).st_mtime
+        previous = self.previous["outputs"].get(relPath)
+        if previous is not None and previous[0] == digest:
+          if previous[1] != mtime:
+            os.utime(filePath, (previous[1], previous[1]))
+            mtime = previous[1]
+          restored += 1
+        self.current["outputs"][relPath] = [digest, mtime]
+
+    print1("# Incremental: %u/%u output files unchanged" % (restored, len(self.current["outputs"])))
+
+  def write(self):
+    # drop parsed logic of files that no longer exist or changed
+    live = set([self.logicPicklePath(k) for k in self.current["logicFiles"].values()])
+    for fileName in os.listdir(self.manifestDir):
+      filePath = os.path.join(self.manifestDir, fileName)
+      if filePath not in live:
+        os.remove(filePath)
+
+    with open(self.manifestFile, "w") as f:
+      json.dump(self.current, f, indent=1, sort_keys=True)
@@ -22,6 +22,8 @@
 from .Common import globalParameters, HR, pushWorkingPath, popWorkingPath, print1, CHeader, printWarning, listToInitializer
 from .SolutionStructs import Solution
 from .SolutionWriter import SolutionWriter
+from . import ResultsIO
+from . import Utils
 from . import YAMLIO
 
 import os
@@ -263,12 +265,10 @@ def writeClientParameters(forBenchmark, solutions, problemSizes, stepName, \
   # Min Naming
   ##############################################################################
   if forBenchmark:
-    kernels = []
+    kernels = Utils.OrderedRegistry()
     for solution in solutions:
-      solutionKernels = solution.getKernels()
-      for kernel in solutionKernels:
-        if kernel not in kernels:
-          kernels.append(kernel)
+      kernels.extend(solution.getKernels())
+    kernels = kernels.list()
 
     solutionSerialNaming = Solution.getSerialNaming(solutions)
     kernelSerialNaming = Solution.getSerialNaming(kernels)
@@ -1132,6 +1132,10 @@ def writeClientParameters(forBenchmark, solutions, problemSizes, stepName, \
         "../Data","%s.csv" % stepName)
     resultsFileName = resultsFileName.replace("\\", "\\\\")
     h += "const char *resultsFileName = \"%s\";\n" % resultsFileName
+    resultsBinaryFileName = ""
+    if globalParameters["BinaryResults"]:
+      resultsBinaryFileName = ResultsIO.binaryFileNameFor(resultsFileName)
+    h += "const char *resultsBinaryFileName = \"%s\";\n" % resultsBinaryFileName
 
   ##############################################################################
   # Write File
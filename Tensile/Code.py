@@ -21,6 +21,7 @@
 
 from __future__ import print_function
 from .Common import globalParameters, printExit, printWarning
+import io
 # Global to print module names around strings
 printModuleNames = 0
 
@@ -29,11 +30,18 @@ Base class for Modules, Instructions, etc
 Item is a atomic collection of or more instructions and commentsA
 """
 class Item:
-  pass
+  __slots__ = ()
 
   def toStr(self):
     return str(self)
 
+  """
+  Write the text of this item to sink, any object with a write(str) method
+  such as a file or io.StringIO.
+  """
+  def write(self, sink):
+    sink.write(str(self))
+
   def countType(self,ttype):
     return int(isinstance(self, ttype))
 
@@ -47,18 +55,33 @@ code (ie which instructions are a related module) so the scheduler can later
 make intelligent and legal transformations.
 """
 class Module(Item):
+  __slots__ = ("name", "itemList", "counts", "parents")
+
   def __init__(self, name=""):
     self.name = name
     self.itemList = []
+    # counts caches countType results by type and is cleared whenever this
+    # module or any of its sub-modules changes.  Modules may be added to more
+    # than one parent so each module tracks all of its parents.
+    self.counts = {}
+    self.parents = []
 
   def __str__(self):
-    s = ""
+    sink = io.StringIO()
+    self.write(sink)
+    return sink.getvalue()
+
+  """
+  Write all items, including those of sub-modules, to sink in a single pass
+  (Overrides Item.write)
+  """
+  def write(self, sink):
     if printModuleNames:
-      s += "// %s { \n" % self.name
-    s += "".join([str(x) for x in self.itemList])
+      sink.write("// %s { \n" % self.name)
+    for x in self.itemList:
+      x.write(sink)
     if printModuleNames:
-      s += "// } %s\n" % self.name
-    return s
+      sink.write("// } %s\n" % self.name)
 
   """
   Add specified item to the list of items in the module.
@@ -72,6 +95,10 @@ class Module(Item):
     #assert (isinstance(item, Item)) # for debug
     if isinstance(item,Item):
       self.itemList.append(item)
+      if isinstance(item, Module):
+        item.parents.append(self)
+      if self.counts:
+        self.invalidateCounts()
     elif isinstance(item,str):
       self.addCode(TextBlock(item))
     else:
@@ -115,28 +142,41 @@ class Module(Item):
           print(indent, "%s: [ %s ]" % \
               (i.__class__.__name__, str(i).strip('\n')))
 
+  """
+  Clear the cached counts of this module and of all modules containing it.
+  A module only has cached counts if all of its sub-modules do, so the walk
+  up stops at the first module without any.
+  """
+  def invalidateCounts(self):
+    stack = [self]
+    while stack:
+      module = stack.pop()
+      if module.counts:
+        module.counts.clear()
+        stack += module.parents
+
   """
   Count number of items with specified type in this Module
   Will recursively count occurrences in submodules
   (Overrides Item.countType)
   """
   def countType(self,ttype):
-    count=0
-    for i in self.itemList:
-      if isinstance(i, Module):
-        count += i.countType(ttype)
-      else:
-        count += int(isinstance(i, ttype))
+    count = self.counts.get(ttype)
+    if count is None:
+      count=0
+      for i in self.itemList:
+        if isinstance(i, Module):
+          count += i.countType(ttype)
+        else:
+          count += int(isinstance(i, ttype))
+      self.counts[ttype] = count
     return count
 
+  """
+  Count number of items, other than Modules, in this Module
+  """
   def count(self):
-    count=0
-    for i in self.itemList:
-      if isinstance(i, Module):
-        count += i.count()
-      else:
-        count += 1
-    return count
+    return self.countType(Item)
 
   """
   Return list of items in the Module
@@ -151,16 +191,41 @@ class Module(Item):
   Items may be TexBlock or Inst
   """
   def flatitems(self):
-    flatitems = []
-    for i in self.itemList:
-      if isinstance(i, Module):
-        flatitems += i.flatitems()
+    return list(self.iterItems())
+
+  """
+  Iterate over the flattened items of the Module without building lists
+  """
+  def iterItems(self):
+    stack = [iter(self.itemList)]
+    while stack:
+      for i in stack[-1]:
+        if isinstance(i, Module):
+          stack.append(iter(i.itemList))
+          break
+        yield i
       else:
-        flatitems.append(i)
-    return flatitems
+        stack.pop()
+
+
+"""
+Write items, which may be Items or strings, to sink separated by newlines.
+Equivalent to sink.write("\\n".join([str(x) for x in items])) without
+building the intermediate strings.
+"""
+def writeLines(sink, items):
+  for i, item in enumerate(items):
+    if i:
+      sink.write("\n")
+    if isinstance(item, Item):
+      item.write(sink)
+    else:
+      sink.write(str(item))
 
 
 class StructuredModule(Module):
+  __slots__ = ("header", "middle", "footer")
+
   def __init__(self, name=None):
     Module.__init__(self,name)
     self.header = Module("header")
@@ -176,6 +241,8 @@ class StructuredModule(Module):
 Label that can be the target of a jump.
 """
 class Label (Item):
+  __slots__ = ("labelNum", "comment")
+
   def __init__(self, labelNum, comment):
     self.labelNum = labelNum
     self.comment = comment
@@ -192,6 +259,8 @@ class Label (Item):
 An unstructured block of text that can contain comments and instructions
 """
 class TextBlock(Item):
+  __slots__ = ("text",)
+
   def __init__(self,text):
     assert(isinstance(text, str))
     self.text = text
@@ -199,12 +268,17 @@ class TextBlock(Item):
   def __str__(self):
     return self.text
 
+  def write(self, sink):
+    sink.write(self.text)
+
 
 """
 Inst is a single instruction and is base class for other instructions.
 Currently just stores text+comment but over time may grow
 """
 class Inst(Item):
+  __slots__ = ("text",)
+
   def __init__(self, *args):
     params = args[0:len(args)-1]
     comment = args[len(args)-1]
@@ -231,6 +305,8 @@ class WaitCnt (Inst):
   If lgkmcnt=vmcnt= -1 then the waitcnt is a nop and 
   an instruction with a comment is returned.
   """
+  __slots__ = ("lgkmcnt", "vmcnt", "comment")
+
   def __init__(self,lgkmcnt=-1,vmcnt=-1,comment=""):
     self.lgkmcnt = lgkmcnt
     self.vmcnt   = vmcnt
@@ -254,16 +330,22 @@ class WaitCnt (Inst):
 
 # uniq type that can be used in Module.countType
 class GlobalReadInst (Inst):
+  __slots__ = ()
+
   def __init__(self,*args):
     Inst.__init__(self,*args)
 
 # uniq type that can be used in Module.countType
 class LocalWriteInst (Inst):
+  __slots__ = ()
+
   def __init__(self,*args):
     Inst.__init__(self,*args)
 
 # uniq type that can be used in Module.countType
 class LocalReadInst (Inst):
+  __slots__ = ()
+
   def __init__(self,*args):
     Inst.__init__(self,*args)
 
@@ -285,6 +367,8 @@ class  MacInst (Inst):
   usage Module.addCode(Code.MacInst())
 
   """
+  __slots__ = ("endLine", "version", "kernel", "aIdx", "bIdx", "PLR", "innerUnroll")
+
   def  __init__(self,kernel,aIdx,bIdx,PLRval,innerUnroll):
        self.endLine = ""
        self.version = globalParameters["CurrentISA"]
@@ -60,6 +60,7 @@ globalParameters["NumBenchmarks"] = 1             # how many benchmark data poin
 globalParameters["SyncsPerBenchmark"] = 1         # how iterations of the stream synchronization for-loop to do per benchmark data point
 globalParameters["EnqueuesPerSync"] = 1           # how many solution enqueues to perform per synchronization
 globalParameters["SleepPercent"] = 300            # how long to sleep after every data point: 25 means 25% of solution time. Sleeping lets gpu cool down more.
+globalParameters["BinaryResults"] = True          # client also writes results as a memory-mappable binary file next to the csv, which is read instead of the csv when present
 # validation
 globalParameters["NumElementsToValidate"] = 128   # number of elements to validate, 128 will be evenly spaced out (with prime number stride) across C tensor
 globalParameters["ValidationMaxToPrint"] = 4      # maximum number of mismatches to print
@@ -71,6 +72,7 @@ globalParameters["ForceRedoLibraryClient"] = True     # if False and library cli
 globalParameters["ShowProgressBar"] = True     # if False and library client already built, then building library client will be skipped when tensile is re-run
 globalParameters["SolutionSelectionAlg"] = 0          # algorithm to detetermine which solutions to keep. 0=removeLeastImportantSolutions, 1=keepWinnerSolutions (faster)
 globalParameters["ExpandRanges"] = True          # expand ranges into exact configs before writing logic file.  False ignores ranges.
+globalParameters["LibraryLogicBackend"] = "Python" # LogicAnalyzer tables: "Python" or "NumPy" (vectorized, falls back to "Python" if numpy is not installed)
 globalParameters["ExitAfterKernelGen"] = False     # Exit after generating kernels
 globalParameters["ShowProgressBar"] = True     # if False and library client already built, then building library client will be skipped when tensile is re-run
 globalParameters["WavefrontWidth"] = 64     # if False and library client already built, then building library client will be skipped when tensile is re-run
@@ -110,6 +112,7 @@ globalParameters["CEqualD"] = True               # Set to true if testing for th
 globalParameters["CMakeCXXFlags"] = ""            # pass flags to cmake
 globalParameters["CMakeCFlags"] = ""              # pass flags to cmake
 globalParameters["DebugKernel"] = False           # assembly only, kernel gets buffer for debug "printing"; kernel writes data to memory, gets coppied to host and printed
+globalParameters["CheckWaitCnt"] = False          # assembly only, prove with Dependency.py that the s_waitcnt of each kernel cover every use of a loaded register, else fail (WaitCntAlg=1) or warn (WaitCntAlg=0); also prints the memory latency hidden in each loop (verbose 2)
 globalParameters["LibraryPrintDebug"] = False     # solutions will print enqueue info when enqueueing a kernel
 
 # Tensor printing controls:
@@ -135,6 +138,11 @@ globalParameters["MaxDepthU"] = 256               # max DepthU value to allow
 globalParameters["ShortNames"] = False            # on windows kernel names can get too long; =True will convert solution/kernel names to serial ids
 globalParameters["MergeFiles"] = True             # F=store every solution and kernel in separate file; T=store all solutions in single file
 globalParameters["BuildCodeObjects"] = False      # Build code object files when creating library.
+globalParameters["KernelCachePath"] = None        # directory for caching assembly kernel build artifacts (.s/.o/.co) across runs; None=disabled
+globalParameters["KernelCacheMaxSize"] = 8192     # kernel cache size cap in MiB; least recently used entries are evicted.  0=unlimited
+globalParameters["LibraryFormat"] = "yaml"        # format of the master solution library file written by TensileCreateLibrary: "yaml", "json" (TensileLibrary.json) or "msgpack" (TensileLibrary.dat next to TensileLibrary.yaml)
+globalParameters["AssembleBatchSize"] = 0         # >0: assemble this many kernels per assembler invocation in a build stage ahead of code object linking; 0=one assembler invocation per kernel
+globalParameters["CodeObjectShards"] = 1          # split each architecture's merged code object into up to this many code objects, linked in parallel
 globalParameters["SupportedISA"] = [(8,0,3), (9,0,0), (9,0,6)]             # assembly kernels writer supports these architectures
 globalParameters["BenchmarkProblemsPath"] = "1_BenchmarkProblems" # subdirectory for benchmarking phases
 globalParameters["BenchmarkDataPath"] = "2_BenchmarkData"         # subdirectory for storing final benchmarking data
@@ -270,7 +278,17 @@ validParameters = {
     # Scheduling algorithm to use for each iteration:
     # 0 = minimal/no scheduling.  Global Read and increments, followed by local reads,
     # followed by local writes, followed by MACs
-    "ScheduleIterAlg":             [0, 1],
+    # 1 = half of the local reads, then global reads and increments, then the rest
+    # of the local reads, local writes and MACs
+    # 2 = list scheduling by the per-ISA latency model in Schedule.py, interleaving
+    # MACs with the local reads when PrefetchLocalRead prefetches the next buffer
+    "ScheduleIterAlg":             [0, 1, 2],
+
+    # How s_waitcnt are placed in assembly kernels:
+    # 0 = each wait computed from the static per-tile counts of the loads it waits for
+    # 1 = waits replaced by the loosest legal waits before each use of a loaded
+    # register, found by dependency tracking over the whole kernel in Dependency.py
+    "WaitCntAlg":                  [0, 1],
 
     # LDD Support
     # Allow LDD and StrideD to != LDC and StrideC for LDD <= LDC and LDD == M
@@ -691,6 +709,7 @@ defaultBenchmarkCommonParameters = [
     {"ScheduleGlobalRead":        [ 1 ] },
     {"ScheduleLocalWrite":        [ 1 ] },
     {"ScheduleIterAlg":           [ 1 ] },
+    {"WaitCntAlg":                [ 0 ] },
 
     {"LdcEqualsLdd":              [ True ] },
     {"InterleaveAlpha":           [ 0 ] },
@@ -274,7 +274,8 @@ class Solution:
                 'sizeMapping',
                 'debugKernel',
                 'info',
-                'index']
+                'index',
+                'codeObject']
     HiddenKeys = ['originalSolution']
 
     @classmethod
@@ -322,6 +323,7 @@ class Solution:
         self.debugKernel = False
         self.info = {}
         self.index = None
+        self.codeObject = ''
 
         for key, value in kwargs:
             if key not in Solution.StateKeys and key not in Solution.HiddenKeys:
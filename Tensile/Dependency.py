@@ -0,0 +1,649 @@
+################################################################################
+# Copyright (C) 2016-2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from . import Code
+from . import Schedule
+
+import re
+
+################################################################################
+# Dependency Tracking
+# Dataflow analysis of the memory counters of an assembly kernel: at each
+# instruction, which loads may still be outstanding on vmcnt and lgkmcnt, how
+# many loads were issued on the same counter since, and which registers they
+# write.  This gives the loosest s_waitcnt legal before each instruction, so
+# that waits can be inserted (Program.insertWaits) or the waits already in the
+# kernel proven sufficient (Program.check).
+#
+# Model:
+#  - global loads and stores, and local reads and writes, complete in order
+#    within their counter, except scalar memory and flat operations on
+#    lgkmcnt, which can only be waited for with lgkmcnt(0).  Other operations
+#    which increment the counters, such as messages, are not tracked: they
+#    only make waits stricter.
+#  - an instruction which reads or writes a register written by an outstanding
+#    load must wait for that load, except a scalar load: the register hasn't
+#    been read since its outstanding load (a read waits for it), and lgkmcnt(0)
+#    before the next read retires both loads.  The kernels only reload the
+#    same value this way.
+#  - local memory operations of a wave execute in order, so a local read after
+#    a local write needs no wait, unless the write is a global load direct to
+#    LDS.  s_barrier waits for all local memory operations, so that the other
+#    waves see the data written.
+#  - ordering through global memory is not tracked.
+################################################################################
+
+Counters = ("vmcnt", "lgkmcnt")
+MaxLgkmcnt = 15
+
+# pseudo register written by local memory operations and loads direct to LDS
+LDS = ("lds", 0)
+
+IdentifierPattern = re.compile(r"(?<!\w)[A-Za-z_]\w*")
+ExpressionPattern = re.compile(r"^[\w\s+\-*/%()<>&|^~]*$")
+RegisterPattern = re.compile(r"(?<![\w\]])([vs])(?:(\d+)\b|\[([^\]]*)\])")
+LabelPattern = re.compile(r"^\s*([A-Za-z_.$][\w.$]*):")
+MacroArgPattern = re.compile(r"\\(\w+)")
+
+# sections of metadata rather than code, by opening directive
+MetadataSections = {
+  ".amd_kernel_code_t":        ".end_amd_kernel_code_t",
+  ".amd_amdgpu_hsa_metadata":  ".end_amd_amdgpu_hsa_metadata",
+  ".amdgpu_metadata":          ".end_amdgpu_metadata",
+  ".amdhsa_kernel":            ".end_amdhsa_kernel",
+  }
+
+def evaluate(expr, symbols):
+  """ Value of an integer assembler expression, or None if it can't be evaluated. """
+  # fast path for sums of products of decimals and symbols, like most register
+  # expressions
+  total = 0
+  for term in expr.split("+"):
+    product = 1
+    for factor in term.split("*"):
+      factor = factor.strip()
+      if factor.isdigit():
+        product *= int(factor)
+      elif symbols.get(factor) is not None:
+        product *= symbols[factor]
+      else:
+        return evaluateExpression(expr, symbols)
+    total += product
+  return total
+
+def evaluateExpression(expr, symbols):
+  unknown = []
+  def value(match):
+    name = match.group(0)
+    if symbols.get(name) is None:
+      unknown.append(name)
+      return "0"
+    return str(symbols[name])
+  expr = IdentifierPattern.sub(value, expr.strip())
+  if unknown or not expr or not ExpressionPattern.match(expr):
+    return None
+  try:
+    return int(eval(expr.replace("//", "/").replace("/", "//"), {"__builtins__": {}}))
+  except Exception:
+    return None
+
+def registers(operands, symbols):
+  """
+  Registers named in operands, as (file, index).  (file, None) stands for
+  every register of the file if a register expression can't be evaluated.
+  """
+  regs = set()
+  for match in RegisterPattern.finditer(operands):
+    regFile = match.group(1)
+    if match.group(2) is not None:
+      regs.add((regFile, int(match.group(2))))
+      continue
+    bounds = [evaluate(b, symbols) for b in match.group(3).split(":")]
+    if None in bounds or len(bounds) > 2:
+      regs.add((regFile, None))
+    else:
+      regs.update([(regFile, i) for i in range(bounds[0], bounds[-1]+1)])
+  return regs
+
+def registerName(reg):
+  return "lds" if reg == LDS else "%s%s" % (reg[0], "*" if reg[1] is None else reg[1])
+
+def splitOperands(operands):
+  """ Splits operands at commas outside of brackets. """
+  parts = []
+  depth = 0
+  start = 0
+  for i, c in enumerate(operands):
+    if c in "[(":
+      depth += 1
+    elif c in "])":
+      depth -= 1
+    elif c == "," and depth == 0:
+      parts.append(operands[start:i].strip())
+      start = i+1
+  parts.append(operands[start:].strip())
+  return parts
+
+################################################################################
+# Instruction
+# One machine instruction, after macro expansion:
+#   regs:     registers read or written
+#   defs:     registers written by the memory operation when it completes
+#   counters: memory counters incremented until the operation completes
+#   ordered:  completes in order with the other operations on its counters
+#   ldsUses:  counters on which outstanding writes of LDS must complete first
+#   wait:     {counter: count} of an s_waitcnt
+################################################################################
+class Instruction:
+  __slots__ = ("text", "mnemonic", "regs", "defs", "counters", "ordered", "ldsUses", "wait")
+
+  def __init__(self, text, symbols):
+    self.text = text
+    parts = text.split(None, 1)
+    self.mnemonic = parts[0]
+    operandText = parts[1] if len(parts) > 1 else ""
+    self.regs = registers(operandText, symbols)
+    self.defs = set()
+    self.counters = ()
+    self.ordered = True
+    self.ldsUses = ()
+    self.wait = None
+
+    mnemonic = self.mnemonic
+    operands = splitOperands(operandText)
+    firstOperand = operands[0]
+    sources = registers(", ".join(operands[1:]), symbols)
+    if mnemonic == "s_waitcnt":
+      self.regs = set()
+      self.wait = {}
+      for counter in Counters:
+        match = re.search(r"\b%s\((\d+)\)" % counter, operandText)
+        if match:
+          self.wait[counter] = int(match.group(1))
+      if operandText.strip() == "0":
+        self.wait = dict.fromkeys(Counters, 0)
+    elif mnemonic.startswith(("buffer_", "tbuffer_", "global_", "flat_")) and \
+        ("_load" in mnemonic or "_store" in mnemonic or "_atomic" in mnemonic):
+      flat = mnemonic.startswith("flat_")
+      self.counters = Counters if flat else ("vmcnt",)
+      self.ordered = not flat
+      if re.search(r"\blds\b", operandText):
+        self.defs = set([LDS])
+      elif "_load" in mnemonic or re.search(r"\bglc\b", operandText):
+        self.defs = registers(firstOperand, symbols)
+        self.regs = sources
+    elif mnemonic.startswith("ds_"):
+      self.counters = ("lgkmcnt",)
+      self.defs = set([LDS])
+      if mnemonic.startswith(("ds_read", "ds_swizzle", "ds_permute", "ds_bpermute", \
+          "ds_append", "ds_consume")) or "_rtn_" in mnemonic:
+        self.defs |= registers(firstOperand, symbols)
+        self.regs = sources
+      self.ldsUses = ("vmcnt",)
+    elif mnemonic.startswith(("s_load_", "s_buffer_load_", "s_memtime", "s_memrealtime")):
+      self.counters = ("lgkmcnt",)
+      self.ordered = False
+      self.defs = registers(firstOperand, symbols)
+      self.regs = sources
+    elif mnemonic == "s_barrier":
+      self.ldsUses = Counters
+    elif not mnemonic.startswith(("v_", "s_")):
+      # unknown instruction, may use anything
+      self.regs = set([("v", None), ("s", None)])
+      self.ldsUses = Counters
+
+  def __str__(self):
+    return self.text
+
+################################################################################
+# State
+# What is known of the outstanding loads before an instruction:
+#   pending:   per counter, upper bound on the number of loads outstanding
+#   dist:      per counter, for each register written by an outstanding load,
+#              the number of loads issued on the counter after the newest load
+#              of that register
+#   unordered: per counter, if loads which complete out of order may be
+#              outstanding
+################################################################################
+class State:
+  __slots__ = ("pending", "dist", "unordered")
+
+  def __init__(self):
+    self.pending = dict.fromkeys(Counters, 0)
+    self.dist = dict([(c, {}) for c in Counters])
+    self.unordered = dict.fromkeys(Counters, False)
+
+  def copy(self):
+    state = State()
+    state.pending = dict(self.pending)
+    state.dist = dict([(c, dict(d)) for c, d in self.dist.items()])
+    state.unordered = dict(self.unordered)
+    return state
+
+  def join(self, other):
+    """ Merges other, from another path, into self.  Returns True if self changed. """
+    changed = False
+    for c in Counters:
+      if other.pending[c] > self.pending[c]:
+        self.pending[c] = other.pending[c]
+        changed = True
+      if other.unordered[c] and not self.unordered[c]:
+        self.unordered[c] = True
+        changed = True
+      dist = self.dist[c]
+      for reg, d in other.dist[c].items():
+        if d < dist.get(reg, d+1):
+          dist[reg] = d
+          changed = True
+    return changed
+
+################################################################################
+# Program
+# An assembly kernel parsed for dependency tracking.  lines holds its source
+# lines and nodes, in program order, the lines holding a label or
+# instructions, with the instructions of macros expanded.
+################################################################################
+class Program:
+
+  class Node:
+    __slots__ = ("line", "label", "text", "insts", "target", "conditional", "end", "isWait")
+
+    def __init__(self, line):
+      self.line = line
+      self.label = None
+      self.text = ""
+      self.insts = []
+      self.target = None
+      self.conditional = False
+      self.end = False
+      self.isWait = False
+
+  def __init__(self, source, maxVmcnt):
+    """ maxVmcnt: largest vmcnt s_waitcnt accepts, from AsmCaps MaxVmcnt. """
+    self.maxCounts = {"vmcnt": maxVmcnt, "lgkmcnt": MaxLgkmcnt}
+    self.lines = source.splitlines(True)
+    self.nodes = []
+    self.labels = {}
+    self.symbols = {}
+    self.macros = {}
+    self.instructions = {} # by text, while symbols are unchanged
+    self.parse()
+    self.makeBlocks()
+
+  ##############################################################################
+  # Parsing
+  ##############################################################################
+  def parse(self):
+    inComment = False
+    section = None
+    macro = None
+    conditions = [] # enclosing .if, True where active
+
+    for lineIdx, line in enumerate(self.lines):
+      # strip comments
+      text = ""
+      rest = line
+      while rest:
+        if inComment:
+          end = rest.find("*/")
+          if end < 0:
+            break
+          rest = rest[end+2:]
+          inComment = False
+        else:
+          start = rest.find("/*")
+          lineComment = rest.find("//")
+          if lineComment >= 0 and (start < 0 or lineComment < start):
+            text += rest[:lineComment]
+            break
+          if start < 0:
+            text += rest
+            break
+          text += rest[:start] + " "
+          rest = rest[start+2:]
+          inComment = True
+      text = text.strip()
+      if not text:
+        continue
+      directive = text.split(None, 1)[0]
+
+      if section is not None:
+        if directive == section:
+          section = None
+        continue
+      if macro is not None:
+        if directive == ".endm":
+          macro = None
+        else:
+          macro[1].append(text)
+        continue
+
+      if directive in (".if", ".ifdef", ".ifndef"):
+        active = all(conditions)
+        if active:
+          if directive == ".if":
+            value = evaluate(text.split(None, 1)[1], self.symbols)
+            if value is None:
+              raise ValueError("line %u: can't evaluate %s" % (lineIdx+1, text))
+            active = value != 0
+          else:
+            active = (text.split()[1] in self.symbols) == (directive == ".ifdef")
+        conditions.append(active)
+        continue
+      if directive == ".else":
+        conditions[-1] = not conditions[-1] and all(conditions[:-1])
+        continue
+      if directive == ".endif":
+        conditions.pop()
+        continue
+      if not all(conditions):
+        continue
+
+      if directive in MetadataSections:
+        section = MetadataSections[directive]
+        continue
+      if directive == ".macro":
+        fields = text.split(None, 2)
+        params = []
+        if len(fields) > 2:
+          for param in re.split(r"[\s,]+", fields[2].strip()):
+            name, _, default = param.partition("=")
+            params.append((name, default))
+        macro = (params, [])
+        self.macros[fields[1]] = macro
+        continue
+
+      node = Program.Node(lineIdx)
+      match = LabelPattern.match(text)
+      if match:
+        node.label = match.group(1)
+        self.labels[node.label] = len(self.nodes)
+        text = text[match.end():].strip()
+      node.text = text
+      if text:
+        self.statement(node, text, 0)
+      if node.label is not None or node.insts:
+        self.nodes.append(node)
+
+  def statement(self, node, text, depth):
+    """ Adds the instructions of statement text to node. """
+    fields = text.split(None, 1)
+    name = fields[0]
+    if name == ".set":
+      symbol, _, expr = fields[1].partition(",")
+      self.symbols[symbol.strip()] = evaluate(expr, self.symbols)
+      self.instructions = {}
+    elif name in self.macros:
+      if depth > 16:
+        raise ValueError("line %u: macro %s nests too deeply" % (node.line+1, name))
+      params, body = self.macros[name]
+      args = splitOperands(fields[1]) if len(fields) > 1 else []
+      if len(args) < len(params) and len(args) == 1:
+        args = args[0].split()
+      values = {}
+      for i, (param, default) in enumerate(params):
+        values[param] = args[i] if i < len(args) and args[i] else default
+      for bodyText in body:
+        bodyText = bodyText.replace("\\()", "")
+        bodyText = MacroArgPattern.sub(lambda m: values.get(m.group(1), m.group(0)), bodyText)
+        self.statement(node, bodyText, depth+1)
+    elif name.startswith("."):
+      pass
+    else:
+      # macros expand to the same instructions many times
+      inst = self.instructions.get(text)
+      if inst is None:
+        inst = self.instructions[text] = Instruction(text, self.symbols)
+      node.insts.append(inst)
+      if depth == 0:
+        if inst.wait is not None:
+          node.isWait = True
+        elif name == "s_endpgm":
+          node.end = True
+        elif name.startswith(("s_branch", "s_cbranch_")):
+          node.target = fields[1].split()[0] if len(fields) > 1 else None
+          node.conditional = name != "s_branch"
+
+  def makeBlocks(self):
+    """ Splits nodes into basic blocks; self.blocks holds (start, end, successors). """
+    starts = set([0])
+    for i, node in enumerate(self.nodes):
+      if node.label is not None:
+        starts.add(i)
+      if node.target is not None or node.end:
+        starts.add(i+1)
+    starts = sorted([s for s in starts if s <= len(self.nodes)])
+    if starts[-1] != len(self.nodes):
+      starts.append(len(self.nodes))
+    blockOf = dict([(s, b) for b, s in enumerate(starts[:-1])])
+
+    self.blocks = []
+    for b in range(0, len(starts)-1):
+      start, end = starts[b], starts[b+1]
+      last = self.nodes[end-1] if end > start else None
+      successors = []
+      if last is not None and last.target in self.labels:
+        successors.append(blockOf[self.labels[last.target]])
+      fallThrough = last is None or \
+          not (last.end or (last.target is not None and not last.conditional))
+      if fallThrough and b+1 < len(starts)-1:
+        successors.append(b+1)
+      self.blocks.append((start, end, successors))
+
+  ##############################################################################
+  # Dataflow
+  ##############################################################################
+  def need(self, state, inst):
+    """ Loosest wait before inst in state, as {counter: (count, register)}. """
+    needs = {}
+    for c in Counters:
+      dist = state.dist[c]
+      if not dist:
+        continue
+      regs = inst.regs
+      if c in inst.ldsUses:
+        regs = regs | set([LDS])
+      if inst.defs and not (c in inst.counters and inst.ordered and not state.unordered[c]) \
+          and not isScalarLoad(inst):
+        # unless loads of the same registers complete in order
+        regs = regs | (inst.defs - set([LDS]))
+      # nearest register, lowest first on ties so reports are stable
+      best = None
+      for reg in regs:
+        if reg[1] is None:
+          for r, d in dist.items():
+            if r[0] == reg[0] and (best is None or (d, r) < best):
+              best = (d, r)
+        elif reg in dist and (best is None or (dist[reg], reg) < best):
+          best = (dist[reg], reg)
+      if best is not None:
+        needs[c] = (0 if state.unordered[c] else best[0], best[1])
+    return needs
+
+  def applyWait(self, state, counts):
+    for c, count in counts.items():
+      count = min(count, self.maxCounts[c])
+      if count >= state.pending[c]:
+        continue
+      state.pending[c] = count
+      if count == 0:
+        state.unordered[c] = False
+        state.dist[c] = {}
+      elif not state.unordered[c]:
+        state.dist[c] = dict([(r, d) for r, d in state.dist[c].items() if d < count])
+
+  def issue(self, state, inst):
+    for c in inst.counters:
+      limit = self.maxCounts[c]
+      # pending beyond limit: more may be outstanding than any wait but 0 allows
+      state.pending[c] = min(state.pending[c] + 1, limit + 1)
+      dist = state.dist[c]
+      for reg in dist:
+        dist[reg] = min(dist[reg] + 1, limit)
+      for reg in inst.defs:
+        dist[reg] = 0
+      if not inst.ordered:
+        state.unordered[c] = True
+
+  def step(self, state, nodeIdx, insert, results):
+    """
+    Advances state over node nodeIdx.  If insert, waits in the source are
+    ignored and the waits needed are applied and recorded in results as
+    {nodeIdx: needs}; otherwise uses not covered by the waits in the source
+    are recorded as {nodeIdx: [(inst, needs)]}.
+    """
+    node = self.nodes[nodeIdx]
+    if insert:
+      if node.isWait:
+        return
+      needs = {}
+      for inst in node.insts:
+        for c, (count, reg) in self.need(state, inst).items():
+          if c not in needs or count < needs[c][0]:
+            needs[c] = (count, reg)
+      if needs:
+        self.applyWait(state, dict([(c, n[0]) for c, n in needs.items()]))
+        results[nodeIdx] = needs
+      for inst in node.insts:
+        if inst.wait is not None:
+          self.applyWait(state, inst.wait)
+        elif self.need(state, inst):
+          raise ValueError("line %u: %s needs a wait within a macro" \
+              % (node.line+1, inst.text))
+        self.issue(state, inst)
+    else:
+      for inst in node.insts:
+        if inst.wait is not None:
+          self.applyWait(state, inst.wait)
+        needs = self.need(state, inst)
+        if needs:
+          results.setdefault(nodeIdx, []).append((inst, needs))
+          self.applyWait(state, dict([(c, n[0]) for c, n in needs.items()]))
+        self.issue(state, inst)
+
+  def solve(self, insert):
+    """ Runs the dataflow to a fixed point, then returns the results of step. """
+    entryStates = [None] * len(self.blocks)
+    if self.blocks:
+      entryStates[0] = State()
+    work = [0] if self.blocks else []
+    while work:
+      b = work.pop()
+      start, end, successors = self.blocks[b]
+      state = entryStates[b].copy()
+      for i in range(start, end):
+        self.step(state, i, insert, {})
+      for s in successors:
+        if entryStates[s] is None:
+          entryStates[s] = state.copy()
+        elif not entryStates[s].join(state):
+          continue
+        if s not in work:
+          work.append(s)
+
+    results = {}
+    for b, (start, end, _) in enumerate(self.blocks):
+      if entryStates[b] is None:
+        continue # unreachable
+      state = entryStates[b].copy()
+      for i in range(start, end):
+        self.step(state, i, insert, results)
+    return results
+
+  def insertWaits(self):
+    """
+    Returns the source with its s_waitcnt replaced by the loosest waits which
+    cover each use of a register written by a load.
+    """
+    waits = self.solve(True)
+    lines = list(self.lines)
+    for nodeIdx, node in enumerate(self.nodes):
+      if node.isWait:
+        lines[node.line] = "" if node.label is None else "%s:\n" % node.label
+      elif nodeIdx in waits:
+        needs = waits[nodeIdx]
+        regs = sorted(set([registerName(reg) for _, reg in needs.values()]))
+        waitText = str(Code.WaitCnt(needs["lgkmcnt"][0] if "lgkmcnt" in needs else -1, \
+            needs["vmcnt"][0] if "vmcnt" in needs else -1, "wait for %s" % ", ".join(regs)))
+        if node.label is not None:
+          # keep the label ahead of the wait
+          lines[node.line] = "%s:\n%s%s\n" % (node.label, waitText, node.text)
+        else:
+          lines[node.line] = waitText + lines[node.line]
+    return "".join(lines)
+
+  def check(self):
+    """ Returns a description of each use not covered by the waits in the source. """
+    violations = []
+    uses = self.solve(False)
+    for nodeIdx in sorted(uses):
+      for inst, needs in uses[nodeIdx]:
+        waits = ", ".join(["%s(%u) for %s" % (c, count, registerName(reg)) \
+            for c, (count, reg) in sorted(needs.items())])
+        violations.append("line %u: %s needs %s" \
+            % (self.nodes[nodeIdx].line+1, inst.text, waits))
+    return violations
+
+  ##############################################################################
+  # Latency
+  ##############################################################################
+  def latency(self, latencies):
+    """
+    Estimates by Schedule.Timeline each loop of the program, a backward branch
+    to a label, running its body in program order.  Returns a list of
+    (label, cycles, stallCycles, memoryLatency) for an iteration in steady
+    state: the cycles of the iteration, those spent stalled in s_waitcnt and
+    the total latency of the memory operations it issues.
+    """
+    loops = []
+    for branchIdx, branch in enumerate(self.nodes):
+      if branch.target not in self.labels or self.labels[branch.target] > branchIdx:
+        continue
+      timeline = Schedule.Timeline(latencies)
+      for iteration in range(0, 2):
+        cycle = timeline.cycle
+        stallCycles = timeline.stallCycles
+        memoryLatency = 0
+        for node in self.nodes[self.labels[branch.target]:branchIdx+1]:
+          for inst in node.insts:
+            if inst.wait is not None:
+              timeline.issue(Code.WaitCnt(inst.wait.get("lgkmcnt", -1), inst.wait.get("vmcnt", -1)))
+              continue
+            cls = timelineClass(inst)
+            timeline.issue(Code.TextBlock(inst.text + "\n"), cls=cls)
+            if cls in Schedule.Counters:
+              memoryLatency += latencies[cls][2]
+      loops.append((branch.target, timeline.cycle - cycle, \
+          timeline.stallCycles - stallCycles, memoryLatency))
+    return loops
+
+def isScalarLoad(inst):
+  return inst.counters == ("lgkmcnt",) and not inst.ordered
+
+def timelineClass(inst):
+  """ The class of Code item standing for inst in the latency model. """
+  if inst.counters == ("vmcnt",) or inst.counters == Counters:
+    return Code.GlobalReadInst
+  if inst.mnemonic.startswith("ds_"):
+    return Code.LocalReadInst if len(inst.defs) > 1 else Code.LocalWriteInst
+  if inst.mnemonic.startswith(("v_mac_", "v_fma_", "v_pk_fma_", "v_mad_mix", "v_dot")):
+    return Code.MacInst
+  return Code.Inst
@@ -0,0 +1,250 @@
+################################################################################
+# Copyright (C) 2016-2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from . import __version__
+from . import Utils
+from .Common import globalParameters, print1, print2
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+################################################################################
+# Kernel Cache
+# Persistent, content-addressed store of assembly kernel build artifacts.
+#
+# Each entry lives in <path>/<key[:2]>/<key>/ and holds the .s/.o/.co files
+# of one kernel (or the .co of one linked library) plus a small metadata file
+# recording how long the build took.  The key is a digest of the kernel state
+# and of everything outside of it which changes the generated code object:
+# Tensile version and kernel writer sources, assembler path/version, ISA
+# capabilities and code object version.
+#
+# Entries are written to a temporary directory and renamed into place so that
+# concurrent kernel writer processes never observe partial entries.  The
+# metadata file's mtime is refreshed on every hit and used for LRU eviction.
+################################################################################
+class KernelCache:
+
+  MetadataFileName = "entry.json"
+
+  # modules whose contents determine the generated assembly
+  WriterSources = ["Code.py", "Common.py", "DataType.py", "Dependency.py", "KernelWriter.py",
+                   "KernelWriterAssembly.py", "Schedule.py", "SolutionStructs.py"]
+
+  _assemblerVersion = None
+  _writerDigest = None
+
+  def __init__(self, path, maxSize):
+    """
+    path: cache root directory, created if missing.
+    maxSize: size cap in MiB applied by evict(); 0 disables eviction.
+    """
+    self.path = os.path.abspath(path)
+    self.maxSize = maxSize
+    os.makedirs(self.path, exist_ok=True)
+
+    self.hits = 0
+    self.misses = 0
+    self.timeSaved = 0.0
+
+  @classmethod
+  def FromGlobalParameters(cls):
+    """ Returns a cache configured by globalParameters, or None if caching is disabled. """
+    if not globalParameters["KernelCachePath"]:
+      return None
+    return cls(globalParameters["KernelCachePath"], globalParameters["KernelCacheMaxSize"])
+
+  ##############################################################################
+  # Keys
+  ##############################################################################
+  @classmethod
+  def assemblerVersion(cls):
+    if cls._assemblerVersion is None:
+      try:
+        cls._assemblerVersion = subprocess.check_output( \
+            [globalParameters["AssemblerPath"], "--version"], stderr=subprocess.STDOUT).decode()
+      except (OSError, TypeError, subprocess.CalledProcessError):
+        cls._assemblerVersion = ""
+    return cls._assemblerVersion
+
+  @classmethod
+  def writerDigest(cls):
+    if cls._writerDigest is None:
+      sha = hashlib.sha256()
+      for fileName in cls.WriterSources:
+        with open(os.path.join(globalParameters["ScriptPath"], fileName), "rb") as f:
+          sha.update(f.read())
+      cls._writerDigest = sha.hexdigest()
+    return cls._writerDigest
+
+  @classmethod
+  def environment(cls, isa):
+    return [__version__,
+            cls.writerDigest(),
+            globalParameters["AssemblerPath"],
+            cls.assemblerVersion(),
+            isa,
+            globalParameters["CurrentISA"],
+            globalParameters.get("AsmCaps", {}).get(isa),
+            globalParameters["CodeObjectVersion"],
+            globalParameters["DebugKernel"],
+            globalParameters["UnrollLoopEfficiencyEnable"]]
+
+  @classmethod
+  def kernelKey(cls, kernel, kernelName, replacementKernel=None):
+    """
+    Key for the artifacts of a single assembly kernel.  The kernel name is part
+    of the key since it is embedded in the assembly.
+    """
+    replacement = None
+    if replacementKernel is not None:
+      with open(replacementKernel, "rb") as f:
+        replacement = hashlib.sha256(f.read()).hexdigest()
+
+    return Utils.digest(cls.environment(kernel["ISA"]), kernelName, kernel, replacement)
+
+  @classmethod
+  def linkKey(cls, isa, objectKeys):
+    """ Key for a code object linked from kernels with the given keys, in order. """
+    return Utils.digest(cls.environment(isa), "link", objectKeys)
+
+  ##############################################################################
+  # Entries
+  ##############################################################################
+  def entryPath(self, key):
+    return os.path.join(self.path, key[:2], key)
+
+  def lookup(self, key):
+    """ Returns the metadata of the entry for key, or None on a miss. """
+    try:
+      with open(os.path.join(self.entryPath(key), self.MetadataFileName)) as f:
+        return json.load(f)
+    except (OSError, ValueError):
+      return None
+
+  def fetch(self, key, files):
+    """
+    Copies the artifacts of entry key to the paths in files, which maps
+    extension (e.g. ".co") to destination.  Returns False on a miss.
+    """
+    entryPath = self.entryPath(key)
+    metadata = self.lookup(key)
+    if metadata is None or not all([ext in metadata["files"] for ext in files]):
+      return False
+
+    try:
+      for ext, dst in files.items():
+        shutil.copyfile(os.path.join(entryPath, "artifact" + ext), dst)
+      os.utime(os.path.join(entryPath, self.MetadataFileName))
+    except OSError:
+      return False
+
+    print2("# KernelCache: hit %s" % key)
+    return True
+
+  def store(self, key, files, buildTime):
+    """
+    Adds the artifacts in files (extension -> source path) as entry key.
+    buildTime is the number of seconds a hit on this entry saves.
+    """
+    entryPath = self.entryPath(key)
+    if os.path.isdir(entryPath):
+      return
+
+    os.makedirs(os.path.dirname(entryPath), exist_ok=True)
+    tmpPath = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(entryPath))
+    try:
+      for ext, src in files.items():
+        shutil.copyfile(src, os.path.join(tmpPath, "artifact" + ext))
+      metadata = {"key": key, "files": sorted(files.keys()), "buildTime": buildTime,
+                  "version": __version__}
+      with open(os.path.join(tmpPath, self.MetadataFileName), "w") as f:
+        json.dump(metadata, f)
+      os.rename(tmpPath, entryPath)
+    except OSError:
+      # another process stored the same entry first, or the cache is not writable
+      shutil.rmtree(tmpPath, ignore_errors=True)
+
+  ##############################################################################
+  # Statistics
+  ##############################################################################
+  def probe(self, keys):
+    """
+    Tallies hits and misses for keys ahead of a (possibly parallel) build, since
+    kernel writer processes can't report back.  Returns the set of keys hit.
+    """
+    hits = set()
+    for key in keys:
+      metadata = self.lookup(key)
+      if metadata is None:
+        self.misses += 1
+      else:
+        self.hits += 1
+        self.timeSaved += metadata["buildTime"]
+        hits.add(key)
+    return hits
+
+  def report(self):
+    total = self.hits + self.misses
+    print1("# KernelCache: %u/%u hits, %u misses, %.1f secs saved (%s)" \
+        % (self.hits, total, self.misses, self.timeSaved, self.path))
+
+  ##############################################################################
+  # Eviction
+  ##############################################################################
+  def evict(self):
+    """ Removes least recently used entries until the cache fits in maxSize MiB. """
+    if not self.maxSize:
+      return
+
+    entries = []
+    totalSize = 0
+    for prefix in os.scandir(self.path):
+      if not prefix.is_dir():
+        continue
+      for entry in os.scandir(prefix.path):
+        if entry.name.startswith(".tmp-"):
+          continue
+        try:
+          lastUse = os.stat(os.path.join(entry.path, self.MetadataFileName)).st_mtime
+          size = sum([f.stat().st_size for f in os.scandir(entry.path)])
+        except OSError:
+          continue
+        entries.append((lastUse, size, entry.path))
+        totalSize += size
+
+    maxBytes = self.maxSize * 1024 * 1024
+    if totalSize <= maxBytes:
+      return
+
+    evicted = 0
+    for lastUse, size, entryPath in sorted(entries):
+      if totalSize <= maxBytes:
+        break
+      shutil.rmtree(entryPath, ignore_errors=True)
+      totalSize -= size
+      evicted += 1
+
+    print1("# KernelCache: evicted %u entries, %.1f MiB in use" % (evicted, totalSize / (1024.0*1024.0)))
@@ -21,13 +21,16 @@
 
 from . import Code
 from . import Common
+from . import Schedule
 from .Common import globalParameters, CHeader, roundUp
 from .SolutionStructs import Solution
 
 import abc
+import io
 import os
 import shutil
 import subprocess
+import time
 from os import path, chmod
 
 ################################################################################
@@ -43,6 +46,7 @@ class KernelWriter(metaclass=abc.ABCMeta):
     self.kernelMinNaming = kernelMinNaming
     self.kernelSerialNaming = kernelSerialNaming
     self.overflowedResources = 0
+    self.kernelCache = None
 
   ##############################################################################
   # makeSchedule:  Schedule work into interations.
@@ -275,9 +279,8 @@ class KernelWriter(metaclass=abc.ABCMeta):
       # simple algorithm - do half the reads first:
       readsToSchedule = localReadCode.countType(Code.LocalReadInst) / 2
       #localReadCode.prettyPrint()
-      readItems = localReadCode.flatitems()
-      while readItems:
-        item = readItems.pop(0)
+      readItems = localReadCode.iterItems()
+      for item in readItems:
         #print "readsToSchedule=", readsToSchedule, "item=", item
         iterCode.addCode(item)
         readsThisItem = item.countType(Code.LocalReadInst)
@@ -300,44 +303,71 @@ class KernelWriter(metaclass=abc.ABCMeta):
       iterCode.addCode(waitCode)
       iterCode.addCode(macIterCode)
     elif self.scheduleIterAlg == 2:
-      # fuss goes here:
-      pass
+      # list schedule against the latency model of the ISA
+      # - local writes follow the global reads, as their vmcnt counts them
+      # - pointer updates follow all local reads and writes
+      # - the wait before the macs follows the global reads, as its vmcnt
+      #   counts them, and all of the local reads unless they prefetch into
+      #   the other buffer, in which case the macs may overlap them
+      (reads, globalReads, writes, pointer, macs) = range(0, 5)
+      chains = [list(localReadCode.iterItems()), list(globalReadCode.items()), \
+                list(localWriteCode.items()), [pointerCode], \
+                [waitCode] + list(macIterCode.iterItems())]
+      after = {writes: [globalReads], pointer: [reads, globalReads, writes], \
+               macs: [globalReads] if kernel["PrefetchLocalRead"] else [globalReads, reads]}
+      # the timeline continues across the iterations of the unrolled loop so
+      # the wait sees the local reads still outstanding from the prior one
+      if self.scheduleTimeline is None:
+        self.scheduleTimeline = Schedule.Timeline(Schedule.getLatencies(kernel["ISA"]))
+      waitCounts = lambda wait, items: (wait.vmcnt, self.subIterLgkmcnt(kernel, items, wait))
+      for item in Schedule.listSchedule(chains, after, self.scheduleTimeline.latencies, \
+          self.scheduleTimeline, waitCounts):
+        iterCode.addCode(item)
     else:
       assert 0, "Unsupported scheduleIterAlg=%u"%self.scheduleIterAlg
 
 
     if isinstance(waitCode, Code.WaitCnt):
       # Set the waitCount, based on the new iter schedule
-      lgkmcnt = 0 # most conservative
-      for item in list(iterCode.items()):
-        localReads  = item.countType(Code.LocalReadInst)
-        localWrites = item.countType(Code.LocalWriteInst)
-        if kernel["PrefetchLocalRead"]:
-          # here the reads are prefetches so can skip them in the waitcnt
-          lgkmcnt += localReads
-          # and the writes are targetting another section of LDS and are
-          # synchronized through a different waitnct than this one
-          # (which is always just before the macs)
-          lgkmcnt += localWrites
-        else:
-          # if UnrollLoopEfficiencyEnable == True  use waitCode passed lgkmCnt
-          # else:
-          # we need to wait for all preceding reads before the macs
-          # so only opportunity for optimization is if the writes are at the end
-          if globalParameters["UnrollLoopEfficiencyEnable"]:
-            lgkmcnt = waitCode.lgkmcnt
-          else:
-            if localReads:
-              lgkmcnt = 0 # reset to wait for all reads
-            else:
-              lgkmcnt = localWrites  # this only survives if writes are at the end
-
-      lgkmcnt = min(lgkmcnt, 15)
+      # only operations issued before the wait are outstanding at it
+      items = list(iterCode.items())
+      lgkmcnt = self.subIterLgkmcnt(kernel, items[:items.index(waitCode)], waitCode)
       waitCode.comment += " old=%u new=%u" % (waitCode.lgkmcnt, lgkmcnt)
       waitCode.lgkmcnt = lgkmcnt
 
     return iterCode
 
+  ##############################################################################
+  # lgkmcnt for the wait before the macs of an unroll iteration, given the
+  # items of the iteration scheduled before it
+  ##############################################################################
+  def subIterLgkmcnt(self, kernel, items, waitCode):
+    lgkmcnt = 0 # most conservative
+    for item in items:
+      localReads  = item.countType(Code.LocalReadInst)
+      localWrites = item.countType(Code.LocalWriteInst)
+      if kernel["PrefetchLocalRead"]:
+        # here the reads are prefetches so can skip them in the waitcnt
+        lgkmcnt += localReads
+        # and the writes are targetting another section of LDS and are
+        # synchronized through a different waitnct than this one
+        # (which is always just before the macs)
+        lgkmcnt += localWrites
+      else:
+        # if UnrollLoopEfficiencyEnable == True  use waitCode passed lgkmCnt
+        # else:
+        # we need to wait for all preceding reads before the macs
+        # so only opportunity for optimization is if the writes are at the end
+        if globalParameters["UnrollLoopEfficiencyEnable"]:
+          lgkmcnt = waitCode.lgkmcnt
+        else:
+          if localReads:
+            lgkmcnt = 0 # reset to wait for all reads
+          else:
+            lgkmcnt = localWrites  # this only survives if writes are at the end
+
+    return min(lgkmcnt, 15)
+
   ##############################################################################
   # returns list of modules or text
   # papIter indicates this is the setup for the "prefetchAcrossPersistent"
@@ -567,8 +597,9 @@ class KernelWriter(metaclass=abc.ABCMeta):
 
   ##############################################################################
   # Kernel Body
+  # Generates the kernel body and writes it to sink, returns error
   ##############################################################################
-  def kernelBody( self, kernel, tensorParametersA, tensorParametersB ):
+  def writeKernelBody( self, kernel, tensorParametersA, tensorParametersB, sink ):
 
     ####################################
     # Begin String
@@ -586,7 +617,7 @@ class KernelWriter(metaclass=abc.ABCMeta):
     kl.append(self.comment3("Begin Kernel"))
     kl.append(self.functionSignaturePrefix(kernel))
 
-    beforeFunctionSignature = '\n'.join([str(x) for x in kl])
+    beforeFunctionSignature = kl
     kl = []
 
     kl.append(self.functionSignatureSuffix(kernel))
@@ -720,6 +751,7 @@ class KernelWriter(metaclass=abc.ABCMeta):
       # Schedule the global read, global read inc, and writes:
       self.makeSchedule(kernel, tensorParametersA, tensorParametersB, localWriteEndIter)
       kl.append(str(self.unrollLoopHeaderCode))
+      self.scheduleTimeline = None
 
       if kernel["PrefetchGlobalRead"] and not kernel["PrefetchLocalRead"]:
         if self.enable["Wait"]:
@@ -856,7 +888,11 @@ class KernelWriter(metaclass=abc.ABCMeta):
 
         if self.enable["MAC"]:
           luIdx = (u) % (kernel["PrefetchLocalRead"]+1) # local to use for MACs
-          macIterCode.addCode(self.macIter(kernel, luIdx, kernel["InnerUnroll"], True ))
+          if self.scheduleIterAlg == 2:
+            # individual macs which the scheduler can interleave
+            macIterCode.addCode(self.macCode(kernel, luIdx, kernel["InnerUnroll"]))
+          else:
+            macIterCode.addCode(self.macIter(kernel, luIdx, kernel["InnerUnroll"], True ))
 
         ###### unroll loop efficiency implementation######################################
         # unroll loop efficiency implementation
@@ -1103,7 +1139,10 @@ class KernelWriter(metaclass=abc.ABCMeta):
       # which waited for this ds_read
       if self.enable["MAC"]:
         luIdx = (unrollIter) % (kernel["PrefetchLocalRead"] + 1)
-        macIterCode.addCode(self.macIter(kernel, luIdx, kernel["InnerUnroll"], True))
+        if self.scheduleIterAlg == 2:
+          macIterCode.addCode(self.macCode(kernel, luIdx, kernel["InnerUnroll"]))
+        else:
+          macIterCode.addCode(self.macIter(kernel, luIdx, kernel["InnerUnroll"], True))
 
       subIterCode = self.makeSubIterSchedule(kernel, localReads,
                             self.perIterGlobalReadCode[unrollIter],
@@ -1294,14 +1333,20 @@ class KernelWriter(metaclass=abc.ABCMeta):
     kl.append(self.functionSuffix(kernel))
 
     kl.append(self.closeString(kernel))
-    kStr = '\n'.join([str(x) for x in kl])
-    afterFunctionSignature = kStr
+    afterFunctionSignature = kl
 
     error = self.overflowedResources
 
     # function signature last since it needs to know how many gprs were actually used
-    kStr = beforeFunctionSignature + self.functionSignature(kernel) + afterFunctionSignature
-    return (error,kStr)
+    Code.writeLines(sink, beforeFunctionSignature)
+    sink.write(self.functionSignature(kernel))
+    Code.writeLines(sink, afterFunctionSignature)
+    return error
+
+  def kernelBody( self, kernel, tensorParametersA, tensorParametersB ):
+    sink = io.StringIO()
+    error = self.writeKernelBody(kernel, tensorParametersA, tensorParametersB, sink)
+    return (error, sink.getvalue())
 
 
 
@@ -1386,6 +1431,8 @@ class KernelWriter(metaclass=abc.ABCMeta):
       self.scheduleIterAlg = kernel["ScheduleIterAlg"]
     else:
       self.scheduleIterAlg = 0
+    # latency model timeline of the unrolled loop, for scheduleIterAlg 2
+    self.scheduleTimeline = None
 
     self.prefetchAcrossPersistent = \
         kernel["KernelLanguage"] == "Assembly" and \
@@ -2373,27 +2420,39 @@ class KernelWriter(metaclass=abc.ABCMeta):
     """
     Returns the source of the kernel, either C++ or assembly.
     """
-    
-    
-    fileString = ""
+    sink = io.StringIO()
+    self.writeKernelSource(kernel, sink)
+    return sink.getvalue()
+
+  def writeKernelSource(self, kernel, sink):
+    """
+    Writes the source of the kernel, either C++ or assembly, to sink, any
+    object with a write(str) method such as an open file.
+    """
+    if self.language == "ASM" and \
+        (kernel["WaitCntAlg"] == 1 or globalParameters["CheckWaitCnt"]):
+      # dependency tracking needs the whole kernel
+      source = io.StringIO()
+      self.writeKernelParts(kernel, source)
+      sink.write(self.trackDependencies(kernel, source.getvalue()))
+    else:
+      self.writeKernelParts(kernel, sink)
+
+  def writeKernelParts(self, kernel, sink):
     self.tPA = tensorParametersA = {}
     self.tPB = tensorParametersB = {}
     self.initKernel(kernel, tensorParametersA, tensorParametersB )
-    fileString += self.kernelBodyPrefix( kernel, tensorParametersA, \
-        tensorParametersB )
+    sink.write(self.kernelBodyPrefix( kernel, tensorParametersA, \
+        tensorParametersB ))
     self.stringIdx = 0
-    (error, kb) = self.kernelBody( kernel, tensorParametersA, tensorParametersB)
-
-    fileString += kb
-    fileString += self.kernelBodySuffix( kernel, tensorParametersA, \
-        tensorParametersB )
+    error = self.writeKernelBody( kernel, tensorParametersA, tensorParametersB, sink)
 
+    sink.write(self.kernelBodySuffix( kernel, tensorParametersA, \
+        tensorParametersB ))
 
     if error != 0:
       raise RuntimeError("Generating kernel source resulted in error {}".format(error))
 
-    return fileString
-
   def getAssemblyDirectory(self):
       return Common.ensurePath(os.path.join(globalParameters["WorkingPath"], "assembly"))
 
@@ -2497,13 +2556,16 @@ for codeObjectFileName in codeObjectFileNames:
       if globalParameters["PrintLevel"] >= 1:
         print("replacement_assemblyFilename %s" % assemblyFileName)
     else:
-      kernelSource = self.getKernelSource(kernel)
-
       if globalParameters["PrintLevel"] >= 2:
         print("write_assemblyFilename %s" % assemblyFileName)
 
-      with open(assemblyFileName, 'w') as assemblyFile:
-        assemblyFile.write(kernelSource)
+      # stream straight to the file, removing it if generation fails part way
+      try:
+        with open(assemblyFileName, 'w') as assemblyFile:
+          self.writeKernelSource(kernel, assemblyFile)
+      except BaseException:
+        os.remove(assemblyFileName)
+        raise
 
     return assemblyFileName
 
@@ -2518,8 +2580,30 @@ for codeObjectFileName in codeObjectFileNames:
 
     return objectFileName
 
-  def getSingleCodeObjectFile(self, kernel):
-    objectFileName = self.getAssembledKernelObjectFile(kernel)
+  def getSingleCodeObjectFile(self, kernel, built=None):
+    """
+    built: ".co" if the kernel's code object is up to date from a previous
+    build, ".o" if its object file was assembled ahead of time, else None.
+    """
+    kernelName = self.getKernelName(kernel)
+    fileBase = path.join(self.getAssemblyDirectory(), kernelName)
+
+    if built == ".co":
+      return fileBase + ".co"
+
+    # on a kernel cache hit the assembly, object and code object files are
+    # restored from the cache instead of being generated and assembled
+    if self.kernelCache is not None:
+      artifacts = dict([(ext, fileBase + ext) for ext in [".s", ".o", ".co"]])
+      cacheKey = self.kernelCache.kernelKey(kernel, kernelName, self.getReplacementKernelPath(kernel))
+      if self.kernelCache.fetch(cacheKey, artifacts):
+        return artifacts[".co"]
+      start = time.time()
+
+    if built == ".o":
+      objectFileName = fileBase + ".o"
+    else:
+      objectFileName = self.getAssembledKernelObjectFile(kernel)
 
     base, ext = path.splitext(objectFileName)
     coFileName = base + '.co'
@@ -2527,6 +2611,9 @@ for codeObjectFileName in codeObjectFileNames:
     args = self.getLinkCodeObjectArgs([objectFileName], coFileName)
     subprocess.check_call(args, cwd=self.getAssemblyDirectory())
 
+    if self.kernelCache is not None:
+      self.kernelCache.store(cacheKey, artifacts, time.time() - start)
+
     return coFileName
 
   def getByteArrayCobaDefinition(self, varName, byteArray):
@@ -2550,7 +2637,7 @@ for codeObjectFileName in codeObjectFileNames:
     return self.getByteArrayCobaDefinition(varName, byteArray)
 
   ##############################################################################
-  def getSourceFileString(self, kernel):
+  def getSourceFileString(self, kernel, built=None):
     """
     Returns a string suitable for placing in Kernels.cpp.  This means the actual kernel source in the case 
     of a source kernel, or an assembled code object byte array definition in the case of an assembly kernel,
@@ -2561,6 +2648,7 @@ for codeObjectFileName in codeObjectFileNames:
      * An object file
      * A code object file
      * A Python script which can create byte array variable definitions.
+    Files which were already built are skipped, see getSingleCodeObjectFile.
     """
 
     try:
@@ -2568,7 +2656,7 @@ for codeObjectFileName in codeObjectFileNames:
         self.writeByteArrayScript()
 
         asmPath = self.getAssemblyDirectory()
-        coFile = self.getSingleCodeObjectFile(kernel)
+        coFile = self.getSingleCodeObjectFile(kernel, built)
         kernelName = self.getKernelName(kernel)
 
         if globalParameters["CodeFromFiles"]:
@@ -20,14 +20,17 @@
 ################################################################################
 
 from . import Code
-from .Common import globalParameters, printExit, printWarning, roundUp
+from . import Dependency
+from . import Schedule
+from .Common import globalParameters, print2, printExit, printWarning, roundUp
 from .DataType import DataType
 from .KernelWriter import KernelWriter
-from .SolutionStructs import isPackedIndex
+from .SolutionStructs import isPackedIndex, ProblemType
 from .Utils import ceil_divide, roundUpToNearestMultiple
 
 from math import log, ceil
 from copy import deepcopy
+import bisect
 import collections
 import traceback
 
@@ -81,31 +84,63 @@ class MemoryInstruction:
 ################################################################################
 # RegisterPool
 # Debugging register performance problems:
-# - Enable self.db["PrintRP" to see messages as vgprPool state changes.
+# - Enable self.db["PrintRP" to see messages as vgprPool state changes, and
+#   an allocation trace and peak usage report from checkFinalState.
 # - Search for 'overlow' to see when pool grows dynamically - typically this
 #   indicates growth for temps or other cases.
 # - checkIn, checkout take optional tag but this is not widely used in tensile.
 # - checkout returns vgpr index that was returned - can search disasm to see where
 #   this vgpr is used.
+#
+# The status of each register is kept in a bytearray, and the maximal runs of
+# available registers in sorted lists of their starts and ends, so check out
+# visits runs rather than registers and check in merges with its neighbours
+# found by bisection.
 ################################################################################
 class RegisterPool:
   statusUnAvailable = 0
   statusAvailable = 1
   statusInUse = 2
 
-  class Register:
-    def __init__(self, status, tag=""):
-      self.status = status
-      self.tag = tag
-
   ########################################
   # Init
   def __init__(self, size, type, reservedAtEnd, printRP=0):
     self.printRP=printRP
     self.type = type
     self.reservedAtEnd = reservedAtEnd
-    self.pool = [self.Register(self.statusUnAvailable, "init") for i in range(0,size)]
+    self.pool = bytearray([self.statusUnAvailable]) * size
     self.checkOutSize = {}
+    self.checkOutTag = {}
+    # maximal runs [freeStarts[i], freeEnds[i]) of available registers
+    self.freeStarts = []
+    self.freeEnds = []
+    self.numAvailable = 0
+    # usage statistics, plus a trace of check outs and ins with printRP
+    self.numInUse = 0
+    self.peakInUse = 0
+    self.numOverflows = 0
+    self.trace = []
+
+  ########################################
+  # Free runs
+  # Rebuilds the runs of available registers from the status of each one,
+  # after add or remove which change arbitrary ranges of registers.
+  def findFreeRuns(self):
+    del self.freeStarts[:]
+    del self.freeEnds[:]
+    pool = self.pool
+    start = pool.find(self.statusAvailable)
+    while start != -1:
+      end = start + 1
+      while end < len(pool) and pool[end] == self.statusAvailable:
+        end += 1
+      self.freeStarts.append(start)
+      self.freeEnds.append(end)
+      start = pool.find(self.statusAvailable, end)
+    self.numAvailable = pool.count(self.statusAvailable)
+
+  def setStatus(self, start, stop, status):
+    self.pool[start:stop] = bytearray([status]) * (stop-start)
 
   ########################################
   # Adds registers to the pool so they can be used as temps
@@ -124,18 +159,18 @@ class RegisterPool:
     newSize = start + size
     oldSize = len(self.pool)
     if newSize > oldSize:
-      for i in range(0, newSize-oldSize):
-        self.pool.addInst(self.Register(self.statusUnAvailable,tag))
+      self.pool.extend(bytearray([self.statusUnAvailable]) * (newSize-oldSize))
     # mark as available
     for i in range(start, start+size):
-      if self.pool[i].status == self.statusUnAvailable:
-        self.pool[i].status = self.statusAvailable
-      elif self.pool[i].status == self.statusAvailable:
+      if self.pool[i] == self.statusUnAvailable:
+        self.pool[i] = self.statusAvailable
+      elif self.pool[i] == self.statusAvailable:
         printWarning("RegisterPool::add(%u,%u) pool[%u] already available" % (start, size, i))
-      elif self.pool[i].status == self.statusInUse:
+      elif self.pool[i] == self.statusInUse:
         printWarning("RegisterPool::add(%u,%u) pool[%u] already in use" % (start, size, i))
       else:
-        printExit("RegisterPool::add(%u,%u) pool[%u] = %s" % (start, size, i, self.pool[i].status))
+        printExit("RegisterPool::add(%u,%u) pool[%u] = %s" % (start, size, i, self.pool[i]))
+    self.findFreeRuns()
     if self.printRP:
       print(self.state())
   ########################################
@@ -150,51 +185,55 @@ class RegisterPool:
     if newSize > oldSize:
       printWarning("RegisterPool::remove(%u,%u) but poolSize=%u" % (start, size, oldSize))
     # mark as unavailable
-    for i in range(start, start+size):
-      if  self.pool[i].status == self.statusAvailable:
-        self.pool[i].status = self.statusUnAvailable
-      elif self.pool[i].status == self.statusUnAvailable:
+    for i in range(start, min(newSize, oldSize)):
+      if  self.pool[i] == self.statusAvailable:
+        self.pool[i] = self.statusUnAvailable
+      elif self.pool[i] == self.statusUnAvailable:
         printWarning("RegisterPool::remove(%u,%u) pool[%u] already unavailable" % (start, size, i))
-      elif  self.pool[i].status == self.statusInUse:
+      elif  self.pool[i] == self.statusInUse:
         printWarning("RegisterPool::remove(%u,%u) pool[%u] still in use" % (start, size, i))
       else:
-        printExit("RegisterPool::remove(%u,%u) pool[%u] = %s" % (start, size, i, self.pool[i].status))
+        printExit("RegisterPool::remove(%u,%u) pool[%u] = %s" % (start, size, i, self.pool[i]))
+    self.findFreeRuns()
 
   ########################################
   # Check Out
   def checkOut(self, size, tag="", preventOverflow=False):
     return self.checkOutAligned(size, 1, tag, preventOverflow)
-  
+
   def checkOutAligned(self, size, alignment, tag="", preventOverflow=False):
     assert(size > 0)
     assert(self.type != 's') # use getTmpSgpr instead of checkout
+    # first aligned start of a run of available registers which fits size
     found = -1
-    for i in range(0, len(self.pool)):
-      # alignment
-      if i % alignment != 0:
-        continue
-      # enough space
-      if i + size > len(self.pool):
-        continue
-      # all available
-      allAvailable = True
-      for j in range(0, size):
-        if self.pool[i+j].status != self.statusAvailable:
-          allAvailable = False
-          i = j+1
-          break
-      if allAvailable:
-        found = i
+    freeStarts = self.freeStarts
+    freeEnds = self.freeEnds
+    for runIdx in range(0, len(freeStarts)):
+      start = freeStarts[runIdx]
+      if start % alignment:
+        start += alignment - start % alignment
+      if start + size <= freeEnds[runIdx]:
+        found = start
         break
-      else:
-        continue
 
     # success without overflowing
     if found > -1:
       #print "Found: %u" % found
-      for i in range(found, found+size):
-        self.pool[i].status = self.statusInUse
-      self.checkOutSize[found] = size
+      self.setStatus(found, found+size, self.statusInUse)
+      end = freeEnds[runIdx]
+      # split the run around the checked out registers
+      if freeStarts[runIdx] < found:
+        freeEnds[runIdx] = found
+        if found + size < end:
+          freeStarts.insert(runIdx+1, found + size)
+          freeEnds.insert(runIdx+1, end)
+      elif found + size < end:
+        freeStarts[runIdx] = found + size
+      else:
+        del freeStarts[runIdx]
+        del freeEnds[runIdx]
+      self.numAvailable -= size
+      self.checkedOut(found, size, tag)
       if self.printRP:
         print("RP::checkOut '%s' (%u,%u) @ %u avail=%u"%(tag, size,alignment, found, self.available()))
         #print self.state()
@@ -204,40 +243,49 @@ class RegisterPool:
       #print "RegisterPool::checkOutAligned(%u,%u) overflowing past %u" % (size, alignment, len(self.pool))
       # where does tail sequence of available registers begin
       assert (not preventOverflow)
-      start = len(self.pool)
-      for i in range(len(self.pool)-1, 0, -1):
-        if self.pool[i].status == self.statusAvailable:
-          start = i
-          continue
-        else:
-          break
+      oldSize = len(self.pool)
+      start = oldSize
+      if freeEnds and freeEnds[-1] == oldSize:
+        start = max(freeStarts[-1], 1)
       #print "Start: ", start
       # move forward for alignment
-      
+
       start = roundUpToNearestMultiple(start,alignment)
       #print "Aligned Start: ", start
-      # new checkout can begin at start
+      # new checkout can begin at start, registers skipped for alignment past
+      # the end of the pool are left in use
       newSize = start + size
-      oldSize = len(self.pool)
       overflow = newSize - oldSize
       #print "Overflow: ", overflow
-      for i in range(start, len(self.pool)):
-        self.pool[i].status = self.statusInUse
-      for i in range(0, overflow):
-        self.pool.append(self.Register(self.statusInUse,tag))
-      self.checkOutSize[start] = size
+      if start < oldSize:
+        self.numAvailable -= oldSize - start
+        if freeStarts[-1] < start:
+          freeEnds[-1] = start
+        else:
+          del freeStarts[-1]
+          del freeEnds[-1]
+      self.setStatus(min(start, oldSize), oldSize, self.statusInUse)
+      self.pool.extend(bytearray([self.statusInUse]) * overflow)
+      self.numOverflows += 1
+      self.checkedOut(start, size, tag, max(start - oldSize, 0))
       if self.printRP:
         print(self.state())
         print("RP::checkOut' %s' (%u,%u) @ %u (overflow)"%(tag, size, alignment, start))
       return start
 
+  def checkedOut(self, start, size, tag, padding=0):
+    self.checkOutSize[start] = size
+    self.checkOutTag[start] = tag
+    self.numInUse += size + padding
+    self.peakInUse = max(self.peakInUse, self.numInUse)
+    if self.printRP:
+      self.trace.append("checkOut '%s' %u @ %u, %u in use" % (tag, size, start, self.numInUse))
+
   def initTmps(self, initValue, start=0, stop=-1):
     kStr = ""
     stop= len(self.pool) if stop== -1 or stop>len(self.pool) else stop+1
-    for i in range(start, stop):
-      #if self.type == 's':
-      #  print i, self.pool[i].status
-      if self.pool[i].status==self.statusAvailable:
+    for runStart, runEnd in zip(self.freeStarts, self.freeEnds):
+      for i in range(max(runStart, start), min(runEnd, stop)):
         if self.type == 's':
           kStr += inst("s_mov_b32", sgpr(i), hex(initValue), "init tmp in pool")
         elif self.type == 'v':
@@ -253,11 +301,31 @@ class RegisterPool:
     if self.printRP:
       print("RP::checkIn '%s' () @ %u"%(tag, start))
     if start in self.checkOutSize:
-      size = self.checkOutSize[start]
-      for i in range(start, start+size):
-        self.pool[i].status = self.statusAvailable
-      self.checkOutSize.pop(start)
+      size = self.checkOutSize.pop(start)
+      self.checkOutTag.pop(start)
+      end = start + size
+      self.setStatus(start, end, self.statusAvailable)
+      # merge with the runs before and after
+      freeStarts = self.freeStarts
+      freeEnds = self.freeEnds
+      runIdx = bisect.bisect_left(freeStarts, start)
+      mergeBefore = runIdx > 0 and freeEnds[runIdx-1] == start
+      mergeAfter = runIdx < len(freeStarts) and freeStarts[runIdx] == end
+      if mergeBefore and mergeAfter:
+        freeEnds[runIdx-1] = freeEnds[runIdx]
+        del freeStarts[runIdx]
+        del freeEnds[runIdx]
+      elif mergeBefore:
+        freeEnds[runIdx-1] = end
+      elif mergeAfter:
+        freeStarts[runIdx] = start
+      else:
+        freeStarts.insert(runIdx, start)
+        freeEnds.insert(runIdx, end)
+      self.numAvailable += size
+      self.numInUse -= size
       if self.printRP:
+        self.trace.append("checkIn  '%s' %u @ %u, %u in use" % (tag, size, start, self.numInUse))
         print("  RP::checkIn() @ %u +%u"%(start,size))
     else:
       if 0:
@@ -273,11 +341,7 @@ class RegisterPool:
   ########################################
   # Number of available registers
   def available(self):
-    numAvailable = 0
-    for s in self.pool:
-      if s.status == self.statusAvailable:
-        numAvailable += 1
-    return numAvailable
+    return self.numAvailable
 
   ########################################
   # Size of registers of at least specified blockSize
@@ -285,26 +349,35 @@ class RegisterPool:
     if blockSize ==0:
       blockSize = 1
     blocksAvail = 0
-    consecAvailable = 0
-    for s in self.pool:
-      if s.status == self.statusAvailable:
-        consecAvailable += 1
-      else:
-        blocksAvail += consecAvailable // blockSize
-        consecAvailable = 0
-    blocksAvail += consecAvailable // blockSize
+    for runStart, runEnd in zip(self.freeStarts, self.freeEnds):
+      blocksAvail += (runEnd - runStart) // blockSize
     #print self.state()
     #print "available()=", self.available(), "availableBlock()=",maxAvailable
     return blocksAvail * blockSize
 
   ########################################
   def checkFinalState(self):
+    tags = {}
+    for start, size in self.checkOutSize.items():
+      for si in range(start, start+size):
+        tags[si] = self.checkOutTag[start]
     for si in range(0,len(self.pool)):
-      if self.pool[si].status == self.statusInUse:
+      if self.pool[si] == self.statusInUse:
         printWarning("RegisterPool::checkFinalState: temp (%s, '%s') was never checked in." \
-            %(si, self.pool[si].tag))
+            %(si, tags.get(si, "")))
         if self.printRP:
           print(self.state())
+    if self.printRP:
+      print(self.report())
+
+  ########################################
+  # Report
+  # Allocation trace, if printRP, and peak usage of the pool
+  def report(self):
+    reportStr = "\n".join(self.trace + [""])
+    reportStr += "RP::report '%s': %u registers, %u in use at peak, %u overflows" \
+        % (self.type, self.size(), self.peakInUse, self.numOverflows)
+    return reportStr
 
   ########################################
   # State
@@ -323,11 +396,11 @@ class RegisterPool:
             pvs += " "
         stateStr += pvs + "\n"
     for i in range(0, len(self.pool)):
-      if self.pool[i].status == self.statusUnAvailable:
+      if self.pool[i] == self.statusUnAvailable:
         stateStr += "." # 'removed', this indicates a fixed assignment from "remove", ie a non-tmp allocation 
-      elif self.pool[i].status == self.statusAvailable:
+      elif self.pool[i] == self.statusAvailable:
         stateStr += "|" # Can be allocated
-      elif self.pool[i].status == self.statusInUse:
+      elif self.pool[i] == self.statusInUse:
         stateStr += "#" # Checked out
     return stateStr
 
@@ -343,6 +416,7 @@ class KernelWriterAssembly(KernelWriter):
   def __init__( self, kernelMinNaming, kernelSerialNaming ):
     super(KernelWriterAssembly, self).__init__( \
         kernelMinNaming, kernelSerialNaming)
+    self.language = "ASM"
     self.do = {}
 
     self.do["PreLoop"]     = True
@@ -460,8 +534,7 @@ class KernelWriterAssembly(KernelWriter):
     for i in range(85, 128+1): self.vgprOccupancy[i] = 2
     for i in range(129,256+1): self.vgprOccupancy[i] = 1
 
-  def getCompileArgs(self, sourceFileName, objectFileName, *moreArgs):
-    isa = self.version
+  def getIsaCompileArgs(self, isa, *moreArgs):
     archHasV3 = globalParameters["AsmCaps"][isa]["HasCodeObjectV3"]
 
     rv = [globalParameters['AssemblerPath'],
@@ -475,10 +548,19 @@ class KernelWriterAssembly(KernelWriter):
 
     rv += moreArgs
 
-    rv += ['-c', '-o', objectFileName, sourceFileName]
-
     return rv
 
+  def getCompileArgs(self, sourceFileName, objectFileName, *moreArgs):
+    return self.getIsaCompileArgs(self.version, *moreArgs) \
+        + ['-c', '-o', objectFileName, sourceFileName]
+
+  def getBatchCompileArgs(self, isa, sourceFileNames, *moreArgs):
+    """
+    Assembles several kernels in one invocation.  Each object file is written
+    next to its source, so this must run in the assembly directory.
+    """
+    return self.getIsaCompileArgs(isa, *moreArgs) + ['-c'] + sourceFileNames
+
   def getLinkCodeObjectArgs(self, objectFileNames, coFileName, *moreArgs):
     rv = [globalParameters['AssemblerPath'],
           '-target', 'amdgcn-amd-amdhsa']
@@ -489,6 +571,17 @@ class KernelWriterAssembly(KernelWriter):
 
     return rv
 
+  ########################################
+  def getKernelISA(self, kernel):
+    isa = globalParameters["CurrentISA"]
+    if "ISA" in kernel:
+      isa = kernel["ISA"]
+    if not globalParameters["AsmCaps"][isa]["SupportedISA"]:
+      defaultIsa = (9,0,0)
+      print("warning: ISA:", isa, " is not supported; overriding with ", defaultIsa)
+      isa = defaultIsa
+    return isa
+
   ########################################
   def getOccupancy(self, kernel, vgprs):
     multiplier = int(ceil(max(kernel["NumThreads"], 256) / 256.0))
@@ -741,13 +834,7 @@ class KernelWriterAssembly(KernelWriter):
     self.combineLocalAddresses = 0
 
     # ISA version, such as 803
-    self.version = globalParameters["CurrentISA"]
-    if "ISA" in kernel:
-      self.version = kernel["ISA"]
-    if not globalParameters["AsmCaps"][self.version]["SupportedISA"]:
-      defaultIsa = (9,0,0)
-      print("warning: ISA:", self.version, " is not supported; overriding with ", defaultIsa)
-      self.version = defaultIsa
+    self.version = self.getKernelISA(kernel)
 
     self.AsmBugs = {}
     self.AsmBugs["ExplicitCO"] = globalParameters["AsmCaps"][self.version]["HasExplicitCO"]
@@ -884,7 +971,8 @@ class KernelWriterAssembly(KernelWriter):
             print("HighPrecisionAccumulate only valid when DataType is half, Int8x4.")
             self.bpeCinternal = int(self.bpr*\
                 kernel["ProblemType"]["DataType"].numRegisters())
-            kernel["ProblemType"]["HighPrecisionAccumulate"] = False
+            kernel["ProblemType"] = ProblemType.FromConfig( \
+                dict(kernel["ProblemType"].state, HighPrecisionAccumulate=False))
     else:
         self.bpeCinternal = int(self.bpr*\
             kernel["ProblemType"]["DataType"].numRegisters())
@@ -8312,6 +8400,38 @@ class KernelWriterAssembly(KernelWriter):
     waitcnt = Code.WaitCnt(lgkmcnt,vmcnt,comment)
     return waitcnt
 
+  ##############################################################################
+  # Track Dependencies
+  # Replaces the waits of the kernel source with the loosest legal waits
+  # (WaitCntAlg=1) and/or proves the waits cover every use of a loaded
+  # register (CheckWaitCnt).  Uses the static waits of WaitCntAlg=0 miss, such
+  # as the G2L vgprs reused by the global write after skipping the loop when
+  # sizeL==0, are warned about; those the inserted waits miss fail the build.
+  # Returns the kernel source.
+  ##############################################################################
+  def trackDependencies(self, kernel, source):
+    maxVmcnt = globalParameters["AsmCaps"][self.version]["MaxVmcnt"]
+    program = Dependency.Program(source, maxVmcnt)
+    if kernel["WaitCntAlg"] == 1:
+      source = program.insertWaits()
+      if globalParameters["CheckWaitCnt"]:
+        program = Dependency.Program(source, maxVmcnt)
+
+    if globalParameters["CheckWaitCnt"]:
+      violations = program.check()
+      if violations:
+        message = "%s: s_waitcnt miss %u uses of loaded registers:\n%s" \
+            % (self.kernelName, len(violations), "\n".join(violations))
+        if kernel["WaitCntAlg"] == 1:
+          raise RuntimeError(message)
+        printWarning(message)
+      for label, cycles, stallCycles, memoryLatency \
+          in program.latency(Schedule.getLatencies(kernel["ISA"])):
+        hidden = 1.0 - float(stallCycles) / memoryLatency if memoryLatency else 1.0
+        print2("# CheckWaitCnt: %s loop %s: %u cycles, %u stalled, %.0f%% of %u cycles of memory latency hidden" \
+            % (self.kernelName, label, cycles, stallCycles, 100*max(hidden, 0.0), memoryLatency))
+    return source
+
   ##############################################################################
   # SyncThreads
   ##############################################################################
@@ -21,15 +21,22 @@
 
 from .Common import print1, print2, HR, printExit, defaultAnalysisParameters, globalParameters, pushWorkingPath, popWorkingPath, assignParameterWithDefault, startTime, ProgressBar, printWarning
 from .SolutionStructs import Solution
+from . import ResultsIO
 from . import YAMLIO
 
 from copy import deepcopy
 from sys import stdout
 import array
-import csv
+import functools
+import operator
 import os
 import time
 
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
 ################################################################################
 # Analyze Problem Type
 ################################################################################
@@ -67,7 +74,15 @@ def analyzeProblemType( problemType, problemSizeGroups, inputParameters ):
 
   ######################################
   # Create Logic Analyzer
-  logicAnalyzer = LogicAnalyzer( problemType, problemSizesList, solutionsList, \
+  logicAnalyzerClass = LogicAnalyzer
+  if globalParameters["LibraryLogicBackend"] == "NumPy":
+    if np is not None:
+      logicAnalyzerClass = NumPyLogicAnalyzer
+    else:
+      printWarning("LibraryLogicBackend=NumPy but numpy is not installed; using Python backend.")
+  elif globalParameters["LibraryLogicBackend"] != "Python":
+    printExit("Bad LibraryLogicBackend=%s" % globalParameters["LibraryLogicBackend"])
+  logicAnalyzer = logicAnalyzerClass( problemType, problemSizesList, solutionsList, \
       dataFileNameList, inputParameters)
 
   ######################################
@@ -95,7 +110,7 @@ def analyzeProblemType( problemType, problemSizeGroups, inputParameters ):
     for row in range(0, numOther):
       for col in range(0, numCols):
         for sol in range(0, logicAnalyzer.numSolutions):
-         line += "% 5.0f" % logicAnalyzer.data[sol + logicAnalyzer.numSolutions*(col + row*numCols)]
+         line += "% 5.0f" % logicAnalyzer.getGFlops(logicAnalyzer.numSolutions*(col + row*numCols), sol)
         line += "; "
       line += "\n"
     print(line)
@@ -219,12 +234,15 @@ class LogicAnalyzer:
         self.solutionGroupMap[solutionGroupIdx][solutionIdx] = sIdx
         progressBar.increment()
     self.numSolutions = len(self.solutions)
+    # removeSolution only clears a solution's flag; compactSolutions drops them
+    self.solutionActive = [True]*self.numSolutions
+    self.problemRanking = None
+    self.problemWinners = None
+    self.rangeWinners = {}
     self.solutionMinNaming = Solution.getMinNaming(self.solutions)
-    self.solutionNames = []
+    self.solutionNames = Solution.getNamesMin(self.solutions, self.solutionMinNaming)
     self.solutionTiles = []
     for solution in self.solutions:
-      self.solutionNames.append(Solution.getNameMin(solution, \
-          self.solutionMinNaming))
       self.solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
           solution["MacroTile1"]))
     self.flopsPerMac = self.problemType["DataType"].flopsPerMac()
@@ -300,7 +318,7 @@ class LogicAnalyzer:
     print2("TotalSize: %u" % self.totalSize)
     # data is a 2D array [problemIdx][solutionIdx] which stores perf data in gflops for
     # the specified solution
-    self.data = array.array('f', [-2]*self.totalSize)
+    self.data = self.newData(-2)
 
     # Each entry in exactWinners is a 2D array [solutionIdx, perf]
     self.exactWinners = {}
@@ -341,14 +359,19 @@ class LogicAnalyzer:
       self.globalIndexRange.append([0, self.numProblemSizes[i]])
     self.problemIndicesForGlobalRange \
         = self.problemIndicesForRange(self.globalIndexRange)
+    # python ints for exact products, rounded once
+    self.problemFlops = [float(self.totalFlopsForProblemIndices(problemIndices)) \
+        for problemIndices in self.problemIndicesForGlobalRange]
     self.tab = [""]*self.numIndices
 
     ######################################
     # Read Data From CSV
+    tables = ResultsIO.readResultsFiles(dataFileNameList, \
+        [self.numCSVColumns(numSolutions) for numSolutions in self.numSolutionsPerGroup])
     for fileIdx in range(0, len(dataFileNameList)):
       dataFileName = dataFileNameList[fileIdx]
       self.addFromCSV(dataFileName, self.numSolutionsPerGroup[fileIdx], \
-          self.solutionGroupMap[fileIdx])
+          self.solutionGroupMap[fileIdx], tables[fileIdx])
 
 
 
@@ -359,106 +382,118 @@ class LogicAnalyzer:
 
   ##############################################################################
   # ENTRY: Add From CSV
+  # table is the file's data from ResultsIO, read here (from the binary file
+  # next to the csv if there is one) if not given
   ##############################################################################
-  def addFromCSV(self, dataFileName, numSolutions, solutionMap):
-
-    # open file
-    print("reading datafile", dataFileName)
-    try:
-      dataFile = open(dataFileName, "r")
-    except IOError:
-      printExit("Can't open \"%s\" to get data" % dataFileName )
+  def addFromCSV(self, dataFileName, numSolutions, solutionMap, table=None):
 
     # column indices
-    csvFile = csv.reader(dataFile)
     problemSizeStartIdx = 1
     totalSizeIdx = problemSizeStartIdx + self.numIndices
     solutionStartIdx = totalSizeIdx + 1
-    rowLength = solutionStartIdx + numSolutions
+    rowLength = self.numCSVColumns(numSolutions)
 
-    # iterate over rows
-    rowIdx = 0
-    for row in csvFile:
-      rowIdx+=1
-      if rowIdx == 1:
-        continue
+    # open file
+    print("reading datafile", dataFileName)
+    if table is None:
+      try:
+        table = ResultsIO.readResults(dataFileName, rowLength)
+      except IOError:
+        printExit("Can't open \"%s\" to get data" % dataFileName )
+    if len(table) < 1:
+      printExit("CSV File %s only has %u row(s); prior benchmark must not have run long enough to produce data." \
+          % (dataFileName, len(table)+1) )
+
+    # sort rows by problem size
+    exactRows = []
+    exactProblemSizes = []
+    rangeRows = []
+    rangeProblemSerials = []
+    for rowIdx, row in enumerate(ResultsIO.rows(table, problemSizeStartIdx, totalSizeIdx)):
+      problemSize = tuple([int(size) for size in row])
+
+      # Exact Problem Size
+      if problemSize in self.exactProblemSizes:
+        exactRows.append(rowIdx)
+        exactProblemSizes.append(problemSize)
+
+      # Range Problem Size
+      elif problemSize in self.rangeProblemSizes:
+        problemIndices = []
+        for i in range(0, self.numIndices):
+          problemIndices.append(self.problemSizeToIndex[i][problemSize[i]])
+        rangeRows.append(rowIdx)
+        rangeProblemSerials.append(self.indicesToSerial(0, problemIndices))
+
+      # Unknown Problem Size
       else:
-        #if len(row) < rowLength:
-        #  printWarning("CSV File %s row %u doesn't have %u elements; ignoring remainer of file." \
-        #      % (dataFileName, rowIdx, rowLength) )
-        #  break
-
-        # get problem size
-        problemSize = []
-        for i in range(problemSizeStartIdx, totalSizeIdx):
-          problemSize.append(int(row[i]))
-        problemSize = tuple(problemSize)
-
-        # Exact Problem Size
-        if problemSize in self.exactProblemSizes:
-          # solution gflops
-          solutionIdx = 0
-          winnerIdx = -1
-          winnerGFlops = -1
-          for i in range(solutionStartIdx, rowLength):
-            gflops = float(row[i])
-            if gflops > winnerGFlops:
-              winnerIdx = solutionIdx
-              winnerGFlops = gflops
-            solutionIdx += 1
-          if winnerIdx != -1:
-            if problemSize in self.exactWinners:
-              if winnerGFlops > self.exactWinners[problemSize][1]:
-                #print "update exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize], "->", solutionMap[winnerIdx], winnerGFlops
-                self.exactWinners[problemSize] = [solutionMap[winnerIdx], winnerGFlops]
-            else:
-              self.exactWinners[problemSize] = [solutionMap[winnerIdx], winnerGFlops]
-              #print "new exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize]
+        printExit("Huh? %s has ProblemSize %s which isn't in its yaml" \
+            % ( dataFileName, list(problemSize)) )
 
-        # Range Problem Size
-        elif problemSize in self.rangeProblemSizes:
-          problemIndices = []
-          for i in range(0, self.numIndices):
-            problemIndices.append(self.problemSizeToIndex[i][problemSize[i]])
-          serialIdx = self.indicesToSerial(0, problemIndices)
-          # solution gflops
-          solutionIdx = 0
-          for i in range(solutionStartIdx, rowLength):
-            gflops = float(row[i])
-            self.data[serialIdx+solutionMap[solutionIdx]] = gflops
-            solutionIdx += 1
-
-        # Unknown Problem Size
-        else:
-          printExit("Huh? %s has ProblemSize %s which isn't in its yaml" \
-              % ( dataFileName, list(problemSize)) )
-    if rowIdx < 2:
-      printExit("CSV File %s only has %u row(s); prior benchmark must not have run long enough to produce data." \
-          % (dataFileName, rowIdx) )
-    #print self.data
+    solutionMap = [solutionMap[i] for i in range(0, numSolutions)]
+    self.addExactResults(exactProblemSizes, table, exactRows, solutionStartIdx, solutionMap)
+    self.addRangeResults(rangeProblemSerials, table, rangeRows, solutionStartIdx, solutionMap)
+
+  def numCSVColumns(self, numSolutions):
+    return 1 + self.numIndices + 1 + numSolutions
+
+
+  ##############################################################################
+  # Add Exact Results
+  # exact winner for each problem size is the fastest of any file
+  ##############################################################################
+  def addExactResults(self, problemSizes, table, rowIdxs, solutionStartIdx, solutionMap):
+    solutionStopIdx = solutionStartIdx + len(solutionMap)
+    rows = ResultsIO.rows(table, solutionStartIdx, solutionStopIdx)
+    for problemSize, rowIdx in zip(problemSizes, rowIdxs):
+      # solution gflops
+      winnerIdx = -1
+      winnerGFlops = -1
+      for solutionIdx, gflops in enumerate(rows[rowIdx]):
+        if gflops > winnerGFlops:
+          winnerIdx = solutionIdx
+          winnerGFlops = gflops
+      self.addExactWinner(problemSize, winnerIdx, winnerGFlops, solutionMap)
+
+  def addExactWinner(self, problemSize, winnerIdx, winnerGFlops, solutionMap):
+    if winnerIdx != -1:
+      if problemSize in self.exactWinners:
+        if winnerGFlops > self.exactWinners[problemSize][1]:
+          #print "update exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize], "->", solutionMap[winnerIdx], winnerGFlops
+          self.exactWinners[problemSize] = [solutionMap[winnerIdx], winnerGFlops]
+      else:
+        self.exactWinners[problemSize] = [solutionMap[winnerIdx], winnerGFlops]
+        #print "new exact", problemSize, "CSV index=", winnerIdx, self.exactWinners[problemSize]
+
+
+  ##############################################################################
+  # Add Range Results
+  ##############################################################################
+  def addRangeResults(self, problemSerials, table, rowIdxs, solutionStartIdx, solutionMap):
+    solutionStopIdx = solutionStartIdx + len(solutionMap)
+    rows = ResultsIO.rows(table, solutionStartIdx, solutionStopIdx)
+    for problemSerial, rowIdx in zip(problemSerials, rowIdxs):
+      # solution gflops
+      for solutionIdx, gflops in enumerate(rows[rowIdx]):
+        self.setGFlops(problemSerial, solutionMap[solutionIdx], gflops)
 
 
   ##############################################################################
   # ENTRY: Remove Invalid Solutions
   ##############################################################################
   def removeInvalidSolutions(self):
-    #problemIndices = [0]*self.numIndices
-    allSolutionValid = False
-    while not allSolutionValid:
-      invalidIdx = -1
-      for problemIndices in self.problemIndicesForGlobalRange:
-        problemSerial = self.indicesToSerial(0, problemIndices)
-        for solutionIdx in range(0, self.numSolutions):
-          gflops = self.data[problemSerial+solutionIdx]
-          if gflops == 0:
-            invalidIdx = solutionIdx
-            break
-      if invalidIdx >= 0:
-        print1("# Removing Invalid Solution: %u %s" \
-            % (invalidIdx, self.solutionNames[invalidIdx]) )
-        self.removeSolution(invalidIdx)
-      else:
-        allSolutionValid = True
+    invalidIdxs = set()
+    for problemIndices in self.problemIndicesForGlobalRange:
+      problemSerial = self.indicesToSerial(0, problemIndices)
+      for solutionIdx in range(0, self.numSolutions):
+        gflops = self.data[problemSerial+solutionIdx]
+        if gflops == 0:
+          invalidIdxs.add(solutionIdx)
+    for invalidIdx in sorted(invalidIdxs):
+      print1("# Removing Invalid Solution: %u %s" \
+          % (invalidIdx, self.solutionNames[invalidIdx]) )
+      self.removeSolution(invalidIdx)
+    self.compactSolutions()
 
 
   ##############################################################################
@@ -471,7 +506,9 @@ class LogicAnalyzer:
   def removeLeastImportantSolutions(self):
     # Remove least important solutions
     start = time.time()
-    while len(self.solutions) > 1:
+    numSolutions = self.numSolutions
+    numActive = numSolutions
+    while numActive > 1:
       lisTuple = self.leastImportantSolution()
       if lisTuple != None:
         lisIdx = lisTuple[0]
@@ -480,15 +517,18 @@ class LogicAnalyzer:
         lisPercTime = lisTuple[3]
         if lisPercSaved < self.parameters["SolutionImportanceMin"] or lisPercWins == 0:
           print1("# Removing Unimportant Solution %u/%u: %s ( %f%% wins, %f%% ms time, %f%% ms saved" \
-              % (lisIdx, self.numSolutions, self.solutionNames[lisIdx], 100*lisPercWins, 100*lisPercTime, 100*lisPercSaved) )
+              % (lisIdx, numActive, self.solutionNames[lisIdx], 100*lisPercWins, 100*lisPercTime, 100*lisPercSaved) )
           self.removeSolution(lisIdx)
+          numActive -= 1
           continue
         else:
           break
       else: # no more lis, remainders are exact winner
         break
+    self.compactSolutions()
     stop = time.time()
-    print("removeLeastImportantSolutions elapsed time = %.1f secs" % (stop - start))
+    print("removeLeastImportantSolutions elapsed time = %.1f secs (%u/%u solutions removed)" \
+        % (stop - start, numSolutions - self.numSolutions, numSolutions))
 
 
   ##############################################################################
@@ -580,12 +620,13 @@ class LogicAnalyzer:
           currentIndexRange[self.indexOrder[2]][0], \
           currentIndexRange[self.indexOrder[3]][0])
     tab = self.tab[cii]
+    printRules = globalParameters["PrintLevel"] >= 2 # formatting rules is costly
     if globalParameters["PrintLevel"] == 1:
       stdout.write("\n%s"%tab)
     currentIndex = self.indexOrder[currentIndexIndex]
     print2("%senRule(%s)" % (tab, currentIndexRange))
     nextIndexIndex = currentIndexIndex+1
-    nextIndexRange = deepcopy(currentIndexRange)
+    nextIndexRange = [list(r) for r in currentIndexRange]
     isLastIndex = currentIndexIndex == self.numIndices-1
     ruleList = []
 
@@ -643,7 +684,7 @@ class LogicAnalyzer:
           nextIndexRange[currentIndex][0] = problemIndex
           nextIndexRange[currentIndex][1] = problemIndex+1
           winnerIdx = self.winnerForRange(nextIndexRange)
-          initialRule = [ currentIndexRange[currentIndex][0], winnerIdx]
+          initialRule = [ problemIndex, winnerIdx]
           if winnerIdx >= 0:
             break
         if winnerIdx < 0:
@@ -672,9 +713,12 @@ class LogicAnalyzer:
         if nextRule == None:
           printWarning("%sMultiProblem & NotLastIndex :: nextRule==None; returning" % (tab) )
           return None
-        initialRule = [ currentIndexRange[currentIndex][0], nextRule ]
+        initialRule = [ problemIndex, nextRule ]
+      # sizes before the initial rule have no rule of their own, so the
+      # initial rule already extends up to its size
       ruleList.append(initialRule)
-      print2("%sMultiProblem::InitialRuleList=%s" % (tab, ruleList))
+      if printRules:
+        print2("%sMultiProblem::InitialRuleList=%s" % (tab, ruleList))
       if globalParameters["PrintLevel"] == 1:
         stdout.write("#")
 
@@ -683,13 +727,11 @@ class LogicAnalyzer:
       # Append Rules to Initial Rule
       ########################################
       print2("%sMultiProblem::Improving Rule" % tab)
-      for problemIndex in range(currentIndexRange[currentIndex][0]+1, \
+      for problemIndex in range(initialRule[0]+1, \
           currentIndexRange[currentIndex][1]):
         nextIndexRange[currentIndex][0] = problemIndex
         nextIndexRange[currentIndex][1] = problemIndex+1
         priorRule = ruleList[len(ruleList)-1]
-        priorRuleForSize = deepcopy(priorRule)
-        priorRuleForSize[0] = problemIndex
 
         if isLastIndex:
           ########################################
@@ -709,7 +751,8 @@ class LogicAnalyzer:
           ########################################
           # nextRule using enRule()
           nextRule = self.enRule(nextIndexIndex, nextIndexRange)
-          print2("%sMultiProblem::ImproveRule[%u]::NotLastIndex::NextRule=%s for %s; %s" % (tab, problemIndex, nextRule, nextIndexIndex, nextIndexRange))
+          if printRules:
+            print2("%sMultiProblem::ImproveRule[%u]::NotLastIndex::NextRule=%s for %s; %s" % (tab, problemIndex, nextRule, nextIndexIndex, nextIndexRange))
           if nextRule == None:
             ruleList[len(ruleList)-1][0] = problemIndex # NO_UPDATE
             print2("%sUpdating b/c None" % tab)
@@ -775,7 +818,8 @@ class LogicAnalyzer:
               stdout.write(".")
             ruleList[len(ruleList)-1][0] = problemIndex # NO_UPDATE
 
-    print2("%sReturning RuleList: %s" % (tab, ruleList))
+    if printRules:
+      print2("%sReturning RuleList: %s" % (tab, ruleList))
     return ruleList
 
 
@@ -856,14 +900,13 @@ class LogicAnalyzer:
         problemIndices[self.idx1] = j
         problemSerial = self.indicesToSerial(0, problemIndices)
         for sIdx in range(0, self.numSolutions):
-          sss[sIdx] += ",%f" % self.data[problemSerial+sIdx]
+          sss[sIdx] += ",%f" % self.getGFlops(problemSerial, sIdx)
         winnerIdx = 0
         secondIdx = 1
-        winnerGFlops = self.data[problemSerial+0]
+        winnerGFlops = self.getGFlops(problemSerial, 0)
         secondGFlops = 1e-9
         for solutionIdx in range(1, self.numSolutions):
-          solutionSerialIdx = problemSerial + solutionIdx
-          solutionGFlops = self.data[solutionSerialIdx]
+          solutionGFlops = self.getGFlops(problemSerial, solutionIdx)
           if solutionGFlops > winnerGFlops:
             secondIdx = winnerIdx
             secondGFlops = winnerGFlops
@@ -914,50 +957,11 @@ class LogicAnalyzer:
   # Least Important Solution
   ##############################################################################
   def leastImportantSolution(self):
-    solutionImportance = []
-    for i in range(0, self.numSolutions):
-      solutionImportance.append([i, 0, 0, 0, False])
-    problemSizes = [0]*self.numIndices
-    totalSavedMs = 0
-    totalExecMs = 0
-    totalWins = 0
-    for problemIndices in self.problemIndicesForGlobalRange:
-      for i in range(0, self.numIndices):
-        problemSizes[i] = self.problemIndexToSize[i][problemIndices[i]]
-      totalFlops = self.flopsPerMac
-      for size in problemSizes:
-        totalFlops *= size
-
-      problemSerial = self.indicesToSerial(0, problemIndices)
-      winnerIdx = -1
-      winnerGFlops = -1e6
-      secondGFlops = -1e9
-      for solutionIdx in range(0, self.numSolutions):
-        solutionSerialIdx = problemSerial + solutionIdx
-        solutionGFlops = self.data[solutionSerialIdx]
-        if solutionGFlops > winnerGFlops:
-          secondGFlops = winnerGFlops
-          winnerIdx = solutionIdx
-          winnerGFlops = solutionGFlops
-        elif solutionGFlops > secondGFlops:
-          secondGFlops = solutionGFlops 
-
-      winnerTimeMs = totalFlops / winnerGFlops / 1000000.0
-      secondTimeMs = totalFlops / secondGFlops / 1000000.0
-      if winnerGFlops > 0 and secondGFlops > 0:
-        solutionImportance[winnerIdx][1] += (secondTimeMs - winnerTimeMs)
-        totalSavedMs += secondTimeMs - winnerTimeMs
-      if winnerGFlops > 0:
-        solutionImportance[winnerIdx][2] += 1
-        solutionImportance[winnerIdx][3] += winnerTimeMs
-        totalExecMs += winnerTimeMs
-        totalWins += 1
-        if secondGFlops <= 0:
-          solutionImportance[winnerIdx][4] = True # this is only valid solution for this problem size, keep it
-
+    (solutionImportance, totalSavedMs, totalExecMs, totalWins) \
+        = self.getSolutionImportance()
 
     # print data before sorting
-    for i in range(0, self.numSolutions):
+    for i in range(0, len(solutionImportance)):
       print2("[%2u] %s: %e saved, %u wins, %u time, %s" \
           % (solutionImportance[i][0], \
           self.solutionNames[solutionImportance[i][0]], \
@@ -968,7 +972,7 @@ class LogicAnalyzer:
 
     totalSavedMs = max(1, totalSavedMs)
     solutionImportance.sort(key=lambda x: x[1])
-    for i in range(0, self.numSolutions):
+    for i in range(0, len(solutionImportance)):
       solutionIdx = solutionImportance[i][0]
       canRemove = not solutionImportance[i][4] # don't remove if is only win for any size
       for exactProblem in self.exactWinners:
@@ -994,46 +998,167 @@ class LogicAnalyzer:
     return None
 
 
+  ##############################################################################
+  # Solution Importance
+  # returns [solutionIdx, savedMs, wins, execMs, singular] for each active
+  # solution and the totals of savedMs, execMs and wins
+  #
+  # Importance is kept up to date incrementally: each problem keeps its
+  # fastest RankDepth active solutions, and removing a solution only re-ranks
+  # the problems it was ranked in.  Sums of times are re-accumulated in
+  # problem order for the solutions whose problems changed, so they are
+  # identical to summing over all problems from scratch.
+  ##############################################################################
+  RankDepth = 3
+
+  def getSolutionImportance(self):
+    if self.problemRanking is None:
+      self.initRanking()
+
+    for solutionIdx in self.dirtySolutions:
+      wonProblems = sorted([problemIdx for problemIdx in self.rankedProblems[solutionIdx] \
+          if self.problemWinner[problemIdx] == solutionIdx])
+      self.solutionSavedMs[solutionIdx] = sequentialSum( \
+          [self.problemSavedMs[problemIdx] for problemIdx in wonProblems])
+      self.solutionExecMs[solutionIdx] = sequentialSum( \
+          [self.problemWinnerMs[problemIdx] for problemIdx in wonProblems])
+    self.dirtySolutions = set()
+
+    solutionImportance = []
+    totalWins = 0
+    for i in self.activeSolutionIdxs():
+      solutionImportance.append([i, self.solutionSavedMs[i], self.solutionWins[i], \
+          self.solutionExecMs[i], self.solutionSingular[i] > 0])
+      totalWins += self.solutionWins[i]
+    totalSavedMs = sequentialSum(self.problemSavedMs)
+    totalExecMs = sequentialSum(self.problemWinnerMs)
+    return (solutionImportance, totalSavedMs, totalExecMs, totalWins)
+
+
+  ##############################################################################
+  # Ranking of active solutions per problem for getSolutionImportance
+  ##############################################################################
+  def initRanking(self):
+    self.problemRanking = [None]*self.totalProblems
+    self.rankedProblems = [set() for i in range(0, self.numSolutions)]
+    self.problemWinner = [-1]*self.totalProblems
+    self.problemWinnerMs = [0.0]*self.totalProblems
+    self.problemSavedMs = [0.0]*self.totalProblems
+    self.problemSingular = [False]*self.totalProblems
+    self.solutionWins = [0]*self.numSolutions
+    self.solutionSingular = [0]*self.numSolutions
+    self.solutionSavedMs = [0]*self.numSolutions
+    self.solutionExecMs = [0]*self.numSolutions
+    self.dirtySolutions = set(range(0, self.numSolutions))
+    self.updateRanking(range(0, self.totalProblems))
+
+  def resetRanking(self):
+    self.problemRanking = None
+
+  ##############################################################################
+  # Re-rank problems, e.g. after a solution ranked in them was removed
+  def updateRanking(self, problemIdxs):
+    problemIdxs = list(problemIdxs)
+    rankings = self.rankSolutions(problemIdxs, self.activeSolutionIdxs())
+    for problemIdx, ranking in zip(problemIdxs, rankings):
+      # remove prior contribution
+      winnerIdx = self.problemWinner[problemIdx]
+      if winnerIdx >= 0:
+        self.solutionWins[winnerIdx] -= 1
+        if self.problemSingular[problemIdx]:
+          self.solutionSingular[winnerIdx] -= 1
+        self.dirtySolutions.add(winnerIdx)
+      if self.problemRanking[problemIdx] is not None:
+        for solutionIdx in self.problemRanking[problemIdx]:
+          self.rankedProblems[solutionIdx].discard(problemIdx)
+
+      self.problemRanking[problemIdx] = ranking
+      for solutionIdx in ranking:
+        self.rankedProblems[solutionIdx].add(problemIdx)
+
+      problemSerial = problemIdx*self.numSolutions
+      winnerGFlops = self.getGFlops(problemSerial, ranking[0]) if len(ranking) > 0 else -1e6
+      secondGFlops = self.getGFlops(problemSerial, ranking[1]) if len(ranking) > 1 else -1e6
+      totalFlops = self.problemFlops[problemIdx]
+      self.problemWinner[problemIdx] = -1
+      self.problemWinnerMs[problemIdx] = 0.0
+      self.problemSavedMs[problemIdx] = 0.0
+      self.problemSingular[problemIdx] = False
+      if winnerGFlops > 0:
+        winnerIdx = ranking[0]
+        winnerTimeMs = totalFlops / winnerGFlops / 1000000.0
+        self.problemWinner[problemIdx] = winnerIdx
+        self.problemWinnerMs[problemIdx] = winnerTimeMs
+        self.solutionWins[winnerIdx] += 1
+        if secondGFlops > 0:
+          secondTimeMs = totalFlops / secondGFlops / 1000000.0
+          self.problemSavedMs[problemIdx] = secondTimeMs - winnerTimeMs
+        else:
+          self.problemSingular[problemIdx] = True # this is only valid solution for this problem size, keep it
+          self.solutionSingular[winnerIdx] += 1
+        self.dirtySolutions.add(winnerIdx)
+
+  ##############################################################################
+  # Fastest RankDepth solutions of solutionIdxs for each problem, fastest
+  # first and in solution order for ties
+  def rankSolutions(self, problemIdxs, solutionIdxs):
+    rankings = []
+    for problemIdx in problemIdxs:
+      problemSerial = problemIdx*self.numSolutions
+      ranking = []
+      rankGFlops = []
+      for solutionIdx in solutionIdxs:
+        solutionGFlops = self.data[problemSerial+solutionIdx]
+        if solutionGFlops <= -1e6:
+          continue
+        rank = len(ranking)
+        while rank > 0 and solutionGFlops > rankGFlops[rank-1]:
+          rank -= 1
+        if rank < self.RankDepth:
+          ranking.insert(rank, solutionIdx)
+          rankGFlops.insert(rank, solutionGFlops)
+          del ranking[self.RankDepth:]
+          del rankGFlops[self.RankDepth:]
+      rankings.append(ranking)
+    return rankings
+
+
   ##############################################################################
   # Remove Solution
+  # only marks the solution removed; solution indices are unchanged until
+  # compactSolutions()
   ##############################################################################
   def removeSolution(self, removeSolutionIdx):
+    self.solutionActive[removeSolutionIdx] = False
+    if self.problemRanking is not None:
+      self.updateRanking(sorted(self.rankedProblems[removeSolutionIdx]))
 
-    # temporarily move current to old
-    oldSolutions = deepcopy(self.solutions)
-    oldNumSolutions = self.numSolutions
-    oldData = deepcopy(self.data)
-
-    # update solutions
-    self.solutions = []
-    for i in range(0, oldNumSolutions):
-      if i != removeSolutionIdx:
-        self.solutions.append(oldSolutions[i])
-    self.solutionMinNaming = Solution.getMinNaming(self.solutions)
-    self.solutionNames = []
-    self.solutionTiles = []
-    for solution in self.solutions:
-      self.solutionNames.append(Solution.getNameMin(solution, \
-          self.solutionMinNaming))
-      self.solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
-          solution["MacroTile1"]))
-    self.numSolutions = len(self.solutions)
+  def activeSolutionIdxs(self):
+    return [i for i in range(0, self.numSolutions) if self.solutionActive[i]]
 
-    # update data
-    self.totalSize = self.totalProblems * self.numSolutions
-    self.data = array.array('f', [0]*self.totalSize)
-    for problemIndex in range(0, self.totalProblems):
-      newSolutionIdx = 0
-      for oldSolutionIdx in range(0, oldNumSolutions):
-        if oldSolutionIdx != removeSolutionIdx:
-          self.data[problemIndex*self.numSolutions+newSolutionIdx] \
-              = oldData[problemIndex*oldNumSolutions+oldSolutionIdx]
-          newSolutionIdx += 1
 
-    # update exact Winners
+  ##############################################################################
+  # Compact Solutions
+  # drop removed solutions from solutions and data, renumbering the rest
+  ##############################################################################
+  def compactSolutions(self):
+    solutionMapNewToOld = self.activeSolutionIdxs()
+    if len(solutionMapNewToOld) == self.numSolutions:
+      return
+
+    # exact winners move down by one for each removed solution at or below
+    # them, so a removed exact winner maps to the active solution before it
+    solutionMapOldToNew = []
+    numActive = 0
+    for i in range(0, self.numSolutions):
+      if self.solutionActive[i]:
+        numActive += 1
+      solutionMapOldToNew.append(numActive-1)
     for problemSize in self.exactWinners:
-      if self.exactWinners[problemSize][0] >= removeSolutionIdx:
-        self.exactWinners[problemSize][0] -= 1
+      self.exactWinners[problemSize][0] = \
+          solutionMapOldToNew[self.exactWinners[problemSize][0]]
+
+    self.selectSolutions(solutionMapNewToOld)
 
 
   ##############################################################################
@@ -1042,42 +1167,16 @@ class LogicAnalyzer:
   ##############################################################################
   def pruneSolutions(self, keepSolutions):
 
-    removeSolutionIdxList = []
     solutionMapNewToOld = [] # dense mapping
     solutionMapOldToNew = [-1] * self.numSolutions
 
-    # temporarily move current to old
-    oldSolutions = deepcopy(self.solutions)
-    oldNumSolutions = self.numSolutions
-    oldData = deepcopy(self.data)
-    # update solutions
-    self.solutions = []
-    for i in range(0, oldNumSolutions):
+    for i in range(0, self.numSolutions):
       if i in keepSolutions:
+        solutionMapOldToNew[i] = len(solutionMapNewToOld)
         solutionMapNewToOld.append(i)
-        solutionMapOldToNew[i] = len(self.solutions)
-        self.solutions.append(oldSolutions[i])
-      else:
-        removeSolutionIdxList.append(i)
-
-    self.solutionMinNaming = Solution.getMinNaming(self.solutions)
-    self.solutionNames = []
-    self.solutionTiles = []
-    for solution in self.solutions:
-      self.solutionNames.append(Solution.getNameMin(solution, \
-          self.solutionMinNaming))
-      self.solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
-          solution["MacroTile1"]))
-    self.numSolutions = len(self.solutions)
 
-    # update data
-    self.totalSize = self.totalProblems * self.numSolutions
-    self.data = array.array('f', [0]*self.totalSize)
-    for problemIndex in range(0, self.totalProblems):
-      for newSolutionIdx in range(0, self.numSolutions):
-        oldSolutionIdx = solutionMapNewToOld[newSolutionIdx]
-        self.data[problemIndex*self.numSolutions+newSolutionIdx] \
-            = oldData[problemIndex*oldNumSolutions+oldSolutionIdx]
+    # update solutions and data
+    self.selectSolutions(solutionMapNewToOld)
 
     # update exact Winners
     for problemSize in self.exactWinners:
@@ -1092,6 +1191,33 @@ class LogicAnalyzer:
         print(("warning: exactWinner[", problemSize, "] "))
 
 
+  ##############################################################################
+  # Select Solutions
+  # keep only the solutions (and their data) at the old indices in
+  # solutionMapNewToOld, in that order
+  ##############################################################################
+  def selectSolutions(self, solutionMapNewToOld):
+    oldNumSolutions = self.numSolutions
+
+    # update solutions
+    self.solutions = [self.solutions[i] for i in solutionMapNewToOld]
+    self.solutionMinNaming = Solution.getMinNaming(self.solutions)
+    self.solutionNames = Solution.getNamesMin(self.solutions, self.solutionMinNaming)
+    self.solutionTiles = []
+    for solution in self.solutions:
+      self.solutionTiles.append("%ux%u"%(solution["MacroTile0"], \
+          solution["MacroTile1"]))
+    self.numSolutions = len(self.solutions)
+    self.solutionActive = [True]*self.numSolutions
+    self.resetRanking()
+    self.problemWinners = None
+    self.rangeWinners = {}
+
+    # update data
+    self.totalSize = self.totalProblems * self.numSolutions
+    self.data = self.selectData(solutionMapNewToOld, oldNumSolutions)
+
+
   ##############################################################################
   # Score Range For Logic
   ##############################################################################
@@ -1116,7 +1242,7 @@ class LogicAnalyzer:
       if solutionIdx == None:
         printWarning("SolutionIdx = None. This should never happen.")
         continue
-      solutionGFlops = self.data[problemSerial + solutionIdx]
+      solutionGFlops = self.getGFlops(problemSerial, solutionIdx)
       solutionGFlops = max(1E-9, solutionGFlops)
       timeUs = totalFlops / solutionGFlops / 1000
       score += timeUs
@@ -1159,8 +1285,7 @@ class LogicAnalyzer:
     winnerIdx = -1
     winnerGFlops = -1
     for solutionIdx in range(0, self.numSolutions):
-      solutionSerialIdx = problemSerial + solutionIdx
-      solutionGFlops = self.data[solutionSerialIdx]
+      solutionGFlops = self.getGFlops(problemSerial, solutionIdx)
       solutionGFlops = max(1E-9, solutionGFlops)
       if solutionGFlops > winnerGFlops:
         winnerIdx = solutionIdx
@@ -1171,23 +1296,59 @@ class LogicAnalyzer:
 
   ##############################################################################
   # Winner For Range, -1 if nothing benchmarked
+  # enRule asks for the winner of every single problem, so those are all
+  # found in one pass; winners of larger ranges are memoized
   def winnerForRange(self, indexRange):
     if self.numSolutions == 1:
       return 0
-    else:
-      scores = self.scoreRangeForSolutions(indexRange)
-      winnerIdx = 0
-      hasWinner = False
-      for solutionIdx in range(1, self.numSolutions):
-        if scores[solutionIdx] < scores[winnerIdx]:
-          winnerIdx = solutionIdx
-          hasWinner = True
-        elif scores[solutionIdx] > scores[winnerIdx]:
-          hasWinner = True
-        else:
-          pass # still no winner
 
-      return winnerIdx if hasWinner else -1
+    problemIndices = [r[0] for r in indexRange]
+    if all([r[1] == r[0]+1 for r in indexRange]):
+      if self.problemWinners is None:
+        self.problemWinners = self.getProblemWinners()
+      problemSerial = self.indicesToSerial(0, problemIndices)
+      return self.problemWinners[problemSerial // self.numSolutions]
+
+    rangeKey = tuple([tuple(r) for r in indexRange])
+    if rangeKey not in self.rangeWinners:
+      self.rangeWinners[rangeKey] = self.winnerForScores( \
+          self.scoreRangeForSolutions(indexRange))
+    return self.rangeWinners[rangeKey]
+
+
+  ##############################################################################
+  # Winner For Scores, -1 if all scores are the same
+  def winnerForScores(self, scores):
+    winnerIdx = 0
+    hasWinner = False
+    for solutionIdx in range(1, self.numSolutions):
+      if scores[solutionIdx] < scores[winnerIdx]:
+        winnerIdx = solutionIdx
+        hasWinner = True
+      elif scores[solutionIdx] > scores[winnerIdx]:
+        hasWinner = True
+      else:
+        pass # still no winner
+
+    return winnerIdx if hasWinner else -1
+
+
+  ##############################################################################
+  # Winner For each problem in problemIndicesForGlobalRange order
+  def getProblemWinners(self):
+    problemWinners = []
+    scores = [0]*self.numSolutions
+    for problemIdx in range(0, self.totalProblems):
+      problemSerial = problemIdx*self.numSolutions
+      totalFlops = self.problemFlops[problemIdx]
+      for solutionIdx in range(0, self.numSolutions):
+        gflops = self.data[problemSerial+solutionIdx]
+        if gflops > 0:
+          scores[solutionIdx] = totalFlops / gflops / 1000
+        else:
+          scores[solutionIdx] = float("inf")
+      problemWinners.append(self.winnerForScores(scores))
+    return problemWinners
 
 
   ##############################################################################
@@ -1274,7 +1435,7 @@ class LogicAnalyzer:
       problemIndices.append(idx[0])
     moreProblems = True
     while moreProblems:
-      problemIndexList.append(deepcopy(problemIndices))
+      problemIndexList.append(list(problemIndices))
       # next problem
       problemIndices[0] += 1
       for i in range(0, self.numIndices):
@@ -1313,8 +1474,8 @@ class LogicAnalyzer:
   def __getitem__(self, indexTuple):
     indices = indexTuple[0] # in analysis order
     solutionIdx = indexTuple[1]
-    serial = self.indicesToSerial(solutionIdx, indices)
-    return self.data[serial]
+    problemSerial = self.indicesToSerial(0, indices)
+    return self.getGFlops(problemSerial, solutionIdx)
 
 
   ##############################################################################
@@ -1322,8 +1483,29 @@ class LogicAnalyzer:
   def __setitem__(self, indexTuple, value):
     indices = indexTuple[0] # in analysis order
     solutionIdx = indexTuple[1]
-    serial = self.indicesToSerial(solutionIdx, indices )
-    self.data[serial] = value
+    problemSerial = self.indicesToSerial(0, indices)
+    self.setGFlops(problemSerial, solutionIdx, value)
+
+
+  ##############################################################################
+  # Data storage; problemSerial is indicesToSerial(0, problemIndices)
+  def newData(self, value):
+    return array.array('f', [value]*self.totalSize)
+
+  def getGFlops(self, problemSerial, solutionIdx):
+    return self.data[problemSerial + solutionIdx]
+
+  def setGFlops(self, problemSerial, solutionIdx, gflops):
+    self.data[problemSerial + solutionIdx] = gflops
+
+  def selectData(self, solutionMapNewToOld, oldNumSolutions):
+    data = array.array('f', [0]*self.totalSize)
+    for problemIndex in range(0, self.totalProblems):
+      for newSolutionIdx in range(0, self.numSolutions):
+        oldSolutionIdx = solutionMapNewToOld[newSolutionIdx]
+        data[problemIndex*self.numSolutions+newSolutionIdx] \
+            = self.data[problemIndex*oldNumSolutions+oldSolutionIdx]
+    return data
 
 
   ##############################################################################
@@ -1340,6 +1522,184 @@ class LogicAnalyzer:
 
 
 
+################################################################################
+# NumPy LogicAnalyzer
+# data is a (problems x solutions) float32 ndarray whose rows are in
+# problemIndicesForGlobalRange order, and the flops of each problem are
+# computed once.  Winners, importance and range scores are vectorized; sums
+# are accumulated in problem order so results match LogicAnalyzer exactly.
+################################################################################
+class NumPyLogicAnalyzer(LogicAnalyzer):
+
+  def __init__(self, problemType, problemSizesList, solutionsList, \
+      dataFileNameList, inputParameters):
+    LogicAnalyzer.__init__(self, problemType, problemSizesList, solutionsList, \
+        dataFileNameList, inputParameters)
+    self.problemFlops = np.array(self.problemFlops, dtype=np.float64)
+
+  ##############################################################################
+  # Data storage
+  def newData(self, value):
+    return np.full((self.totalProblems, self.numSolutions), value, dtype=np.float32)
+
+  def getGFlops(self, problemSerial, solutionIdx):
+    return float(self.data[problemSerial // self.numSolutions, solutionIdx])
+
+  def setGFlops(self, problemSerial, solutionIdx, gflops):
+    self.data[problemSerial // self.numSolutions, solutionIdx] = gflops
+
+  def selectData(self, solutionMapNewToOld, oldNumSolutions):
+    return self.data[:, solutionMapNewToOld]
+
+  ##############################################################################
+  # Add Exact / Range Results
+  def addExactResults(self, problemSizes, table, rowIdxs, solutionStartIdx, solutionMap):
+    if len(rowIdxs) == 0:
+      return
+    gflops = ResultsIO.block(table, rowIdxs, solutionStartIdx, solutionStartIdx+len(solutionMap))
+    gflops = np.where(np.isnan(gflops), -np.inf, gflops) # never faster, like in python
+    winnerIdxs = np.argmax(gflops, axis=1)
+    winnerGFlops = gflops[np.arange(len(rowIdxs)), winnerIdxs]
+    for problemSize, winnerIdx, winnerGFlop in \
+        zip(problemSizes, winnerIdxs.tolist(), winnerGFlops.tolist()):
+      self.addExactWinner(problemSize, winnerIdx if winnerGFlop > -1 else -1, \
+          winnerGFlop, solutionMap)
+
+  def addRangeResults(self, problemSerials, table, rowIdxs, solutionStartIdx, solutionMap):
+    # a later row for the same problem replaces an earlier one
+    problemRows = dict(zip([problemSerial // self.numSolutions \
+        for problemSerial in problemSerials], rowIdxs))
+    if len(problemRows) == 0:
+      return
+    problemIdxs = list(problemRows.keys())
+    rowIdxs = list(problemRows.values())
+    self.data[np.ix_(problemIdxs, solutionMap)] = \
+        ResultsIO.block(table, rowIdxs, solutionStartIdx, solutionStartIdx+len(solutionMap))
+
+  ##############################################################################
+  # Rows of data and flops for the problems in indexRange, in
+  # problemIndicesForRange order
+  def dataForRange(self, indexRange):
+    shape = self.numProblemSizes[::-1]
+    ranges = tuple([slice(r[0], r[1]) for r in indexRange[::-1]])
+    data = self.data.reshape(shape + [self.numSolutions])[ranges]
+    flops = self.problemFlops.reshape(shape)[ranges]
+    return (data.reshape(-1, self.numSolutions), flops.reshape(-1))
+
+  ##############################################################################
+  # ENTRY: Remove Invalid Solutions
+  def removeInvalidSolutions(self):
+    for invalidIdx in np.flatnonzero((self.data == 0).any(axis=0)).tolist():
+      print1("# Removing Invalid Solution: %u %s" \
+          % (invalidIdx, self.solutionNames[invalidIdx]) )
+      self.removeSolution(invalidIdx)
+    self.compactSolutions()
+
+  ##############################################################################
+  # ENTRY: Keep Winner Solutions
+  def keepWinnerSolutions(self):
+    winners = set()
+    print("problemIndicesForGlobalRange", self.problemIndicesForGlobalRange)
+    if self.totalProblems > 0 and self.numSolutions > 0:
+      winnerIdx = np.argmax(self.data, axis=1)
+      hasWinner = self.data.max(axis=1) > -1e6
+      winners.update(winnerIdx[hasWinner].tolist())
+      if not hasWinner.all():
+        winners.add(-1)
+
+    # Always keep the exact sizes:
+    for exactProblem in self.exactWinners:
+      winners.add(self.exactWinners[exactProblem][0])
+
+    print("Winners", winners)
+    self.pruneSolutions(winners)
+
+  ##############################################################################
+  # Ranking of active solutions per problem
+  def rankSolutions(self, problemIdxs, solutionIdxs):
+    if len(problemIdxs) == 0:
+      return []
+    solutionIdxs = np.array(solutionIdxs, dtype=np.int64)
+    gflops = self.data[np.ix_(problemIdxs, solutionIdxs)]
+    ranks = np.argsort(-gflops, axis=1, kind="stable")[:, :self.RankDepth]
+    ranked = np.take_along_axis(gflops, ranks, axis=1) > -1e6
+    rankings = solutionIdxs[ranks].tolist()
+    if not ranked.all():
+      rankings = [[solutionIdx for solutionIdx, r in zip(ranking, rs) if r] \
+          for ranking, rs in zip(rankings, ranked.tolist())]
+    return rankings
+
+  ##############################################################################
+  # Score Range For Full Logic
+  def scoreRangeForFullLogic(self, depth, indexRange, logic):
+    problemIndicesList = self.problemIndicesForRange(indexRange)
+    solutionIdxs = []
+    for problemIndices in problemIndicesList:
+      solutionIdx = self.getSolutionForProblemIndicesUsingLogic( \
+          problemIndices, logic)
+      if solutionIdx == None:
+        printWarning("SolutionIdx = None. This should never happen.")
+      solutionIdxs.append(-1 if solutionIdx == None else solutionIdx)
+    if len(solutionIdxs) == 0:
+      return 0
+
+    (data, flops) = self.dataForRange(indexRange)
+    solutionIdxs = np.array(solutionIdxs)
+    scored = solutionIdxs >= 0
+    solutionGFlops = data[scored, solutionIdxs[scored]].astype(np.float64)
+    solutionGFlops = np.maximum(1E-9, solutionGFlops)
+    return sequentialSum(flops[scored] / solutionGFlops / 1000)
+
+  ##############################################################################
+  # Winner For Scores, -1 if all scores are the same
+  def winnerForScores(self, scores):
+    if (scores == scores[0]).all():
+      return -1 # still no winner
+    return int(np.argmin(scores))
+
+  ##############################################################################
+  # Winner For each problem, a block of problems at a time
+  ProblemBlockSize = 4096
+
+  def getProblemWinners(self):
+    problemWinners = np.empty(self.totalProblems, dtype=np.int64)
+    for start in range(0, self.totalProblems, self.ProblemBlockSize):
+      stop = min(start + self.ProblemBlockSize, self.totalProblems)
+      gflops = self.data[start:stop].astype(np.float64)
+      flops = self.problemFlops[start:stop]
+      with np.errstate(divide="ignore"):
+        scores = np.where(gflops > 0, flops[:, None] / gflops / 1000, float("inf"))
+      winners = np.argmin(scores, axis=1)
+      winners[(scores == scores[:, :1]).all(axis=1)] = -1
+      problemWinners[start:stop] = winners
+    return problemWinners.tolist()
+
+  ##############################################################################
+  # Score (microseconds) Range For Solutions
+  def scoreRangeForSolutions(self, indexRange):
+    (data, flops) = self.dataForRange(indexRange)
+    if len(flops) == 0:
+      return np.zeros(self.numSolutions)
+    gflops = data.astype(np.float64)
+    # not benchmarked for this size: +inf so that its automatically disqualified
+    with np.errstate(divide="ignore"):
+      timeUs = np.where(gflops > 0, flops[:, None] / gflops / 1000, float("inf"))
+    return np.cumsum(timeUs, axis=0)[-1]
+
+
+################################################################################
+# Sequential Sum
+# sum in order like a python loop; numpy's sum() adds pairwise and python's
+# sum() compensates
+################################################################################
+def sequentialSum(values):
+  if np is not None and isinstance(values, np.ndarray):
+    if len(values) == 0:
+      return 0
+    return float(np.cumsum(values)[-1])
+  return functools.reduce(operator.add, values, 0)
+
+
 ################################################################################
 ################################################################################
 ###
@@ -0,0 +1,237 @@
+################################################################################
+# Copyright (C) 2016-2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from .Common import print1, printWarning, ParallelMap
+
+import itertools
+import os
+import struct
+import time
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+################################################################################
+# Benchmark Results IO
+# The benchmark client writes one row per problem size: problem index, sizes,
+# total flops and the gflops of each solution, after a header row.  Results
+# are read into a table with one row per problem size: a 2D numpy array
+# parsed in bulk if numpy is installed, otherwise a list of row lists.  gflops
+# are float32 values, printed to the csv with enough digits to read them back
+# exactly.
+#
+# The client can also write the same table to a binary file next to the csv:
+#   magic (8 bytes), then uint32 version, numColumns, namesLength, 0
+#   column names, newline separated utf-8
+#   column types, a struct format character per column: I uint32 problem
+#     index and sizes, Q uint64 total flops, f float32 gflops
+#   zero padding to DataAlignment
+#   packed rows of numColumns values
+# all little-endian.  The row count follows from the file size so that a
+# client which didn't finish leaves a readable file, like the csv.  With numpy
+# the binary file is memory-mapped instead of parsed, as a structured array
+# with a field per column.
+################################################################################
+
+ChunkRows = 65536 # rows parsed per numpy call
+
+BinaryExtension = ".bin"
+BinaryMagic = b"TENSILER"
+BinaryVersion = 2
+BinaryTypes = {"I": "<u4", "Q": "<u8", "f": "<f4"}
+BinaryHeader = struct.Struct("<8sIIII")
+DataAlignment = 64
+
+################################################################################
+# Read Results
+# reads the binary file for a csv when it is present and at least as new as
+# the csv, otherwise the csv
+################################################################################
+def readResults(fileName, numColumns):
+  binaryFileName = binaryFileNameFor(fileName)
+  if np is not None and os.path.isfile(binaryFileName) \
+      and (not os.path.isfile(fileName) \
+      or os.path.getmtime(binaryFileName) >= os.path.getmtime(fileName)):
+    try:
+      return readBinary(binaryFileName, numColumns)
+    except ValueError as e:
+      printWarning("%s; reading %s instead." % (e, fileName))
+  return readCSV(fileName, numColumns)
+
+def binaryFileNameFor(fileName):
+  return os.path.splitext(fileName)[0] + BinaryExtension
+
+################################################################################
+# Read CSV
+# numColumns leading columns of each row are read; a row with fewer columns
+# (e.g. from a client which didn't finish) ends the table.
+################################################################################
+def readCSV(fileName, numColumns):
+  with open(fileName, "r") as resultsFile:
+    header = [name.strip() for name in resultsFile.readline().split(",")]
+    if np is None:
+      return parseLines(fileName, resultsFile, numColumns)[0]
+
+    chunks = []
+    while True:
+      lines = list(itertools.islice(resultsFile, ChunkRows))
+      if len(lines) == 0:
+        break
+      try:
+        chunks.append(np.loadtxt(lines, delimiter=",", usecols=range(0, numColumns), \
+            ndmin=2, dtype=np.float64))
+      except ValueError:
+        (rows, complete) = parseLines(fileName, lines, numColumns, len(chunks)*ChunkRows)
+        chunks.append(np.array(rows, dtype=np.float64).reshape(len(rows), numColumns))
+        if not complete:
+          break
+
+  if len(chunks) == 0:
+    return np.zeros((0, numColumns))
+  table = np.concatenate(chunks)
+  # gflops as the float32 values the client measured, like the binary file
+  if "TotalFlops" in header:
+    gflopsIdx = header.index("TotalFlops") + 1
+    table[:, gflopsIdx:] = table[:, gflopsIdx:].astype(np.float32)
+  return table
+
+################################################################################
+# Parse Lines
+# returns the rows and whether all lines were complete
+################################################################################
+def parseLines(fileName, lines, numColumns, firstRowIdx=0):
+  rows = []
+  for lineIdx, line in enumerate(lines):
+    row = line.split(",")
+    if len(row) == 1 and row[0].strip() == "":
+      continue
+    if len(row) < numColumns:
+      # rows are numbered from 1 and after the header, like the CSV file lines
+      printWarning("CSV File %s row %u doesn't have %u elements; ignoring remainer of file." \
+          % (fileName, firstRowIdx + lineIdx + 2, numColumns) )
+      return (rows, False)
+    rows.append([float(value) for value in row[:numColumns]])
+  return (rows, True)
+
+################################################################################
+# Binary Files
+################################################################################
+def readBinaryHeader(fileName):
+  """ Returns the column names, column types and the offset of the first row. """
+  with open(fileName, "rb") as binaryFile:
+    header = binaryFile.read(BinaryHeader.size)
+    if len(header) < BinaryHeader.size:
+      raise ValueError("Binary results file %s is truncated" % fileName)
+    (magic, version, numColumns, namesLength, _) = BinaryHeader.unpack(header)
+    if magic != BinaryMagic or version != BinaryVersion:
+      raise ValueError("%s isn't a version %u binary results file" % (fileName, BinaryVersion))
+    names = binaryFile.read(namesLength).decode("utf-8").split("\n")
+    types = binaryFile.read(numColumns).decode("ascii")
+  if len(names) != numColumns or len(types) != numColumns \
+      or any([t not in BinaryTypes for t in types]):
+    raise ValueError("Binary results file %s doesn't describe its %u columns" \
+        % (fileName, numColumns))
+  return (names, types, alignedSize(BinaryHeader.size + namesLength + numColumns))
+
+def readBinary(fileName, numColumns):
+  """
+  Memory-maps the leading numColumns columns of a binary results file, as a
+  structured array with fields c0, c1, ...; rows are views of the file rather
+  than copies.
+  """
+  (names, types, offset) = readBinaryHeader(fileName)
+  if len(names) < numColumns:
+    raise ValueError("Binary results file %s has %u columns, not %u" \
+        % (fileName, len(names), numColumns))
+  rowType = np.dtype([("c%u" % i, BinaryTypes[t]) for i, t in enumerate(types)])
+  numRows = (os.path.getsize(fileName) - offset) // rowType.itemsize
+  if numRows < 1:
+    return np.zeros((0, numColumns))
+  table = np.memmap(fileName, dtype=rowType, mode="r", offset=offset, shape=(numRows,))
+  return table[list(rowType.names[:numColumns])]
+
+def writeBinary(fileName, names, types, table):
+  """ Writes table, with a column per name and type, as a binary results file. """
+  encodedNames = "\n".join(names).encode("utf-8")
+  header = BinaryHeader.pack(BinaryMagic, BinaryVersion, len(names), len(encodedNames), 0) \
+      + encodedNames + types.encode("ascii")
+  with open(fileName, "wb") as binaryFile:
+    binaryFile.write(header + b"\0"*(alignedSize(len(header)) - len(header)))
+    for row in table:
+      binaryFile.write(struct.pack("<" + types, *row))
+
+def alignedSize(size):
+  return (size + DataAlignment - 1) // DataAlignment * DataAlignment
+
+################################################################################
+# Read Results Files
+# memory-maps binary files and reads csv files concurrently; numColumns has an
+# entry per file
+################################################################################
+def readResultsFiles(fileNames, numColumns):
+  start = time.time()
+  tables = [None]*len(fileNames)
+  csvFileIdxs = []
+  for fileIdx in range(0, len(fileNames)):
+    binaryFileName = binaryFileNameFor(fileNames[fileIdx])
+    if np is not None and os.path.isfile(binaryFileName):
+      tables[fileIdx] = readResults(fileNames[fileIdx], numColumns[fileIdx])
+    else:
+      csvFileIdxs.append(fileIdx)
+  csvTables = ParallelMap(readCSV, [(fileNames[i], numColumns[i]) for i in csvFileIdxs], \
+      "Reading benchmark results", enable=len(csvFileIdxs) > 1, method=lambda x: x.starmap)
+  for fileIdx, table in zip(csvFileIdxs, csvTables):
+    tables[fileIdx] = table
+  elapsed = time.time() - start
+  numRows = sum([len(table) for table in tables])
+  print1("# Read %u rows from %u files in %.1f secs (%.0f rows/sec)" \
+      % (numRows, len(fileNames), elapsed, numRows / max(elapsed, 1e-6)))
+  return tables
+
+################################################################################
+# Table Access
+################################################################################
+def rows(table, start, stop):
+  """ Columns [start, stop) of each row, as lists of python floats. """
+  if np is not None and isinstance(table, np.ndarray):
+    if table.dtype.names is not None:
+      return np.stack([table[name].astype(np.float64) for name in table.dtype.names[start:stop]], \
+          axis=-1).reshape(len(table), -1).tolist()
+    return table[:, start:stop].tolist()
+  return [row[start:stop] for row in table]
+
+def block(table, rowIdxs, start, stop):
+  """ Columns [start, stop) of the rows rowIdxs, as a 2-D numpy array of float64. """
+  if table.dtype.names is not None:
+    selected = table[rowIdxs]
+    return np.stack([selected[name].astype(np.float64) for name in table.dtype.names[start:stop]], \
+        axis=-1).reshape(len(selected), -1)
+  return table[rowIdxs, start:stop].astype(np.float64)
+
+def column(table, idx):
+  """ Column idx as a list of python floats. """
+  if np is not None and isinstance(table, np.ndarray):
+    if table.dtype.names is not None:
+      return table[table.dtype.names[idx]].astype(np.float64).tolist()
+    return table[:, idx].tolist()
+  return [row[idx] for row in table]
@@ -0,0 +1,209 @@
+################################################################################
+# Copyright (C) 2016-2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from . import Code
+
+################################################################################
+# Latency Model
+# Approximate cost per wavefront of each class of instruction, by ISA:
+#   issue:   cycles to issue one instruction
+#   pipe:    cycles the memory pipeline is busy before it accepts the next
+#            instruction of the same class, 0 for ALU instructions
+#   latency: cycles from issue until the result is available
+# Other items are costed as Code.Inst per line of instruction text.
+################################################################################
+DefaultLatencies = {
+  #                     issue pipe latency
+  Code.MacInst:        (4,    0,   8),
+  Code.GlobalReadInst: (4,   16, 500),
+  Code.LocalReadInst:  (4,    8, 120),
+  Code.LocalWriteInst: (4,    8, 120),
+  Code.Inst:           (4,    0,   4),
+  }
+
+Latencies = {
+  (8,0,3): dict(DefaultLatencies),
+  (9,0,0): dict(DefaultLatencies),
+  (9,0,6): dict(DefaultLatencies),
+  (9,0,8): dict(DefaultLatencies),
+  }
+Latencies[(8,0,3)][Code.GlobalReadInst] = (4, 16, 600)
+Latencies[(8,0,3)][Code.LocalReadInst]  = (4,  8, 128)
+Latencies[(8,0,3)][Code.LocalWriteInst] = (4,  8, 128)
+
+def getLatencies(isa):
+  return Latencies.get(tuple(isa), DefaultLatencies)
+
+# memory counter incremented by each class of instruction
+Counters = {
+  Code.GlobalReadInst: "vmcnt",
+  Code.LocalReadInst:  "lgkmcnt",
+  Code.LocalWriteInst: "lgkmcnt",
+  }
+
+def instructionClass(item):
+  for cls in [Code.MacInst, Code.GlobalReadInst, Code.LocalReadInst, Code.LocalWriteInst]:
+    if isinstance(item, cls):
+      return cls
+  return Code.Inst
+
+def instructionCount(item):
+  """ Number of lines of item which are instructions, not comments, labels or directives. """
+  count = 0
+  for line in str(item).splitlines():
+    code = line.split("//")[0].strip()
+    if code and not code.startswith(("/*", "*", ".")) and not code.endswith(":"):
+      count += 1
+  return count
+
+################################################################################
+# Timeline
+# Issues items in order against a latency model.  Outstanding memory
+# operations are tracked per counter, completing in order, so that s_waitcnt
+# stalls until enough of them are done.  Operations issued before the
+# timeline started are assumed to be complete.
+################################################################################
+class Timeline:
+
+  def __init__(self, latencies):
+    self.latencies = latencies
+    self.cycle = 0
+    self.stallCycles = 0
+    self.pipeFree = {}
+    self.outstanding = {"vmcnt": [], "lgkmcnt": []}
+
+  def waitCycle(self, vmcnt, lgkmcnt):
+    """ Cycle at which at most vmcnt and lgkmcnt operations are outstanding. """
+    cycle = 0
+    for counter, count in [("vmcnt", vmcnt), ("lgkmcnt", lgkmcnt)]:
+      completions = self.outstanding[counter]
+      if count != -1 and len(completions) > count:
+        cycle = max(cycle, completions[len(completions)-count-1])
+    return cycle
+
+  def startCycle(self, item, cls=None, counts=None):
+    """
+    Cycle at which item, of class cls if given, could issue next.  counts
+    overrides the (vmcnt, lgkmcnt) of a WaitCnt item.
+    """
+    if isinstance(item, Code.WaitCnt):
+      if counts is None:
+        counts = (item.vmcnt, item.lgkmcnt)
+      return max(self.cycle, self.waitCycle(*counts))
+    if cls is None:
+      cls = instructionClass(item)
+    return max(self.cycle, self.pipeFree.get(cls, 0))
+
+  def issue(self, item, counts=None, cls=None):
+    """ Issues item, costed as class cls if given. """
+    if isinstance(item, Code.Module):
+      for i in item.iterItems():
+        self.issue(i)
+      return
+
+    if cls is None:
+      cls = instructionClass(item)
+    start = self.startCycle(item, cls, counts)
+    self.stallCycles += start - self.cycle
+
+    count = instructionCount(item)
+    (issue, pipe, latency) = self.latencies[cls]
+    self.cycle = start + issue*count
+    if pipe:
+      self.pipeFree[cls] = start + pipe*count
+    if cls in Counters:
+      completions = self.outstanding[Counters[cls]]
+      for i in range(0, count):
+        completions.append(max(completions[-1] if completions else 0, start + latency))
+
+def estimateCycles(items, latencies):
+  """ Returns (cycles to issue items, cycles of that spent stalled). """
+  timeline = Timeline(latencies)
+  for item in items:
+    timeline.issue(item)
+  return (timeline.cycle, timeline.stallCycles)
+
+################################################################################
+# List Schedule
+# Interleaves chains of items, each of which keeps its relative order.
+# after maps the index of a chain to the indices of the chains which must be
+# completely scheduled before its first item.
+#
+# At each step the ready item of the longest latency class is scheduled as
+# early as it can issue, unless another ready item can be issued entirely
+# before then.  Long latency memory operations are so issued as early as their
+# pipelines allow, with ALU work filling the cycles in between.  Modules are
+# scheduled as a whole and take the longest latency class they contain.
+#
+# timeline: continue the given Timeline, e.g. from the previous iteration of a
+#   loop, rather than assume all prior operations are complete.
+# waitCounts: function of a WaitCnt item and the items scheduled before it
+#   returning its (vmcnt, lgkmcnt), for waits whose counts depend on the
+#   schedule.
+################################################################################
+def listSchedule(chains, after, latencies, timeline=None, waitCounts=None):
+  def dominantClass(item):
+    if not isinstance(item, Code.Module):
+      return instructionClass(item)
+    classes = [instructionClass(i) for i in item.iterItems()]
+    return max(classes, key=lambda cls: latencies[cls][2]) if classes else Code.Inst
+
+  def duration(item):
+    items = item.iterItems() if isinstance(item, Code.Module) else [item]
+    return sum([latencies[instructionClass(i)][0] * instructionCount(i) for i in items])
+
+  chainClasses = [[dominantClass(item) for item in chain] for chain in chains]
+  chainDurations = [[duration(item) for item in chain] for chain in chains]
+  heads = [0] * len(chains)
+  if timeline is None:
+    timeline = Timeline(latencies)
+  schedule = []
+  while True:
+    ready = []
+    for c, chain in enumerate(chains):
+      if heads[c] == len(chain) or \
+          any([heads[d] < len(chains[d]) for d in after.get(c, [])]):
+        continue
+      item = chain[heads[c]]
+      cls = chainClasses[c][heads[c]]
+      counts = None
+      if waitCounts is not None and isinstance(item, Code.WaitCnt):
+        counts = waitCounts(item, schedule)
+      start = timeline.startCycle(item, cls, counts)
+      ready.append((-latencies[cls][2], start, c, start + chainDurations[c][heads[c]]))
+    if not ready:
+      break
+
+    first = min(ready)
+    fits = [r for r in ready if r[3] <= first[1] and r is not first]
+    c = min(fits)[2] if fits else first[2]
+
+    item = chains[c][heads[c]]
+    heads[c] += 1
+    counts = None
+    if waitCounts is not None and isinstance(item, Code.WaitCnt):
+      counts = waitCounts(item, schedule)
+    timeline.issue(item, counts)
+    schedule.append(item)
+
+  assert all([heads[c] == len(chain) for c, chain in enumerate(chains)]), \
+      "listSchedule: chains have circular dependencies"
+  return schedule
@@ -216,8 +216,18 @@ class MasterSolutionLibrary:
             kernels = list(itertools.chain(*[s.originalSolution.getKernels() for s in allSolutions]))
             naming = OriginalSolution.getMinNaming(kernels)
 
+        solutions = list(self.solutions.values())
+        names = OriginalSolution.getNamesMin([s.originalSolution.getKernels()[0] for s in solutions], naming)
+        for s, name in zip(solutions, names):
+            s.name = name
+
+    def applyCodeObjects(self, codeObjects):
+        """
+        Records which code object file holds the kernel of each solution.
+        codeObjects: dict of kernel name -> code object file name.
+        """
         for s in list(self.solutions.values()):
-            s.name = OriginalSolution.getNameMin(s.originalSolution.getKernels()[0], naming)
+            s.codeObject = codeObjects.get(s.name, '')
 
     def merge(self, other):
         assert self.__class__ == other.__class__
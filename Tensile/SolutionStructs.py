@@ -19,13 +19,18 @@
 # CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 ################################################################################
 
-import sys,traceback
+import collections,re,sys,traceback
 from .Common import globalParameters, defaultProblemType, assignParameterWithDefault, printExit, assignParameterRequired, defaultSolution, validParameters, print1
 from copy import deepcopy
 import math
 from .Utils import roundUpToNearestMultiple
 from .DataType import DataType
 
+########################################
+# Number of rejected solutions per reason; numbers are elided from the reject
+# message so that all e.g. LDS overflows are tallied together.
+rejectionCounts = collections.Counter()
+
 ########################################
 # Print a reject message :
 def reject(state, *args):
@@ -36,6 +41,8 @@ def reject(state, *args):
     traceback.print_stack(None, 2)
   if state != None:
     state["Valid"] = False
+    if args:
+      rejectionCounts[re.sub(r"\d+", "#", str(args[0]))] += 1
 
 # print a labled variable
 def pvar(state, field):
@@ -50,6 +57,13 @@ def roundupRatio(dividend, divisor):
 class ProblemType:
   operationTypes = ["GEMM", "TensorContraction"]
 
+  # interned instances by the key of their state, and by the key of the
+  # configs they were created from
+  _interned = {}
+  _internedConfigs = {}
+  interned = False
+  _name = None
+
   ########################################
   def __init__(self, config):
     self.state = {}
@@ -93,6 +107,43 @@ class ProblemType:
     ProblemType.assignDerivedParameters(self.state)
 
 
+  ########################################
+  # Returns the shared, immutable instance for the problem type of config,
+  # which may be a config or state dict or a ProblemType.  Identical problem
+  # types are only constructed and have their derived parameters assigned
+  # once; copying or unpickling an interned instance yields the same one.
+  @classmethod
+  def FromConfig(cls, config):
+    if isinstance(config, ProblemType):
+      if config.interned:
+        return config
+      config = config.state
+
+    configKey = ProblemType.stateKey(config)
+    problemType = cls._internedConfigs.get(configKey)
+    if problemType is None:
+      problemType = cls(config)
+      problemType = cls._interned.setdefault(ProblemType.stateKey(problemType.state), problemType)
+      problemType.interned = True
+      cls._internedConfigs[configKey] = problemType
+    return problemType
+
+  ########################################
+  # hashable key of a config or state dict; lists become tuples, and the type
+  # of each value is included so that e.g. True and 1 remain distinct
+  @staticmethod
+  def stateKey(state):
+    return tuple([(key, value.__class__, ProblemType.frozenValue(value)) \
+        for key, value in sorted(state.items())])
+
+  @staticmethod
+  def frozenValue(value):
+    if isinstance(value, list):
+      return tuple([ProblemType.frozenValue(v) for v in value])
+    if isinstance(value, dict):
+      return ProblemType.stateKey(value)
+    return value
+
   ########################################
   def initGEMM(self, config):
     sumIdx = 3 if self["Batched"] else 2
@@ -239,6 +290,11 @@ class ProblemType:
 
   ########################################
   def __str__(self):
+    if self._name is None or not self.interned:
+      self._name = self.getName()
+    return self._name
+
+  def getName(self):
     indexChars = globalParameters["IndexChars"]
     # C dimensions
     name = "C"
@@ -273,8 +329,28 @@ class ProblemType:
     return iter(self.state)
   def __getitem__(self, key):
     return self.state[key]
+  def __contains__(self, key):
+    return key in self.state
   def __setitem__(self, key, value):
+    if self.interned:
+      raise RuntimeError("ProblemType %s is shared and can't be modified" % self)
     self.state[key] = value
+  def __copy__(self):
+    if self.interned:
+      return self
+    rv = ProblemType.__new__(ProblemType)
+    rv.__dict__.update(self.__dict__)
+    return rv
+  def __deepcopy__(self, memo):
+    if self.interned:
+      return self
+    rv = ProblemType.__new__(ProblemType)
+    rv.__dict__.update(deepcopy(self.__dict__, memo))
+    return rv
+  def __reduce_ex__(self, protocol):
+    if self.interned:
+      return (ProblemType.FromConfig, (self.state,))
+    return object.__reduce_ex__(self, protocol)
   def __repr__(self):
     return self.__str__()
   def getAttributes(self):
@@ -551,37 +627,58 @@ def isPackedIndex(ks, index, batchMask=0x3):
 ################################################################################
 class Solution:
 
+  # parameters shown in full names; solutions with the same values for all
+  # of them are the same solution
+  IdentityParameters = frozenset(validParameters) | frozenset(["ProblemType", "MacroTile0", "MacroTile1"])
+  IdentityParameterOrder = tuple(sorted(IdentityParameters))
+  # parameters left out of full names while they have these values, so that
+  # existing solutions keep their names
+  UnnamedDefaults = {"WaitCntAlg": 0}
+  UnnamedDefaultIndices = tuple(zip(map(IdentityParameterOrder.index, sorted(UnnamedDefaults)), \
+      map(UnnamedDefaults.get, sorted(UnnamedDefaults))))
+  ScalarTypes = frozenset([bool, int, float, str, type(None)])
+
   ########################################
   def __init__(self, config):
     self._name = None
-    config = deepcopy(config)
+    self._identity = None
+
+    # most enumerated candidates fail one of the cheap checks in prefilter, so
+    # only copy the config, and assign the derived parameters, of survivors;
+    # the state of a rejected solution shares its values with config
+    self._state = Solution.initialState(config)
+    Solution.assignProblemIndependentDerivedParameters(self._state)
+    valid = Solution.prefilter(self._state)
+    if valid:
+      self._state = Solution.initialState(deepcopy(config))
+    self._state["ProblemType"] = ProblemType.FromConfig(self._state["ProblemType"])
+    if valid:
+      Solution.assignDerivedParameters(self._state)
 
-    self._state = {}
-    # problem type
-    if "ProblemType" in config:
-      self["ProblemType"] = ProblemType(config["ProblemType"])
-    else:
-      self["ProblemType"] = ProblemType(defaultProblemType)
-
-    # assign parameters with defaults
-    for key in defaultSolution:
-      assignParameterWithDefault(self._state, key, config, defaultSolution)
-
-    # assign parameters without defaults
-    for key in config:
-      if key != "ProblemType" and key not in self._state:
-        self._state[key] = config[key]
-    self["Valid"] = True
-    self["AssignedProblemIndependentDerivedParameters"] = False
-    self["AssignedDerivedParameters"] = False
-    Solution.assignDerivedParameters(self._state)
-    self._name = None
+  ########################################
+  # state with defaults for parameters missing from config; the problem type
+  # is left as configured
+  @staticmethod
+  def initialState(config):
+    state = {"ProblemType": config["ProblemType"] if "ProblemType" in config \
+        else defaultProblemType}
+
+    # parameters with defaults, then parameters without defaults
+    state.update(defaultSolution)
+    state.update(config)
+    state["Valid"] = True
+    state["AssignedProblemIndependentDerivedParameters"] = False
+    state["AssignedDerivedParameters"] = False
+    return state
 
   ########################################
   # get a list of kernel parameters for this solution
+  # Kernels are shallow copies which share parameter values (and the interned
+  # ProblemType) with the solution; kernel writers may replace parameters of
+  # a kernel but must not modify values in place.
   def getKernels(self):
-    kernel = deepcopy(self._state)
-    kernel.update({"Kernel": True})
+    kernel = dict(self._state)
+    kernel["Kernel"] = True
     kernels = []
     kernels.append(kernel)
     return kernels
@@ -664,6 +761,110 @@ class Solution:
     # done
     state["AssignedProblemIndependentDerivedParameters"] = True
 
+  ########################################
+  # Cheap first stage of validation, run on the problem-independent derived
+  # parameters before the problem type is constructed and the expensive
+  # assignDerivedParameters.  Checks the
+  # subset of its reject conditions which only depend on user parameters:
+  # tile/workgroup divisibility, vector widths, a lower bound on LDS use and
+  # loop unrolling.  A solution rejected here is also rejected by
+  # assignDerivedParameters, with the same message.
+  @staticmethod
+  def prefilter(state):
+    if not state["Valid"]:
+      return False
+    # ProblemType reports missing data types
+    if "DataType" not in state["ProblemType"]:
+      return True
+
+    dataType = DataType(state["ProblemType"]["DataType"])
+    numThreads = state["NumThreads"]
+    macroTile0 = state["MacroTile0"]
+    macroTile1 = state["MacroTile1"]
+
+    # VectorWidth < 1 and GlobalReadVectorWidth == -1 are defaulted later
+    vectorWidth = state["VectorWidth"]
+    if vectorWidth >= 1:
+      if state["ThreadTile0"] % vectorWidth != 0 \
+          or state["ThreadTile1"] % vectorWidth != 0:
+        reject(state, "ThreadTile0 %u or ThreadTile1 %u not a multiple of VectorWidth %u" \
+            % (state["ThreadTile0"], state["ThreadTile1"], vectorWidth))
+        return False
+      if vectorWidth*dataType.numBytes() > 16:
+        reject(state, "VW * DataType.numBytes() > 16")
+        return False
+    if state["GlobalReadVectorWidth"] != -1 \
+        and state["GlobalReadVectorWidth"]*dataType.numBytes() > 16:
+      reject(state, "GRVW * DataType.numBytes() > 16")
+      return False
+
+    # LocalSplitU
+    numElementsPerWorkGroup = macroTile0*macroTile1
+    if numElementsPerWorkGroup < numThreads:
+      reject(state, "NumElementsPerWorkGroup %u < NumThreads %u; reduce LocalSplitU" \
+          % (numElementsPerWorkGroup, numThreads))
+      return False
+    if state["LocalSplitU"] > 1:
+      if numThreads % macroTile0 != 0:
+        reject(state, "LocalSplitU but NumThreads=%u not divisible by MT0=%u for sideways store" \
+            % (numThreads, macroTile0))
+        return False
+      if numElementsPerWorkGroup % numThreads != 0:
+        reject(state, "LocalSplitU but MT0*MT1=%u elements doesn't divide into NumThreads=%u" \
+            % (numElementsPerWorkGroup, numThreads))
+        return False
+
+    if state["GlobalSplitU"] > 1 and state["LoopTail"] \
+        and not state["GlobalSplitUSummationAssignmentRoundRobin"]:
+      reject(state, "GlobalSplitU and LoopTail require SummationAssignmentRoundRobin=True since strongly breaks Tensile kernel architecture")
+      return False
+
+    if state["DepthU"] == -1 and macroTile0 != macroTile1:
+      reject(state, "DepthU=0 requires square MacroTile")
+      return False
+
+    # the remaining checks need the final DepthU, which is only known up front
+    # if the user chose it
+    depthU = state["DepthU"]
+    if depthU <= 0:
+      return True
+
+    if depthU % (state["PrefetchLocalRead"]+1) != 0:
+      reject(state, "No valid DepthU found")
+      return False
+
+    if state["KernelLanguage"] == "Source" and \
+       state["LdsPadA"] != state["LdsPadB"]:
+      reject(state, "Source KernelLanguage only supports LdsPadA == LdsPadB")
+      return False
+
+    # LdsPad=-1 becomes 0 or VectorWidth, and alignment and the PrefetchGlobalRead
+    # double buffer only add to the size of the A and B buffers
+    ldsPadA = 0 if state["LdsPadA"] == -1 else state["LdsPadA"]
+    ldsPadB = 0 if state["LdsPadB"] == -1 else state["LdsPadB"]
+    ldsNumElementsAB = depthU*(macroTile0+ldsPadA) + depthU*(macroTile1+ldsPadB)
+    ldsNumElementsReduction = state["LocalSplitU"]*macroTile0*macroTile1 if state["LocalSplitU"] > 1 else 0
+    ldsNumElementsOccupancy = (globalParameters["DeviceLDS"] // state["MaxOccupancy"]) // dataType.numBytes()
+    ldsNumElements = max(ldsNumElementsAB, ldsNumElementsReduction, ldsNumElementsOccupancy)
+    ldsSize = ldsNumElements * dataType.numBytes()
+    if ldsSize > globalParameters["MaxLDS"]:
+      reject(state, "Kernel Uses %u > %u bytes of LDS" % ( ldsSize, globalParameters["MaxLDS"]))
+      return False
+
+    loopUnroll = depthU // state["LocalSplitU"]
+    if loopUnroll * state["LocalSplitU"] != depthU:
+      reject(state, "DepthU %u not a multiple of LocalSplitU %u" % (depthU, state["LocalSplitU"]))
+      return False
+    if state["KernelLanguage"] != "Assembly" and state["InnerUnroll"] != 1:
+      reject(state, "InnerUnroll only supported on assembly")
+      return False
+    if loopUnroll // state["InnerUnroll"] < 2:
+      reject(state, "LoopUnroll %u is less than 2" \
+          % (loopUnroll // state["InnerUnroll"]))
+      return False
+
+    return True
+
   ########################################
   # This is the "classic" algorithm which requires that each threads load the same number of bytes
   # Called with tc=A and then with tc=B
@@ -1395,9 +1596,11 @@ class Solution:
     if "LocalSplitU" in state and "DepthU" in state:
       state["LoopUnroll"] = state["DepthU"] // state["LocalSplitU"]
     if state["LoopUnroll"] * state["LocalSplitU"] != state["DepthU"]:
-      state["Valid"] = False
+      reject(state, "DepthU %u not a multiple of LocalSplitU %u" % (state["DepthU"], state["LocalSplitU"]))
     if state["KernelLanguage"] != "Assembly" and state["InnerUnroll"] != 1:
       reject(state, "InnerUnroll only supported on assembly")
+    if state["KernelLanguage"] != "Assembly" and state["WaitCntAlg"] != 0:
+      reject(state, "WaitCntAlg only supported on assembly")
     state["LoopUnroll"] //= state["InnerUnroll"]
     ldl = state["LocalDotLayout"]
     if ldl > 1:
@@ -1596,7 +1799,17 @@ class Solution:
             (state["KernelLanguage"] == "Assembly" and problemType["HighPrecisionAccumulate"]) ):
       state["PersistentKernel"] = 0
 
-    problemType["AssignedDerivedParameters"] = True
+
+  ########################################
+  # Naming
+  # Names are built from tables computed once for a list of solutions or
+  # kernels: the parameters which differ between them (min naming), and the
+  # sorted distinct values of each parameter with their indices (serial
+  # naming).  Solutions are read through their state dicts.
+  ########################################
+  @staticmethod
+  def namingState(obj):
+    return obj._state if isinstance(obj, Solution) else obj
 
   ########################################
   # create a dictionary with booleans on whether to include parameter in name
@@ -1605,29 +1818,20 @@ class Solution:
     # early return
     if len(objs) == 0:
       return {}
-    # determine keys
-    requiredParameters = {}
-    if isinstance(objs[0], Solution):
-      keys = list(objs[0]._state.keys())
-    else:
-      keys = list(objs[0].keys())
+    states = [Solution.namingState(obj) for obj in objs]
+    first = states[0]
+    keys = [key for key in first if key in validParameters]
     # only 1, rather than name being nothing, it'll be everything
-    if len(objs) == 1:
-      for key in keys:
-        if key in list(validParameters.keys()):
-          requiredParameters[key] = False
+    if len(states) == 1:
+      requiredParameters = dict.fromkeys(keys, False)
     else:
+      requiredParameters = dict.fromkeys(first, False)
       for key in keys:
-        required = False
-        if key in list(validParameters.keys()):
-          for i in range(1, len(objs)):
-            if objs[0][key] != objs[i][key]:
-              required = True
-              break
-        if required:
-          requiredParameters[key] = True
-        else:
-          requiredParameters[key] = False
+        value = first[key]
+        for state in states[1:]:
+          if state[key] != value:
+            requiredParameters[key] = True
+            break
     requiredParameters["ProblemType"] = False # always prepended
     requiredParameters["MacroTile0"] = False # always prepended
     requiredParameters["MacroTile1"] = False # always prepended
@@ -1640,87 +1844,128 @@ class Solution:
   ########################################
   @ staticmethod
   def getNameFull(state):
-    requiredParameters = {}
-    for key in state:
-      if key in list(validParameters.keys()):
-        requiredParameters[key] = True
+    unnamedDefaults = Solution.UnnamedDefaults
+    requiredParameters = dict.fromkeys([key for key in state if key in validParameters \
+        and not (key in unnamedDefaults and state[key] == unnamedDefaults[key])], True)
     return Solution.getNameMin(state, requiredParameters)
 
   ########################################
   # Get Name Min
   @ staticmethod
   def getNameMin(state, requiredParameters):
-    name = ""
-    first = True
-    # put problem first
-    if "ProblemType" in state:
-      name += str(state["ProblemType"]) + "_"
-    if "MacroTile0" in state \
-        and "MacroTile1" in state \
-        and "DepthU" in state:
-      name += "%s%ux%ux%u_" \
-          % ( Solution.getParameterNameAbbreviation("MacroTile"), \
-          state["MacroTile0"], state["MacroTile1"], state["DepthU"] )
-    if "LdcEqualsLdd" in state:
-      if state["LdcEqualsLdd"]:
-        name += "SE_"
-      else:
-        name += "SN_"
-    for key in sorted(state.keys()):
-      if key in requiredParameters:
-        if requiredParameters[key]:
-          if not first:
-            name += "_"
+    return Solution.getNamesMin([state], requiredParameters)[0]
+
+  ########################################
+  # Get Names Min: getNameMin of each object
+  @ staticmethod
+  def getNamesMin(objs, requiredParameters):
+    nameKeys = [(key, Solution.getParameterNameAbbreviation(key)) \
+        for key in sorted(requiredParameters) if requiredParameters[key]]
+    macroTileAbbreviation = Solution.getParameterNameAbbreviation("MacroTile")
+    scalarTypes = Solution.ScalarTypes
+    scalarAbbreviations = {}
+
+    names = []
+    for obj in objs:
+      state = Solution.namingState(obj)
+      name = ""
+      # put problem first
+      if "ProblemType" in state:
+        name += str(state["ProblemType"]) + "_"
+      if "MacroTile0" in state \
+          and "MacroTile1" in state \
+          and "DepthU" in state:
+        name += "%s%ux%ux%u_" \
+            % ( macroTileAbbreviation, \
+            state["MacroTile0"], state["MacroTile1"], state["DepthU"] )
+      if "LdcEqualsLdd" in state:
+        if state["LdcEqualsLdd"]:
+          name += "SE_"
+        else:
+          name += "SN_"
+      params = []
+      for (key, keyAbbreviation) in nameKeys:
+        if key in state:
+          value = state[key]
+          if type(value) in scalarTypes:
+            valueAbbreviation = scalarAbbreviations.get((type(value), value))
+            if valueAbbreviation is None:
+              valueAbbreviation = Solution.getParameterValueAbbreviation(value)
+              scalarAbbreviations[(type(value), value)] = valueAbbreviation
           else:
-            first = False
-          name += "%s%s" % ( Solution.getParameterNameAbbreviation(key), \
-              Solution.getParameterValueAbbreviation(state[key]) )
-    return name
+            valueAbbreviation = Solution.getParameterValueAbbreviation(value)
+          params.append(keyAbbreviation + valueAbbreviation)
+      names.append(name + "_".join(params))
+    return names
 
   ########################################
   # create a dictionary of lists of parameter values
   @staticmethod
   def getSerialNaming(objs):
+    scalarTypes = Solution.ScalarTypes
     data = {}
-    for objIdx in range(0, len(objs)):
-      obj = objs[objIdx]
-      for paramName in sorted(obj.keys()):
-        if paramName in list(validParameters.keys()):
-          paramValue = obj[paramName]
-          if paramName in data:
-            if paramValue not in data[paramName]:
+    scalarValues = {}
+    for obj in objs:
+      state = Solution.namingState(obj)
+      for paramName in state:
+        if paramName in validParameters:
+          paramValue = state[paramName]
+          if paramName not in data:
+            data[paramName] = []
+            scalarValues[paramName] = set()
+          # scalars are looked up in a set, other values compared in turn
+          if type(paramValue) in scalarTypes:
+            if paramValue not in scalarValues[paramName]:
+              scalarValues[paramName].add(paramValue)
               data[paramName].append(paramValue)
-          else:
-            data[paramName] = [ paramValue ]
+          elif paramValue not in data[paramName]:
+            data[paramName].append(paramValue)
     maxObjs = 1
     for paramName in data:
       data[paramName] = sorted(data[paramName])
       maxObjs *= len(data[paramName])
     numDigits = len(str(maxObjs))
-    return [ data, numDigits ]
+    # value -> index of the scalar values
+    indices = dict([(paramName, dict([(paramValue, paramValueIdx) \
+        for paramValueIdx, paramValue in reversed(list(enumerate(data[paramName]))) \
+        if type(paramValue) in scalarTypes])) for paramName in data])
+    return [ data, numDigits, indices ]
 
   ########################################
   # Get Name Serial
   @ staticmethod
   def getNameSerial(state, serialNaming):
+    return Solution.getNamesSerial([state], serialNaming)[0]
+
+  ########################################
+  # Get Names Serial: getNameSerial of each object
+  @ staticmethod
+  def getNamesSerial(objs, serialNaming):
+    scalarTypes = Solution.ScalarTypes
     data = serialNaming[0]
     numDigits = serialNaming[1]
-
-    serial = 0
-    multiplier = 1
-    for paramName in sorted(state.keys()):
-      if paramName in list(validParameters.keys()):
-        paramValue = state[paramName]
-        paramData = data[paramName]
-        paramNameMultiplier = len(paramData)
-        if paramValue in paramData:
-          paramValueIdx = paramData.index(paramValue)
-        serial += paramValueIdx * multiplier
-        multiplier *= paramNameMultiplier
-    name = "%s%0*u" % ("S" if isinstance(state, Solution) else "K", \
-        numDigits, serial)
-    return name
-
+    indices = serialNaming[2]
+    params = [(paramName, data[paramName], indices[paramName]) for paramName in sorted(data)]
+
+    names = []
+    for obj in objs:
+      state = Solution.namingState(obj)
+      serial = 0
+      multiplier = 1
+      paramValueIdx = 0
+      for (paramName, paramData, paramIndices) in params:
+        if paramName in state:
+          paramValue = state[paramName]
+          # values missing from the naming keep the previous index
+          if type(paramValue) in scalarTypes:
+            paramValueIdx = paramIndices.get(paramValue, paramValueIdx)
+          elif paramValue in paramData:
+            paramValueIdx = paramData.index(paramValue)
+          serial += paramValueIdx * multiplier
+          multiplier *= len(paramData)
+      names.append("%s%0*u" % ("S" if isinstance(obj, Solution) else "K", \
+          numDigits, serial))
+    return names
 
   ########################################
   @ staticmethod
@@ -1777,7 +2022,10 @@ class Solution:
   def __getitem__(self, key):
     return self._state[key]
   def __setitem__(self, key, value):
-    self._name = None
+    # names and identities only depend on the identity parameters
+    if key in Solution.IdentityParameters:
+      self._name = None
+      self._identity = None
     self._state[key] = value
   def __str__(self):
     if self._name is None:
@@ -1787,12 +2035,57 @@ class Solution:
     return self.__str__()
   def getAttributes(self):
     return deepcopy(self._state)
+
+  ########################################
+  # (hash, values of the identity parameters), the cheap equivalent of
+  # comparing full names.  Missing parameters read as None, which no named
+  # parameter can be set to.
+  def getIdentity(self):
+    if self._identity is None:
+      scalarTypes = Solution.ScalarTypes
+      values = [value if type(value) in scalarTypes else Solution.identityValue(value) \
+          for value in map(self._state.get, Solution.IdentityParameterOrder)]
+      # unnamed, like missing parameters
+      for paramIdx, default in Solution.UnnamedDefaultIndices:
+        if values[paramIdx] == default:
+          values[paramIdx] = None
+      values = tuple(values)
+      self._identity = (hash(values), values)
+    return self._identity
+
+  @staticmethod
+  def identityValue(value):
+    if type(value) in Solution.ScalarTypes:
+      return value
+    if isinstance(value, tuple):
+      return tuple([Solution.identityValue(v) for v in value])
+    if isinstance(value, list):
+      # names abbreviate lists and tuples differently
+      return (list, tuple([Solution.identityValue(v) for v in value]))
+    if isinstance(value, dict):
+      return tuple([(k, Solution.identityValue(value[k])) for k in sorted(value)])
+    if isinstance(value, ProblemType):
+      return str(value)
+    return value
+
+  def __copy__(self):
+    # copies can be modified without affecting the original; parameter values
+    # are still shared
+    rv = Solution.__new__(Solution)
+    rv.__dict__.update(self.__dict__)
+    rv._state = dict(self._state)
+    return rv
+
+  def __getstate__(self):
+    # str hashes differ between interpreters
+    state = self.__dict__.copy()
+    state["_identity"] = None
+    return state
+
   def __hash__(self):
-    return hash(str(self))
-    #return hash(self.getAttributes())
+    return self.getIdentity()[0]
   def __eq__(self, other):
-    #return isinstance(other, Solution) and self.getAttributes() == other.getAttributes()
-    return isinstance(other, Solution) and str(self) == str(other)
+    return isinstance(other, Solution) and self.getIdentity() == other.getIdentity()
   def __ne__(self, other):
     result = self.__eq__(other)
     if result is NotImplemented:
@@ -29,6 +29,7 @@
 #include <iostream>
 #include <iomanip>
 #include <fstream>
+#include <cstdint>
 #include <cstring>
 #include <ctime>
 #include <sys/time.h>
@@ -39,6 +40,7 @@
 TensileTimer timer;
 TensileTimer apiTimer;
 std::ofstream file;
+std::ofstream binaryFile;
 
 // benchmark parameters
 unsigned int deviceIdx;
@@ -798,6 +800,60 @@ bool callLibrary(
 } // callLibrary
 #endif
 
+/*******************************************************************************
+ * binary results file
+ * the results table as packed rows, after a header with the column names and
+ * types: uint32 problem index and sizes, uint64 total flops and float32 gflops;
+ * read with Tensile/ResultsIO.py
+ ******************************************************************************/
+#if Tensile_CLIENT_BENCHMARK
+void openBinaryResults() {
+  if (resultsBinaryFileName[0] == '\0') {
+    return;
+  }
+  const char *ldNames[] = { "LDD", "LDC", "LDA", "LDB" };
+  std::string names = "Problem";
+  for (unsigned int i = 0; i < totalIndices[problemTypeIdx]; i++) {
+    names += "\nSize";
+    names += indexChars[i];
+  }
+  for (unsigned int i = 0; i < numIndicesLD; i++) {
+    names += "\n";
+    names += ldNames[i];
+  }
+  names += "\nTotalFlops";
+  for (unsigned int s = 0; s < numSolutions; s++) {
+    names += "\n";
+    names += solutions[s]._name;
+  }
+
+  // struct format character of each column
+  unsigned int numColumns = 2 + totalIndices[problemTypeIdx] + numIndicesLD + numSolutions;
+  std::string types(1 + totalIndices[problemTypeIdx] + numIndicesLD, 'I');
+  types += 'Q';
+  types.append(numSolutions, 'f');
+
+  // magic, then version, numColumns, namesLength, reserved
+  const unsigned int alignment = 64;
+  unsigned int header[4] = { 2, numColumns, static_cast<unsigned int>(names.size()), 0 };
+  size_t headerSize = 8 + sizeof(header) + names.size() + types.size();
+  types.append((alignment - headerSize % alignment) % alignment, '\0');
+
+  binaryFile.open(resultsBinaryFileName, std::ios::out | std::ios::binary);
+  binaryFile.write("TENSILER", 8);
+  binaryFile.write(reinterpret_cast<const char *>(header), sizeof(header));
+  binaryFile.write(names.data(), names.size());
+  binaryFile.write(types.data(), types.size());
+}
+
+template<typename T>
+void writeBinaryResult(T value) {
+  if (binaryFile.is_open()) {
+    binaryFile.write(reinterpret_cast<const char *>(&value), sizeof(value));
+  }
+}
+#endif
+
 /*******************************************************************************
  * benchmark all solutions for problem size
  * return true if error/invalids
@@ -872,13 +928,17 @@ bool benchmarkAllSolutionsForSize(
   size_t sizeToCopyC = currentMemorySizeC*bytesPerElement[dataTypeIdx];
 
   file << problemIdx << ", " << sizes[0];
+  writeBinaryResult<uint32_t>(problemIdx);
+  writeBinaryResult<uint32_t>(sizes[0]);
   for (unsigned int i = 1; i < totalIndices[problemTypeIdx]+numIndicesLD; i++) {
     file << ", " << sizes[i];
+    writeBinaryResult<uint32_t>(sizes[i]);
   }
   size_t totalFlops = numFlopsPerMac[dataTypeIdx];
   for (unsigned int i = 0; i < totalIndices[problemTypeIdx]; i++) {
     totalFlops *= sizes[i]; }
   file << ", " << totalFlops;
+  writeBinaryResult<uint64_t>(totalFlops);
 
   if (specializeAB) {
     if (initA==5) {
@@ -1286,8 +1346,12 @@ bool benchmarkAllSolutionsForSize(
       gflops = -1.0;
       invalidSolutions.insert(solutionIdx);
     }
-    file << ", " << gflops;
-    solutionPerf[problemIdx][solutionIdx ] = static_cast<float>(gflops);
+    // the csv and binary file hold the same float32 value; 9 significant
+    // digits print it exactly
+    float result = static_cast<float>(gflops);
+    file << ", " << std::setprecision(9) << result;
+    writeBinaryResult<float>(result);
+    solutionPerf[problemIdx][solutionIdx ] = result;
   } // solution loop
 
   if (useGPUTimer) {
@@ -1307,6 +1371,9 @@ bool benchmarkAllSolutionsForSize(
 #endif
   }
   file << std::endl;
+  if (binaryFile.is_open()) {
+    binaryFile.flush();
+  }
 
   return returnInvalids;
 } // benchmark solutions
@@ -1347,6 +1414,7 @@ bool benchmarkProblemSizes(
     file << ", " << solutions[s]._name;
   }
   file << std::endl;
+  openBinaryResults();
 
 #if Tensile_RUNTIME_LANGUAGE_OCL
   if (!numElementsToValidate) {
@@ -1392,8 +1460,11 @@ bool benchmarkProblemSizes(
             << std::setprecision(2) << gpu_time_ms/timeK*(100.0/1000)
             << "% gpu utilization\n";
 
-  // close file
+  // close files; binary file last so it isn't older than the csv
   file.close();
+  if (binaryFile.is_open()) {
+    binaryFile.close();
+  }
   return returnInvalids;
 } // benchmarkProblemSizes
 #endif // benchmark
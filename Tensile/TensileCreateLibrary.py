@@ -26,7 +26,9 @@ from . import Utils
 from . import YAMLIO
 from .Common import globalParameters, HR, print1, print2, printExit, ensurePath, \
                    CHeader, CMakeHeader, assignGlobalParameters, ProgressBar, \
-                   listToInitializer
+                   listToInitializer, printWarning
+from .BuildManifest import BuildManifest
+from .KernelCache import KernelCache
 from .KernelWriterAssembly import KernelWriterAssembly
 from .KernelWriterSource import KernelWriterSource
 from .SolutionStructs import Solution
@@ -42,9 +44,10 @@ import sys
 import time
 
 ################################################################################
-def processKernelSource(kernel, kernelWriterSource, kernelWriterAssembly):
+def processKernelSource(kernel, kernelWriterSource, kernelWriterAssembly, built=None):
     """
     Generate source for a single kernel.
+    built: artifact of an assembly kernel which is already built, see KernelWriter.getSingleCodeObjectFile.
     Returns (error, source, header, kernelName).
     """
     try:
@@ -52,35 +55,152 @@ def processKernelSource(kernel, kernelWriterSource, kernelWriterAssembly):
         # get kernel name
         kernelName = kernelWriter.getKernelName(kernel)
         #sys.stderr.write("kernel:%s\n"% kernelName)
-        (err, src) = kernelWriter.getSourceFileString(kernel)
+        (err, src) = kernelWriter.getSourceFileString(kernel, built)
         header = kernelWriter.getHeaderFileString(kernel)
     except RuntimeError:
         return (1, "", "", kernelName)
 
     return (err, src, header, kernelName)
 
-def getAssemblyCodeObjectFiles(kernels, kernelsBetaOnly, kernelWriterSource, kernelWriterAssembly, outputPath):
+def runBuildCommand(args, cwd=None):
+    """
+    Runs one assembler/linker invocation of the build.  Returns the elapsed time.
+    """
+    start = time.time()
+    subprocess.check_call(args, cwd=cwd)
+    return time.time() - start
+
+def writeAssemblyKernel(kernel, kernelWriterAssembly):
+    """
+    Writes the assembly source of a single kernel, for batched assembly.
+    Returns the kernel name, or None if generation failed; the failure is
+    reported again when processKernelSource regenerates the kernel.
+    """
+    try:
+        kernelWriterAssembly.getKernelObjectAssemblyFile(kernel)
+        return kernelWriterAssembly.getKernelName(kernel)
+    except RuntimeError:
+        return None
+
+def assembleKernelBatches(kernels, kernelWriterAssembly):
+    """
+    Writes the assembly of kernels and assembles them with one assembler
+    invocation per globalParameters["AssembleBatchSize"] kernels of the same
+    ISA.  Returns the names of the kernels whose object files were built.
+    """
+    asmDir = kernelWriterAssembly.getAssemblyDirectory()
+
+    kIter = zip(kernels, itertools.repeat(kernelWriterAssembly))
+    kernelNames = Common.ParallelMap(writeAssemblyKernel, kIter, "Writing assembly kernels", method=lambda x: x.starmap)
+
+    isas = collections.OrderedDict()
+    for kernel, kernelName in zip(kernels, kernelNames):
+        if kernelName is not None:
+            isas.setdefault(kernelWriterAssembly.getKernelISA(kernel), []).append(kernelName)
+
+    batchSize = globalParameters["AssembleBatchSize"]
+    batches = []
+    for isa, isaKernels in isas.items():
+        for idx in range(0, len(isaKernels), batchSize):
+            batch = isaKernels[idx:idx+batchSize]
+            batches.append((batch, kernelWriterAssembly.getBatchCompileArgs(isa, [k + '.s' for k in batch]), \
+                            [kernelWriterAssembly.getBatchCompileArgs(isa, [k + '.s']) for k in batch], asmDir))
+
+    builtBatches = Common.ParallelMap(assembleKernelBatch, batches, "Assembling kernels", method=lambda x: x.starmap)
+
+    return set(itertools.chain(*builtBatches))
+
+def assembleKernelBatch(kernelNames, batchArgs, kernelArgs, cwd):
+    """
+    Assembles a batch of kernels with batchArgs.  If that fails, each kernel is
+    assembled on its own with its kernelArgs so that one bad kernel doesn't fail
+    the batch.  Returns the names of the kernels assembled.  Kernels which
+    still fail are left to processKernelSource, which records their errors.
+    """
+    try:
+        runBuildCommand(batchArgs, cwd)
+        return kernelNames
+    except subprocess.CalledProcessError:
+        pass
+
+    built = []
+    for kernelName, args in zip(kernelNames, kernelArgs):
+        try:
+            runBuildCommand(args, cwd)
+            built.append(kernelName)
+        except subprocess.CalledProcessError:
+            printWarning("Assembling kernel %s failed" % kernelName)
+    return built
+
+def getAssemblyCodeObjectLayout(kernels, kernelWriterAssembly):
+    """
+    Returns an OrderedDict of merged code object file name -> (ISA, kernel names).
+    Each architecture is split into up to globalParameters["CodeObjectShards"]
+    code objects of consecutive kernels.
+    """
+    archs = collections.OrderedDict()
+    for k in kernels:
+        if k['KernelLanguage'] == 'Assembly':
+            archs.setdefault(k['ISA'], []).append(kernelWriterAssembly.getKernelName(k))
+
+    layout = collections.OrderedDict()
+    for arch, kernelNames in archs.items():
+        archName = 'gfx'+''.join(map(str,arch))
+        numShards = max(min(globalParameters["CodeObjectShards"], len(kernelNames)), 1)
+        if numShards == 1:
+            layout['TensileLibrary_{}.co'.format(archName)] = (arch, kernelNames)
+            continue
+
+        shardSize = Utils.ceil_divide(len(kernelNames), numShards)
+        for shard in range(numShards):
+            shardKernels = kernelNames[shard*shardSize:(shard+1)*shardSize]
+            if len(shardKernels) > 0:
+                layout['TensileLibrary_{}_{}.co'.format(archName, shard)] = (arch, shardKernels)
+
+    return layout
+
+def getAssemblyCodeObjectFiles(kernels, kernelsBetaOnly, kernelWriterSource, kernelWriterAssembly, outputPath, \
+                               kernelKeys=None, buildManifest=None):
+    """
+    kernelKeys: KernelCache keys by kernel name; the link of a code object is
+        skipped or cached only if all of its kernels are keyed.
+    """
     destDir = ensurePath(os.path.join(outputPath, 'library'))
     asmDir = kernelWriterAssembly.getAssemblyDirectory()
 
     if globalParameters["MergeFiles"]:
-        archs = collections.defaultdict(list)
-        for k in kernels:
-            archs[k['ISA']].append(k)
+        kernelCache = kernelWriterAssembly.kernelCache
 
         coFiles = []
-        for arch, archKernels in archs.items():
-            objectFiles = list([os.path.join(asmDir, kernelWriterAssembly.getKernelName(k) + '.o') \
-                                for k in archKernels \
-                                if k['KernelLanguage'] == 'Assembly'])
-            if len(objectFiles) == 0:
+        links = []
+        for coName, (arch, kernelNames) in getAssemblyCodeObjectLayout(kernels, kernelWriterAssembly).items():
+            objectFiles = list([os.path.join(asmDir, k + '.o') for k in kernelNames])
+            coFile = os.path.join(destDir, coName)
+            coFiles.append(coFile)
+
+            linkKey = None
+            if kernelKeys is not None and all([k in kernelKeys for k in kernelNames]):
+                linkKey = KernelCache.linkKey(arch, [kernelKeys[k] for k in kernelNames])
+
+            if linkKey is not None and buildManifest is not None \
+                    and buildManifest.codeObjectUpToDate(coFile, linkKey):
                 continue
 
-            archName = 'gfx'+''.join(map(str,arch))
-            coFile = os.path.join(destDir, 'TensileLibrary_{}.co'.format(archName))
-            args = kernelWriterAssembly.getLinkCodeObjectArgs(objectFiles, coFile)
-            subprocess.check_call(args)
-            coFiles.append(coFile)
+            if linkKey is not None and kernelCache is not None:
+                kernelCache.probe([linkKey])
+                if kernelCache.fetch(linkKey, {'.co': coFile}):
+                    continue
+
+            links.append((coFile, linkKey, kernelWriterAssembly.getLinkCodeObjectArgs(objectFiles, coFile)))
+
+        # code objects are independent, link them concurrently
+        linkTimes = Common.ParallelMap(runBuildCommand, [args for (coFile, linkKey, args) in links], \
+                                       "Linking code objects")
+
+        if kernelCache is not None:
+            for (coFile, linkKey, args), linkTime in zip(links, linkTimes):
+                if linkKey is not None:
+                    kernelCache.store(linkKey, {'.co': coFile}, linkTime)
 
         return coFiles
 
@@ -227,7 +347,7 @@ def buildKernelSourceAndHeaderFiles(results, outputPath, kernelsWithBuildErrs, \
 # Write Solutions and Kernels for BenchmarkClient or LibraryClient
 ################################################################################
 def writeSolutionsAndKernels(outputPath, problemTypes, solutions, kernels, kernelsBetaOnly, \
-    solutionWriter, kernelWriterSource, kernelWriterAssembly):
+    solutionWriter, kernelWriterSource, kernelWriterAssembly, buildManifest=None):
   start = time.time()
 
   codeObjectFiles = []
@@ -263,7 +383,44 @@ def writeSolutionsAndKernels(outputPath, problemTypes, solutions, kernels, kerne
 
   prepAsm()
 
-  kIter = zip(kernels, itertools.repeat(kernelWriterSource), itertools.repeat(kernelWriterAssembly))
+  kernelCache = KernelCache.FromGlobalParameters()
+  kernelWriterAssembly.kernelCache = kernelCache
+
+  # keys must be computed before kernel generation, which may modify the kernel
+  kernelKeys = {}
+  if kernelCache is not None or buildManifest is not None:
+    for kernel in kernels:
+      if kernel["KernelLanguage"] == "Assembly":
+        kernelName = kernelWriterAssembly.getKernelName(kernel)
+        kernelKeys[kernelName] = KernelCache.kernelKey(kernel, kernelName, \
+            kernelWriterAssembly.getReplacementKernelPath(kernel))
+
+  # artifact already built for each assembly kernel, by kernel name
+  built = {}
+  if buildManifest is not None:
+    asmDir = kernelWriterAssembly.getAssemblyDirectory()
+    for kernelName, key in kernelKeys.items():
+      if buildManifest.kernelUpToDate(kernelName, key, asmDir):
+        built[kernelName] = ".co"
+    print1("# Incremental: %u/%u assembly kernels up to date" % (len(built), len(kernelKeys)))
+
+  cachedKernels = set()
+  if kernelCache is not None:
+    cacheHits = kernelCache.probe([key for kernelName, key in kernelKeys.items() if kernelName not in built])
+    cachedKernels = set([kernelName for kernelName, key in kernelKeys.items() if key in cacheHits])
+
+  if globalParameters["AssembleBatchSize"] > 0:
+    # kernels which need building are assembled in batches here, processKernelSource then only links them
+    batchKernels = [kernel for kernel in kernels if kernel["KernelLanguage"] == "Assembly" \
+        and kernelWriterAssembly.getKernelName(kernel) not in built \
+        and kernelWriterAssembly.getKernelName(kernel) not in cachedKernels]
+    for kernelName in assembleKernelBatches(batchKernels, kernelWriterAssembly):
+      built[kernelName] = ".o"
+
+  kernelsBuilt = [built.get(kernelWriterAssembly.getKernelName(kernel)) \
+                  if kernel["KernelLanguage"] == "Assembly" else None for kernel in kernels]
+
+  kIter = zip(kernels, itertools.repeat(kernelWriterSource), itertools.repeat(kernelWriterAssembly), kernelsBuilt)
   results = Common.ParallelMap(processKernelSource, kIter, "Generating kernels", method=lambda x: x.starmap)
   print(len(results))
 
@@ -307,11 +464,16 @@ def writeSolutionsAndKernels(outputPath, problemTypes, solutions, kernels, kerne
 
   if globalParameters["BuildCodeObjects"]:
     codeObjectFiles += buildSourceCodeObjectFiles(kernelFiles, kernels + kernelsBetaOnly, outputPath)
-    codeObjectFiles += getAssemblyCodeObjectFiles(kernels, kernelsBetaOnly, kernelWriterSource, kernelWriterAssembly, outputPath)
+    codeObjectFiles += getAssemblyCodeObjectFiles(kernels, kernelsBetaOnly, kernelWriterSource, kernelWriterAssembly, outputPath, \
+                                                  kernelKeys, buildManifest)
 
   stop = time.time()
   print("# Kernel Building elapsed time = %.1f secs" % (stop-start))
 
+  if kernelCache is not None:
+    kernelCache.report()
+    kernelCache.evict()
+
   print1("# Writing Solutions")
   if globalParameters["ShowProgressBar"]:
     progressBar = ProgressBar(len(solutions))
@@ -472,12 +634,10 @@ def writeLogic(outputPath, logicData, solutionWriter ):
 
 
     # get solution naming for problem type
-    solutionsForProblemType = []
+    solutionsForProblemType = Utils.OrderedRegistry(key=None)
     for scheduleTuple in logicData[problemType]:
       solutionsForSchedule = scheduleTuple[2]
-      for solution in solutionsForSchedule:
-        if solution not in solutionsForProblemType:
-          solutionsForProblemType.append(solution)
+      solutionsForProblemType.extend(solutionsForSchedule)
 
     # solution names for problem type
     solutionNamesForProblemType = []
@@ -896,6 +1056,19 @@ def TensileCreateLibrary():
 
   argParser.add_argument("--embed-library-key",      dest="EmbedLibraryKey", default=None,
                          help="Access key for embedding library files.")
+  argParser.add_argument("--incremental",            dest="Incremental",       action="store_true",
+                         help="Only rebuild what changed since the previous run into OutputPath.")
+  argParser.add_argument("--no-incremental",         dest="Incremental",       action="store_false")
+  argParser.add_argument("--assemble-batch-size",    dest="AssembleBatchSize", type=int, default=0,
+                         help="Assemble this many kernels per assembler invocation (0=one per kernel).")
+  argParser.add_argument("--code-object-shards",     dest="CodeObjectShards", type=int, default=1,
+                         help="Split each architecture's code object into up to this many code objects.")
+  argParser.add_argument("--kernel-cache",           dest="KernelCachePath", default=None,
+                         help="Directory for caching assembled kernels across runs.")
+  argParser.add_argument("--kernel-cache-max-size",  dest="KernelCacheMaxSize", type=int, default=8192,
+                         help="Kernel cache size cap in MiB (0=unlimited).")
+  argParser.add_argument("--library-format",         dest="LibraryFormat", choices=["yaml", "json", "msgpack"], default="yaml",
+                         help="Format of the master solution library file; msgpack also writes the yaml file.")
   args = argParser.parse_args()
 
   logicPath = args.LogicPath
@@ -909,6 +1082,11 @@ def TensileCreateLibrary():
   arguments["LibraryPrintDebug"] = args.LibraryPrintDebug
   arguments["CodeFromFiles"] = False
   arguments["EmbedLibrary"] = args.EmbedLibrary
+  arguments["AssembleBatchSize"] = args.AssembleBatchSize
+  arguments["CodeObjectShards"] = args.CodeObjectShards
+  arguments["KernelCachePath"] = args.KernelCachePath
+  arguments["KernelCacheMaxSize"] = args.KernelCacheMaxSize
+  arguments["LibraryFormat"] = args.LibraryFormat
   assignGlobalParameters(arguments)
 
   globalParameters["BuildCodeObjects"] = True
@@ -927,11 +1105,16 @@ def TensileCreateLibrary():
   ##############################################################################
   # Parse config files
   ##############################################################################
-  solutions = []
+  solutions = Utils.OrderedRegistry(key=None)
   logicData = {} # keys are problemTypes, values are schedules
   newMasterLibrary = None
 
-  libraries = Common.ParallelMap(YAMLIO.readLibraryLogicForSchedule, logicFiles, "Reading logic files")
+  if args.Incremental:
+    buildManifest = BuildManifest(outputPath)
+    libraries = buildManifest.readLogicFiles(logicFiles)
+  else:
+    buildManifest = None
+    libraries = Common.ParallelMap(YAMLIO.readLibraryLogicForSchedule, logicFiles, "Reading logic files")
 
   for logic in Utils.tqdm(libraries, "Processing logic data"):
     (scheduleName, deviceNames, problemType, solutionsForSchedule, \
@@ -941,9 +1124,7 @@ def TensileCreateLibrary():
       logicData[problemType] = []
     logicData[problemType].append((scheduleName, deviceNames, \
         solutionsForSchedule, indexOrder, exactLogic, rangeLogic ))
-    for solution in solutionsForSchedule:
-      if solution not in solutions:
-        solutions.append(solution)
+    solutions.extend(solutionsForSchedule)
 
     if newMasterLibrary is None:
         newMasterLibrary = newLibrary
@@ -951,17 +1132,15 @@ def TensileCreateLibrary():
         newMasterLibrary.merge(newLibrary)
 
   # create solution writer and kernel writer
-  kernels = []
-  kernelsBetaOnly = []
+  kernels = Utils.OrderedRegistry()
+  kernelsBetaOnly = Utils.OrderedRegistry()
   for solution in solutions:
-    solutionKernels = solution.getKernels()
-    for kernel in solutionKernels:
-      if kernel not in kernels:
-        kernels.append(kernel)
-    solutionKernelsBetaOnly = solution.getKernelsBetaOnly()
-    for kernel in solutionKernelsBetaOnly:
-      if kernel not in kernelsBetaOnly:
-        kernelsBetaOnly.append(kernel)
+    kernels.extend(solution.getKernels())
+    kernelsBetaOnly.extend(solution.getKernelsBetaOnly())
+
+  solutions = solutions.list()
+  kernels = kernels.list()
+  kernelsBetaOnly = kernelsBetaOnly.list()
 
   # if any kernels are assembly, append every ISA supported
 
@@ -1001,27 +1180,51 @@ def TensileCreateLibrary():
   codeObjectFiles = writeSolutionsAndKernels(outputPath, problemTypes, solutions,
                                              kernels, kernelsBetaOnly,
                                              solutionWriter,
-                                             kernelWriterSource, kernelWriterAssembly)
+                                             kernelWriterSource, kernelWriterAssembly,
+                                             buildManifest)
 
   # write logic
   writeLogic(outputPath, logicData, solutionWriter)
 
   newLibraryDir = ensurePath(os.path.join(outputPath, 'library'))
   
-  masterFile = os.path.join(newLibraryDir, "TensileLibrary.yaml")
+  libraryFormat = globalParameters["LibraryFormat"]
+  masterFile = os.path.join(newLibraryDir, "TensileLibrary." + ("json" if libraryFormat == "json" else "yaml"))
   newMasterLibrary.applyNaming(kernelMinNaming)
-  YAMLIO.write(masterFile, Utils.state(newMasterLibrary))
+  if globalParameters["MergeFiles"]:
+    codeObjects = dict([(kernelName, coName) \
+        for coName, (arch, kernelNames) in getAssemblyCodeObjectLayout(kernels, kernelWriterAssembly).items() \
+        for kernelName in kernelNames])
+  else:
+    codeObjects = dict([(kernelName, kernelName + '.co') for kernelName in \
+        [kernelWriterAssembly.getKernelName(k) for k in kernels if k['KernelLanguage'] == 'Assembly']])
+  newMasterLibrary.applyCodeObjects(codeObjects)
+  if libraryFormat == "json":
+    YAMLIO.writeJSONStreaming(masterFile, newMasterLibrary)
+  else:
+    YAMLIO.writeStreaming(masterFile, newMasterLibrary)
+
+  # the runtime library tells the formats apart by their first byte
+  embeddedLibraryFile = masterFile
+  if libraryFormat == "msgpack":
+    embeddedLibraryFile = os.path.join(newLibraryDir, "TensileLibrary.dat")
+    YAMLIO.writeMsgPackStreaming(embeddedLibraryFile, newMasterLibrary)
 
   if args.EmbedLibrary is not None:
       embedFileName = os.path.join(outputPath, "library/{}.cpp".format(args.EmbedLibrary))
       with EmbeddedData.EmbeddedDataFile(embedFileName) as embedFile:
-          embedFile.embed_file(newMasterLibrary.cpp_base_class, masterFile, nullTerminated=True,
+          embedFile.embed_file(newMasterLibrary.cpp_base_class, embeddedLibraryFile,
+                               nullTerminated=(embeddedLibraryFile == masterFile),
                                key=args.EmbedLibraryKey)
 
           for co in codeObjectFiles:
               embedFile.embed_file("SolutionAdapter", co, nullTerminated=False,
                                    key=args.EmbedLibraryKey)
 
+  if buildManifest is not None:
+    buildManifest.restoreUnchangedOutputs()
+    buildManifest.write()
+
   print1("# Tensile Library Writer DONE")
   print1(HR)
   print1("")
@@ -0,0 +1,105 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Times de-duplication of solutions and kernels when merging logic files, as
+done by TensileCreateLibrary, for the hash-indexed Utils.OrderedRegistry and
+for the list scans it replaced.
+
+  python -m Tensile.Tests.benchmarks.test_ingestion --solutions 50000
+
+The list scan is quadratic, so it is timed on at most --legacy-limit solutions
+and extrapolated to the full library.
+"""
+
+from __future__ import print_function
+import argparse
+import time
+
+from Tensile import Utils
+from Tensile.UnitTests.LiteConfigs import distinctSolutions
+
+def syntheticLibrary(numSolutions):
+    """
+    numSolutions solutions of which half are distinct, in the order they would be
+    read from two overlapping sets of logic files.
+    """
+    unique = distinctSolutions(max(numSolutions // 2, 1))
+    solutions = unique + unique[::-1]
+    kernels = [dict(s, Kernel=True) for s in solutions]
+    return solutions[:numSolutions], kernels[:numSolutions]
+
+def ingestList(solutions, kernels):
+    uniqueSolutions = []
+    for solution in solutions:
+        if solution not in uniqueSolutions:
+            uniqueSolutions.append(solution)
+    uniqueKernels = []
+    for kernel in kernels:
+        if kernel not in uniqueKernels:
+            uniqueKernels.append(kernel)
+    return uniqueSolutions, uniqueKernels
+
+def ingestRegistry(solutions, kernels):
+    uniqueSolutions = Utils.OrderedRegistry(solutions, key=None)
+    uniqueKernels = Utils.OrderedRegistry(kernels)
+    return uniqueSolutions.list(), uniqueKernels.list()
+
+def timeIngestion(ingest, solutions, kernels):
+    start = time.time()
+    rv = ingest(solutions, kernels)
+    return rv, time.time() - start
+
+def test_ingestion(numSolutions=2000):
+    solutions, kernels = syntheticLibrary(numSolutions)
+    # names are cached; compute them outside of the timed region
+    [str(s) for s in solutions]
+
+    expected, legacyTime = timeIngestion(ingestList, solutions, kernels)
+    actual, registryTime = timeIngestion(ingestRegistry, solutions, kernels)
+    print("%u solutions: list %.2f secs, registry %.2f secs" % (numSolutions, legacyTime, registryTime))
+
+    assert [str(s) for s in actual[0]] == [str(s) for s in expected[0]]
+    assert actual[1] == expected[1]
+    assert len(actual[0]) == numSolutions // 2
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("--solutions",    type=int, default=50000)
+    argParser.add_argument("--legacy-limit", type=int, default=5000, dest="legacyLimit")
+    args = argParser.parse_args()
+
+    solutions, kernels = syntheticLibrary(args.solutions)
+    [str(s) for s in solutions]
+
+    _, registryTime = timeIngestion(ingestRegistry, solutions, kernels)
+    print("registry:  %6u solutions  %8.2f secs" % (len(solutions), registryTime))
+
+    legacyCount = min(args.solutions, args.legacyLimit)
+    legacySolutions, legacyKernels = syntheticLibrary(legacyCount)
+    [str(s) for s in legacySolutions]
+    _, legacyTime = timeIngestion(ingestList, legacySolutions, legacyKernels)
+    scale = (float(len(solutions)) / legacyCount) ** 2
+    print("list scan: %6u solutions  %8.2f secs  (~%.0f secs extrapolated to %u)" \
+        % (legacyCount, legacyTime, legacyTime * scale, len(solutions)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Times generating the assembly source of a sweep of kernel configs, both into
+memory with getKernelSource and streamed straight to a .s file with
+writeKernelSource, and reports generation throughput by kernel size.
+
+Assembler capabilities are normally probed by running the assembler; they are
+set here so that the benchmark runs without ROCm installed.
+
+  python -m Tensile.Tests.benchmarks.test_kernel_generation
+"""
+
+from __future__ import print_function
+import io
+import itertools
+import tempfile
+import time
+
+from Tensile.Common import globalParameters
+from Tensile.KernelWriterAssembly import KernelWriterAssembly
+from Tensile.SolutionStructs import Solution
+
+ProblemTypeConfig = {"OperationType": "GEMM", "DataType": "s", "TransposeA": False, \
+    "TransposeB": True, "UseBeta": True, "Batched": True}
+
+Sweep = {"DataType": ["s", "h"],
+         "WorkGroup": [[16,16,1], [8,8,1]],
+         "ThreadTile": [[4,4], [8,8], [4,8]],
+         "DepthU": [8, 16, 32],
+         "PrefetchGlobalRead": [False, True]}
+
+ISA = (9,0,6)
+
+def setAssemblerCaps():
+    """ Sets assembler and architecture caps for ISA, returns the previous values. """
+    previous = dict([(k, globalParameters.get(k)) for k in ["AsmCaps", "ArchCaps", "CurrentISA"]])
+    globalParameters["AsmCaps"] = {ISA: {"SupportedISA": True, "HasExplicitCO": True, \
+        "HasDirectToLds": True, "HasAddLshl": True, "HasSMulHi": True, \
+        "HasCodeObjectV3": False, "MaxVmcnt": 63}}
+    globalParameters["ArchCaps"] = {ISA: {"HasEccHalf": True}}
+    globalParameters["CurrentISA"] = ISA
+    return previous
+
+def generateKernels(sweep):
+    kernels = []
+    for values in itertools.product(*sweep.values()):
+        config = dict(zip(sweep.keys(), values))
+        config["ProblemType"] = dict(ProblemTypeConfig, DataType=config.pop("DataType"))
+        config.update({"KernelLanguage": "Assembly", "ISA": ISA})
+        solution = Solution(config)
+        if solution["Valid"]:
+            kernels += solution.getKernels()
+    return kernels
+
+def timeGeneration(writer, kernels, generate):
+    times = []
+    for kernel in kernels:
+        start = time.time()
+        size = generate(writer, kernel)
+        times.append((size, time.time() - start))
+    return times
+
+def generateString(writer, kernel):
+    return len(writer.getKernelSource(kernel))
+
+def generateFile(writer, kernel):
+    with tempfile.TemporaryFile("w+") as f:
+        writer.writeKernelSource(kernel, f)
+        return f.tell()
+
+def test_kernel_generation():
+    previous = setAssemblerCaps()
+    try:
+        kernels = generateKernels({"DataType": ["s"], "WorkGroup": [[16,16,1]], \
+            "ThreadTile": [[4,4]], "DepthU": [16], "PrefetchGlobalRead": [True]})
+        assert len(kernels) == 1
+        writer = KernelWriterAssembly(Solution.getMinNaming(kernels), None)
+        source = writer.getKernelSource(kernels[0])
+        assert writer.getKernelName(kernels[0]) in source
+        assert "s_endpgm" in source
+
+        sink = io.StringIO()
+        writer.writeKernelSource(kernels[0], sink)
+        assert sink.getvalue() == source
+    finally:
+        globalParameters.update(previous)
+
+def main():
+    previous = setAssemblerCaps()
+    try:
+        kernels = generateKernels(Sweep)
+        writer = KernelWriterAssembly(Solution.getMinNaming(kernels), None)
+        for name, generate in [("string", generateString), ("file", generateFile)]:
+            times = sorted(timeGeneration(writer, kernels, generate))
+            totalSize = sum([s for s, _ in times])
+            totalTime = sum([t for _, t in times])
+            print("%-6s %u kernels, %.1f MB in %.2f secs" \
+                % (name, len(kernels), totalSize / 1e6, totalTime))
+            # throughput should not fall with kernel size if generation is linear
+            half = len(times) // 2
+            for label, part in [("small", times[:half]), ("large", times[half:])]:
+                print("  %s kernels: %7.0f chars avg, %5.2f MB/s" % (label, \
+                    sum([s for s, _ in part]) / len(part), \
+                    sum([s for s, _ in part]) / sum([t for _, t in part]) / 1e6))
+    finally:
+        globalParameters.update(previous)
+
+if __name__ == "__main__":
+    main()
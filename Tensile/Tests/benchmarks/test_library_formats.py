@@ -0,0 +1,126 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Times loading a master solution library written as YAML and as MessagePack
+by TensileCreateLibrary.  The library is generated by merging the logic files
+in lib/configs (or those given on the command line).
+
+  python -m Tensile.Tests.benchmarks.test_library_formats --repeat 3 [logic dir ...]
+
+The runtime library's loaders are timed by the LibraryFormatTest cases of
+TensileTests, on the SolutionLibraries converted at cmake time.
+"""
+
+from __future__ import print_function
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+import yaml
+
+from Tensile import YAMLIO
+
+def logicDirs():
+    configDir = os.path.join(os.path.dirname(os.path.realpath(__file__)), \
+        "..", "..", "..", "lib", "configs")
+    return [os.path.join(configDir, "lite_configs"), os.path.join(configDir, "lite_configs_mixed")]
+
+def generateLibrary(dirs, limit=None):
+    fileNames = sorted([fileName for logicDir in dirs \
+        for fileName in glob.glob(os.path.join(logicDir, "*.yaml"))])[:limit]
+
+    masterLibrary = None
+    for fileName in fileNames:
+        library = YAMLIO.readLibraryLogicForSchedule(fileName)[7]
+        if masterLibrary is None:
+            masterLibrary = library
+        else:
+            masterLibrary.merge(library)
+    return masterLibrary
+
+def writeLibrary(masterLibrary, outputDir):
+    yamlFile = os.path.join(outputDir, "TensileLibrary.yaml")
+    datFile = os.path.join(outputDir, "TensileLibrary.dat")
+    YAMLIO.writeStreaming(yamlFile, masterLibrary)
+    YAMLIO.writeMsgPackStreaming(datFile, masterLibrary)
+    return yamlFile, datFile
+
+def loadYAML(fileName):
+    with open(fileName, "r") as stream:
+        return yaml.load(stream, YAMLIO.YAMLLoader)
+
+def loadMsgPack(fileName):
+    with open(fileName, "rb") as stream:
+        return YAMLIO.msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+
+def timeLoad(load, fileName, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        document = load(fileName)
+    return document, (time.time() - start) / repeat
+
+def report(name, fileName, loadTime):
+    print("%-12s %8.2f MiB  load %6.3f secs" \
+        % (name, os.path.getsize(fileName) / (1024.0 * 1024.0), loadTime))
+
+def test_library_formats(tmpdir):
+    pytest.importorskip("msgpack")
+
+    masterLibrary = generateLibrary(logicDirs(), limit=2)
+    yamlFile, datFile = writeLibrary(masterLibrary, str(tmpdir))
+
+    assert os.path.getsize(datFile) < os.path.getsize(yamlFile)
+    assert loadMsgPack(datFile) == loadYAML(yamlFile)
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("logic_dirs", nargs="*")
+    argParser.add_argument("--repeat", type=int, default=1)
+    args = argParser.parse_args()
+
+    if YAMLIO.msgpack is None:
+        raise SystemExit("msgpack is not installed")
+
+    masterLibrary = generateLibrary(args.logic_dirs or logicDirs())
+    print("%u solutions" % len(masterLibrary.solutions))
+
+    outputDir = tempfile.mkdtemp()
+    try:
+        yamlFile, datFile = writeLibrary(masterLibrary, outputDir)
+
+        yamlDocument, loadTime = timeLoad(loadYAML, yamlFile, args.repeat)
+        report("YAML", yamlFile, loadTime)
+
+        datDocument, loadTime = timeLoad(loadMsgPack, datFile, args.repeat)
+        report("MessagePack", datFile, loadTime)
+    finally:
+        shutil.rmtree(outputDir)
+
+    if datDocument != yamlDocument:
+        raise SystemExit("MessagePack library differs from the YAML one")
+
+if __name__ == "__main__":
+    main()
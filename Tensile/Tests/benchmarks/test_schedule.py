@@ -0,0 +1,125 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Compares the unroll loop schedule of ScheduleIterAlg=2, list scheduling by
+the latency model in Tensile/Schedule.py, against ScheduleIterAlg=1 over a
+sweep of kernel configs.  Each kernel's unrolled iterations are issued in
+order against the latency model of its ISA, giving an estimate of the cycles
+per unrolled loop and of how many of them are stalls.  These are model
+estimates; kernel throughput needs to be confirmed by benchmarking on
+hardware.
+
+  python -m Tensile.Tests.benchmarks.test_schedule
+"""
+
+from __future__ import print_function
+
+from Tensile import Schedule
+from Tensile.KernelWriterAssembly import KernelWriterAssembly
+from Tensile.SolutionStructs import Solution
+from Tensile.Tests.benchmarks.test_kernel_generation import generateKernels, globalParameters, \
+    setAssemblerCaps
+
+Sweep = {"DataType": ["s", "d"],
+         "WorkGroup": [[16,16,1], [8,8,1]],
+         "ThreadTile": [[4,4], [8,8], [4,8]],
+         "DepthU": [8, 16, 32],
+         "PrefetchGlobalRead": [True],
+         "PrefetchLocalRead": [0, 1],
+         "ScheduleIterAlg": [1, 2]}
+
+def unrollLoopSchedule(kernels):
+    """
+    Generates the source of each kernel, returning the items of its first
+    unrolled loop, as scheduled by makeSubIterSchedule.
+    """
+    writer = KernelWriterAssembly(Solution.getMinNaming(kernels), None)
+
+    # inline the macs, which are otherwise a single macro line
+    macIter = writer.macIter
+    writer.macIter = lambda kernel, bufferIdx, iuiCount, useMacro: \
+        macIter(kernel, bufferIdx, iuiCount, False)
+
+    iterations = []
+    makeSubIterSchedule = writer.makeSubIterSchedule
+    def recordSubIterSchedule(*args):
+        iterCode = makeSubIterSchedule(*args)
+        iterations.append(iterCode)
+        return iterCode
+    writer.makeSubIterSchedule = recordSubIterSchedule
+
+    schedules = []
+    for kernel in kernels:
+        del iterations[:]
+        writer.getKernelSource(kernel)
+        schedules.append(iterations[:kernel["LoopUnroll"]])
+    return schedules
+
+def estimateKernels(kernels):
+    return [Schedule.estimateCycles(iterations, Schedule.getLatencies(kernel["ISA"])) \
+        for kernel, iterations in zip(kernels, unrollLoopSchedule(kernels))]
+
+def kernelPairs(sweep):
+    """ Returns pairs of kernels differing only in ScheduleIterAlg, 1 then 2. """
+    kernels = generateKernels(sweep)
+    pairs = {}
+    for kernel in kernels:
+        key = str(dict([(k, v) for k, v in kernel.items() if k != "ScheduleIterAlg"]))
+        pairs.setdefault(key, {})[kernel["ScheduleIterAlg"]] = kernel
+    return [(p[1], p[2]) for p in pairs.values() if len(p) == 2]
+
+def test_schedule():
+    previous = setAssemblerCaps()
+    try:
+        pairs = kernelPairs(dict(Sweep, DataType=["s"], WorkGroup=[[16,16,1]], \
+            ThreadTile=[[4,4]], DepthU=[16]))
+        assert len(pairs) == 2
+        for pair in pairs:
+            (alg1, alg2) = estimateKernels(list(pair))
+            assert alg2[0] <= alg1[0]
+    finally:
+        globalParameters.update(previous)
+
+def main():
+    previous = setAssemblerCaps()
+    try:
+        pairs = kernelPairs(Sweep)
+        print("%-70s %16s %16s" % ("kernel", "alg 1 cyc/stall", "alg 2 cyc/stall"))
+        total = [0, 0]
+        skipped = 0
+        for pair in pairs:
+            try:
+                estimates = estimateKernels(list(pair))
+            except RuntimeError:
+                skipped += 1 # overflowed resources
+                continue
+            name = Solution.getNameMin(pair[0], Solution.getMinNaming([pair[0]]))
+            print("%-70s %9u/%6u %9u/%6u" % ((name[:70],) + estimates[0] + estimates[1]))
+            total[0] += estimates[0][0]
+            total[1] += estimates[1][0]
+        print("%u kernel pairs (%u skipped), alg 2 takes %.1f%% of the estimated cycles of alg 1" \
+            % (len(pairs) - skipped, skipped, 100.0 * total[1] / total[0]))
+    finally:
+        globalParameters.update(previous)
+
+if __name__ == "__main__":
+    main()
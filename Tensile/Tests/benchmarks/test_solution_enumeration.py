@@ -0,0 +1,86 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Times enumerating the solutions of a wide sweep of fork parameters, as
+BenchmarkProblems does, using the staged validation of Solution and using full
+evaluation of the derived parameters of every candidate.
+
+  python -m Tensile.Tests.benchmarks.test_solution_enumeration
+"""
+
+from __future__ import print_function
+import copy
+import itertools
+import time
+
+from Tensile.SolutionStructs import ProblemType, Solution, rejectionCounts
+
+ProblemTypeConfig = {"OperationType": "GEMM", "DataType": "s", "TransposeA": False, \
+    "TransposeB": True, "UseBeta": True, "Batched": True}
+
+Sweep = {"WorkGroup": [[16,16,1], [8,8,1], [16,8,1], [16,16,2], [32,4,1], [8,8,4], [64,4,1], [4,4,1]],
+         "ThreadTile": [[2,2], [4,4], [8,8], [6,6], [4,8], [8,4], [16,16], [3,5]],
+         "DepthU": [4, 8, 16, 32, 64, 128],
+         "GlobalReadVectorWidth": [-1, 1, 2, 4, 8],
+         "VectorWidth": [-1, 1, 2, 4],
+         "KernelLanguage": ["Assembly"],
+         "PrefetchGlobalRead": [True],
+         "GlobalSplitU": [1, 4]}
+
+def generateConfigs(sweep):
+    configs = []
+    for values in itertools.product(*sweep.values()):
+        config = {"ProblemType": copy.deepcopy(ProblemTypeConfig)}
+        config.update(zip(sweep.keys(), values))
+        configs.append(config)
+    return configs
+
+def fullEvaluation(config):
+    state = Solution.initialState(copy.deepcopy(config))
+    state["ProblemType"] = ProblemType(state["ProblemType"])
+    Solution.assignDerivedParameters(state)
+    return state["Valid"]
+
+def timeEnumeration(configs, valid):
+    start = time.time()
+    numValid = sum([valid(config) for config in configs])
+    return numValid, time.time() - start
+
+def test_solution_enumeration():
+    configs = generateConfigs({k: v[:3] for k, v in Sweep.items()})
+    assert timeEnumeration(configs, lambda c: Solution(c)["Valid"])[0] == \
+        timeEnumeration(configs, fullEvaluation)[0]
+
+def main():
+    configs = generateConfigs(Sweep)
+    numValid, fullTime = timeEnumeration(configs, fullEvaluation)
+    print("%u / %u valid solutions" % (numValid, len(configs)))
+    print("full   %6.2f secs" % fullTime)
+
+    rejectionCounts.clear()
+    _, stagedTime = timeEnumeration(configs, lambda c: Solution(c)["Valid"])
+    print("staged %6.2f secs (%.1fx)" % (stagedTime, fullTime / stagedTime))
+    for reason, count in rejectionCounts.most_common():
+        print("  %7u %s" % (count, reason))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Times hashing and comparing solutions, as the sets and dicts of solutions in
+BenchmarkProblems, LibraryLogic and TensileCreateLibrary do, using the cached
+identity behind Solution.__hash__/__eq__ and using full names.
+
+  python -m Tensile.Tests.benchmarks.test_solution_identity --num-solutions 100000
+"""
+
+from __future__ import print_function
+import argparse
+import time
+
+from Tensile.UnitTests.LiteConfigs import distinctSolutions
+
+def timeDedup(solutions, key):
+    """ Builds a set of solutions twice over, then looks all of them up. """
+    start = time.time()
+    unique = set([key(s) for s in solutions + solutions])
+    found = sum([key(s) in unique for s in solutions])
+    return len(unique), found, time.time() - start
+
+def test_solution_identity():
+    solutions = distinctSolutions(100)
+    assert timeDedup(solutions, lambda s: s)[:2] == timeDedup(solutions, str)[:2] == (100, 100)
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("--num-solutions", type=int, default=100000)
+    args = argParser.parse_args()
+
+    solutions = distinctSolutions(args.num_solutions)
+    # __hash__ and __eq__ used to compare the (cached) full names
+    numUnique, _, nameTime = timeDedup(solutions, str)
+    print("%u solutions" % numUnique)
+    print("names      %6.2f secs" % nameTime)
+
+    _, _, identityTime = timeDedup(solutions, lambda s: s)
+    print("identities %6.2f secs (%.1fx)" % (identityTime, nameTime / identityTime))
+
+if __name__ == "__main__":
+    main()
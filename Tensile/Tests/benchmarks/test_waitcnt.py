@@ -0,0 +1,130 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Compares the waits of WaitCntAlg=1, the loosest legal waits found by tracking
+the registers each memory operation loads in Tensile/Dependency.py, against
+the waits WaitCntAlg=0 computes from the static counts of each tile, over a
+sweep of kernel configs.  For each kernel it reports uses of loaded registers
+the waits miss (expected 0 for both) and, per loop, the cycles the latency
+model of Tensile/Schedule.py estimates are stalled in s_waitcnt.  That model
+gives every load a fixed latency, while real loads return out of step with
+memory traffic, so the stall counts compare the two algorithms rather than
+predict kernel time.
+
+  python -m Tensile.Tests.benchmarks.test_waitcnt
+"""
+
+from __future__ import print_function
+
+from Tensile import Dependency, Schedule
+from Tensile.KernelWriterAssembly import KernelWriterAssembly
+from Tensile.SolutionStructs import Solution
+from Tensile.Tests.benchmarks.test_kernel_generation import generateKernels, globalParameters, \
+    setAssemblerCaps, ISA
+
+Sweep = {"DataType": ["s", "d", "h"],
+         "WorkGroup": [[16,16,1], [8,8,1]],
+         "ThreadTile": [[4,4], [8,8], [4,8]],
+         "DepthU": [8, 16, 32],
+         "PrefetchGlobalRead": [True],
+         "PrefetchLocalRead": [0, 1],
+         "WaitCntAlg": [0, 1]}
+
+def analyzeKernels(kernels):
+    """
+    Generates the source of each kernel, returning (violations, loops) of its
+    waits, as given by Dependency.Program.check and latency.
+    """
+    writer = KernelWriterAssembly(Solution.getMinNaming(kernels), None)
+    maxVmcnt = globalParameters["AsmCaps"][ISA]["MaxVmcnt"]
+    results = []
+    for kernel in kernels:
+        program = Dependency.Program(writer.getKernelSource(kernel), maxVmcnt)
+        results.append((program.check(), program.latency(Schedule.getLatencies(kernel["ISA"]))))
+    return results
+
+def kernelPairs(sweep):
+    """ Returns pairs of kernels differing only in WaitCntAlg, 0 then 1. """
+    kernels = generateKernels(sweep)
+    pairs = {}
+    for kernel in kernels:
+        key = str(dict([(k, v) for k, v in kernel.items() if k != "WaitCntAlg"]))
+        pairs.setdefault(key, {})[kernel["WaitCntAlg"]] = kernel
+    return [(p[0], p[1]) for p in pairs.values() if len(p) == 2]
+
+def test_waitcnt(capsys):
+    previous = setAssemblerCaps()
+    previousCheck = globalParameters["CheckWaitCnt"]
+    try:
+        pairs = kernelPairs(dict(Sweep, DataType=["s"], WorkGroup=[[16,16,1]], \
+            ThreadTile=[[4,4]], DepthU=[16]))
+        assert len(pairs) == 2
+        for pair in pairs:
+            (alg0, alg1) = analyzeKernels(list(pair))
+            assert alg1[0] == []
+            # reloading beta is not a miss
+            assert not [v for v in alg0[0] if "s_load" in v]
+            assert len(alg1[1]) == len(alg0[1])
+            for loop0, loop1 in zip(alg0[1], alg1[1]):
+                assert loop1[2] <= loop0[2]
+
+        # the writer proves its own waits, and warns about the misses of the
+        # static waits rather than failing
+        globalParameters["CheckWaitCnt"] = True
+        writer = KernelWriterAssembly(Solution.getMinNaming([pairs[0][1]]), None)
+        assert writer.getKernelSource(pairs[0][1])
+        assert "s_waitcnt miss" not in capsys.readouterr().out
+        writer = KernelWriterAssembly(Solution.getMinNaming([pairs[0][0]]), None)
+        assert writer.getKernelSource(pairs[0][0])
+        assert "s_waitcnt miss" in capsys.readouterr().out
+    finally:
+        globalParameters.update(previous)
+        globalParameters["CheckWaitCnt"] = previousCheck
+
+def main():
+    previous = setAssemblerCaps()
+    try:
+        pairs = kernelPairs(Sweep)
+        print("%-70s %14s %14s" % ("kernel", "alg 0 miss/stl", "alg 1 miss/stl"))
+        total = [0, 0]
+        misses = [0, 0]
+        skipped = 0
+        for pair in pairs:
+            try:
+                results = analyzeKernels(list(pair))
+            except RuntimeError:
+                skipped += 1 # overflowed resources
+                continue
+            stalls = [sum([loop[2] for loop in loops]) for violations, loops in results]
+            name = Solution.getNameMin(pair[0], Solution.getMinNaming([pair[0]]))
+            print("%-70s %6u/%7u %6u/%7u" % (name[:70], len(results[0][0]), stalls[0], \
+                len(results[1][0]), stalls[1]))
+            for alg in range(0, 2):
+                total[alg] += stalls[alg]
+                misses[alg] += len(results[alg][0])
+        print("%u kernel pairs (%u skipped), %u/%u missed uses, alg 1 stalls %.1f%% of the loop cycles alg 0 stalls" \
+            % (len(pairs) - skipped, skipped, misses[0], misses[1], 100.0 * total[1] / max(total[0], 1)))
+    finally:
+        globalParameters.update(previous)
+
+if __name__ == "__main__":
+    main()
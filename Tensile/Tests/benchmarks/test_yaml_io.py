@@ -0,0 +1,103 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Times loading and dumping the lib/configs/SolutionLibraries logic files with
+the loader and dumper YAMLIO selects and with the pure python ones.
+
+  python -m Tensile.Tests.benchmarks.test_yaml_io --repeat 3
+
+YAMLIO falls back to the pure python loader and dumper when PyYAML is built
+without libyaml, in which case both rows time the same code.
+"""
+
+from __future__ import print_function
+import argparse
+import glob
+import os
+import time
+
+import yaml
+
+from Tensile import YAMLIO
+
+def fixtureFiles():
+    fixtureDir = os.path.join(os.path.dirname(os.path.realpath(__file__)), \
+        "..", "..", "..", "lib", "configs", "SolutionLibraries")
+    return sorted(glob.glob(os.path.join(fixtureDir, "*.yaml")))
+
+def timeLoad(fileNames, loader, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        documents = []
+        for fileName in fileNames:
+            with open(fileName, "r") as stream:
+                documents.append(yaml.load(stream, loader))
+    return documents, (time.time() - start) / repeat
+
+def timeDump(documents, dumper, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        texts = [yaml.dump(document, Dumper=dumper) for document in documents]
+    return texts, (time.time() - start) / repeat
+
+def report(name, numBytes, loadTime, dumpTime):
+    megabytes = numBytes / (1024.0 * 1024.0)
+    print("%-8s load %6.2f secs (%5.2f MiB/sec)  dump %6.2f secs (%5.2f MiB/sec)" \
+        % (name, loadTime, megabytes / loadTime, dumpTime, megabytes / dumpTime))
+
+def test_yaml_io():
+    if getattr(yaml, "__with_libyaml__", False):
+        assert YAMLIO.YAMLLoader is yaml.CSafeLoader
+        assert YAMLIO.YAMLDumper is yaml.CDumper
+        assert YAMLIO.YAMLSafeDumper is yaml.CSafeDumper
+
+    fileNames = [fileName for fileName in fixtureFiles() \
+        if os.path.getsize(fileName) < 64*1024]
+    assert len(fileNames) > 0
+
+    expected, _ = timeLoad(fileNames, yaml.SafeLoader, 1)
+    actual, _ = timeLoad(fileNames, YAMLIO.YAMLLoader, 1)
+    assert actual == expected
+    assert timeDump(actual, YAMLIO.YAMLDumper, 1)[0] == timeDump(expected, yaml.Dumper, 1)[0]
+
+def main():
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("--repeat", type=int, default=1)
+    args = argParser.parse_args()
+
+    fileNames = fixtureFiles()
+    numBytes = sum([os.path.getsize(fileName) for fileName in fileNames])
+    print("%u files, %.2f MiB" % (len(fileNames), numBytes / (1024.0 * 1024.0)))
+
+    documents, loadTime = timeLoad(fileNames, yaml.SafeLoader, args.repeat)
+    texts, dumpTime = timeDump(documents, yaml.Dumper, args.repeat)
+    report("python", numBytes, loadTime, dumpTime)
+
+    fastDocuments, loadTime = timeLoad(fileNames, YAMLIO.YAMLLoader, args.repeat)
+    fastTexts, dumpTime = timeDump(fastDocuments, YAMLIO.YAMLDumper, args.repeat)
+    report("YAMLIO", numBytes, loadTime, dumpTime)
+
+    if fastDocuments != documents or fastTexts != texts:
+        raise SystemExit("YAMLIO loader/dumper output differs from the pure python ones")
+
+if __name__ == "__main__":
+    main()
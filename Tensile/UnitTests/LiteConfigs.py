@@ -0,0 +1,51 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Solutions from the logic files in lib/configs/lite_configs, shared by the unit
+tests and the benchmarks.
+"""
+
+import copy
+import glob
+import os
+from Tensile import YAMLIO
+
+LogicDir = os.path.join(os.path.dirname(os.path.realpath(__file__)), \
+    "..", "..", "lib", "configs", "lite_configs")
+
+def logicFiles():
+    return sorted(glob.glob(os.path.join(LogicDir, "*.yaml")))
+
+def baseSolution():
+    """ The first solution of the first logic file. """
+    return YAMLIO.readLibraryLogicForSchedule(logicFiles()[0])[3][0]
+
+def distinctSolutions(numSolutions, base=None):
+    """ Copies of base which differ only in WorkGroupMapping. """
+    if base is None:
+        base = baseSolution()
+    solutions = []
+    for i in range(numSolutions):
+        solution = copy.copy(base)
+        solution["WorkGroupMapping"] = i + 1
+        solutions.append(solution)
+    return solutions
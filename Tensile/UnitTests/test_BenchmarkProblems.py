@@ -0,0 +1,56 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+import collections
+import itertools
+from Tensile import BenchmarkProblems
+from Tensile.Common import ParallelMap, globalParameters
+from Tensile.SolutionStructs import Solution, rejectionCounts
+
+def test_enumerate_solutions():
+    problemType = {"OperationType": "GEMM", "DataType": "s", "TransposeA": False, \
+        "TransposeB": True, "UseBeta": True, "Batched": True}
+    space = {"WorkGroup": [[16,16,1], [8,8,1], [16,16,2]],
+             "ThreadTile": [[4,4], [8,8], [6,6]],
+             "DepthU": [8, 32, 128],
+             "GlobalReadVectorWidth": [-1, 8]}
+    candidates = []
+    for idx, values in enumerate(itertools.product(*space.values())):
+        config = dict(zip(space.keys(), values))
+        config["ProblemType"] = problemType
+        candidates.append((idx % 2, config))
+
+    rejectionCounts.clear()
+    serial = [(idx, Solution(config)) for idx, config in candidates]
+    serial = [(idx, s) for idx, s in serial if s["Valid"]]
+    serialCounts = rejectionCounts.copy()
+
+    chunks = [candidates[i:i+10] for i in range(0, len(candidates), 10)]
+    cpuThreads = globalParameters["CpuThreads"]
+    globalParameters["CpuThreads"] = -2
+    try:
+        results = ParallelMap(BenchmarkProblems.enumerateSolutions, chunks, enable=True)
+    finally:
+        globalParameters["CpuThreads"] = cpuThreads
+
+    parallel = [item for solutions, counts in results for item in solutions]
+    assert [(idx, str(s)) for idx, s in parallel] == [(idx, str(s)) for idx, s in serial]
+    assert sum([counts for solutions, counts in results], collections.Counter()) == serialCounts
@@ -0,0 +1,107 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+import glob
+import os
+import shutil
+from Tensile import BuildManifest as BuildManifestModule
+from Tensile.BuildManifest import BuildManifest
+from Tensile.Common import globalParameters
+
+def logicFile(tmpdir):
+    liteConfigs = os.path.join(os.path.dirname(os.path.realpath(__file__)), \
+        "..", "..", "lib", "configs", "lite_configs")
+    src = sorted(glob.glob(os.path.join(liteConfigs, "*.yaml")))[0]
+    dst = str(tmpdir.join("logic.yaml"))
+    shutil.copyfile(src, dst)
+    return dst
+
+def test_logic_files_reused(tmpdir, capsys):
+    outputPath = str(tmpdir.mkdir("out"))
+    logic = logicFile(tmpdir)
+
+    manifest = BuildManifest(outputPath)
+    first = manifest.readLogicFiles([logic])
+    manifest.write()
+
+    # unchanged logic is read back from the manifest instead of being parsed
+    capsys.readouterr()
+    manifest = BuildManifest(outputPath)
+    second = manifest.readLogicFiles([logic])
+    assert "0/1 logic files changed" in capsys.readouterr().out
+    assert [str(s) for s in second[0][3]] == [str(s) for s in first[0][3]]
+
+    with open(logic, "a") as f:
+        f.write("\n")
+    manifest = BuildManifest(outputPath)
+    manifest.readLogicFiles([logic])
+    manifest.write()
+    assert len(os.listdir(os.path.join(outputPath, BuildManifest.ManifestDir))) == 1
+    # nothing is written next to the logic files
+    assert sorted(os.listdir(str(tmpdir))) == ["logic.yaml", "out"]
+
+def test_logic_key(tmpdir, monkeypatch):
+    logic = logicFile(tmpdir)
+    key = BuildManifest.logicKey(logic)
+    assert BuildManifest.logicKey(logic) == key
+
+    # the Tensile version and derived parameter inputs change the parsed logic
+    monkeypatch.setitem(globalParameters, "MaxDepthU", globalParameters["MaxDepthU"] * 2)
+    assert BuildManifest.logicKey(logic) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(BuildManifestModule, "__version__", "0.0.0")
+    assert BuildManifest.logicKey(logic) != key
+
+def test_kernel_up_to_date(tmpdir):
+    outputPath = str(tmpdir.mkdir("out"))
+    asmDir = str(tmpdir.mkdir("assembly"))
+    for ext in [".o", ".co"]:
+        tmpdir.join("assembly", "K" + ext).write("")
+
+    manifest = BuildManifest(outputPath)
+    assert not manifest.kernelUpToDate("K", "key", asmDir)
+    manifest.write()
+
+    manifest = BuildManifest(outputPath)
+    assert manifest.kernelUpToDate("K", "key", asmDir)
+    assert not manifest.kernelUpToDate("K", "other", asmDir)
+
+def test_unchanged_outputs_keep_mtime(tmpdir):
+    outputPath = tmpdir.mkdir("out")
+    same = outputPath.join("Solutions.cpp")
+    changed = outputPath.join("Tensile.cpp")
+    same.write("a")
+    changed.write("b")
+    os.utime(str(same), (1000, 1000))
+    os.utime(str(changed), (1000, 1000))
+
+    manifest = BuildManifest(str(outputPath))
+    manifest.restoreUnchangedOutputs()
+    manifest.write()
+
+    same.write("a")
+    changed.write("c")
+    manifest = BuildManifest(str(outputPath))
+    manifest.restoreUnchangedOutputs()
+
+    assert os.stat(str(same)).st_mtime == 1000
+    assert os.stat(str(changed)).st_mtime != 1000
@@ -0,0 +1,89 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+import io
+from Tensile import Code
+
+def buildModule():
+    outer = Code.Module("outer")
+    outer.addComment1("outer")
+    inner = Code.Module("inner")
+    inner.addInst("v_mov_b32", "v0", "0", "zero")
+    inner.addCode(Code.WaitCnt(lgkmcnt=0, comment="wait"))
+    inner.addCode(Code.Label(3, "loop"))
+    outer.addCode(inner)
+    outer.addText("s_endpgm\n")
+    return outer
+
+def test_module_write():
+    module = buildModule()
+    sink = io.StringIO()
+    module.write(sink)
+    expected = "\n/* outer */\n" + str(Code.Inst("v_mov_b32", "v0", "0", "zero")) \
+        + str(Code.WaitCnt(lgkmcnt=0, comment="wait")) + "label_0003:  /// loop\n" + "s_endpgm\n"
+    assert sink.getvalue() == expected
+    assert str(module) == expected
+
+def test_module_write_names(monkeypatch):
+    monkeypatch.setattr(Code, "printModuleNames", 1)
+    text = str(buildModule())
+    assert text.startswith("// outer { \n\n/* outer */\n// inner { \n")
+    assert text.endswith("// } inner\ns_endpgm\n// } outer\n")
+
+def test_write_lines():
+    items = ["a", buildModule(), "b"]
+    sink = io.StringIO()
+    Code.writeLines(sink, items)
+    assert sink.getvalue() == "\n".join([str(x) for x in items])
+
+def test_slots():
+    for item in [Code.Module(), Code.TextBlock(""), Code.Inst("s_nop", "0", ""), \
+                 Code.WaitCnt(), Code.Label(0, ""), Code.LocalReadInst("ds_read_b32", "v0", "v1", "")]:
+        assert not hasattr(item, "__dict__")
+
+def test_count_type_cache():
+    shared = Code.Module("shared")
+    shared.addCode(Code.LocalReadInst("ds_read_b32", "v0", "v1", ""))
+    a = Code.Module("a")
+    a.addCode(shared)
+    b = Code.Module("b")
+    b.addCode(Code.Module("inner")).addCode(shared)
+    assert a.countType(Code.LocalReadInst) == 1
+    assert b.countType(Code.LocalReadInst) == 1
+    assert b.count() == 1
+
+    # changes to a sub-module are seen by every module containing it
+    shared.addCode(Code.LocalReadInst("ds_read_b32", "v2", "v3", ""))
+    shared.addInst("s_nop", "0", "")
+    assert a.countType(Code.LocalReadInst) == 2
+    assert b.countType(Code.LocalReadInst) == 2
+    assert b.count() == 3
+    assert b.countType(Code.GlobalReadInst) == 0
+
+def test_iter_items():
+    module = buildModule()
+    module.addCode(Code.Module("empty"))
+    module.addCode(buildModule())
+    flat = module.flatitems()
+    assert list(module.iterItems()) == flat
+    assert len(flat) == module.count() == 10
+    assert not any([isinstance(i, Code.Module) for i in flat])
@@ -0,0 +1,163 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+from Tensile import Dependency, Schedule
+
+Header = """
+.set vgprValuA, 4
+.set vgprG2L, 8
+.macro MAC_X0
+v_mac_f32 v0, v[vgprValuA+0], v[vgprValuA+1]
+v_mac_f32 v1, v[vgprValuA+2], v[vgprValuA+3]
+.endm
+"""
+
+def program(body, maxVmcnt=63):
+    return Dependency.Program(Header + body, maxVmcnt)
+
+def waits(source):
+    return [line.split("//")[0].strip() for line in source.splitlines() \
+        if line.startswith("s_waitcnt")]
+
+def test_registers():
+    symbols = {"vgprA": 4, "sgprSrd": 8}
+    assert Dependency.registers("v[vgprA+1:vgprA+2], v3, s[sgprSrd:sgprSrd+1] offen offset:0", \
+        symbols) == set([("v", 5), ("v", 6), ("v", 3), ("s", 8), ("s", 9)])
+    assert Dependency.registers("vcc, exec, op_sel:[0,1]", symbols) == set()
+    # an expression which can't be evaluated stands for every register of the file
+    assert Dependency.registers("v[vgprB]", symbols) == set([("v", None)])
+    assert Dependency.evaluate("vgprA+2*3", symbols) == 10
+    assert Dependency.evaluate("(vgprA<<1)-0x1", symbols) == 7
+
+def test_check():
+    source = """
+ds_read_b128 v[vgprValuA:vgprValuA+3], v40 offset:0
+v_mac_f32 v0, v5, v6
+"""
+    violations = program(source).check()
+    assert len(violations) == 1
+    assert "v_mac_f32 v0, v5, v6 needs lgkmcnt(0) for v5" in violations[0]
+
+    assert program("ds_read_b128 v[4:7], v40\ns_waitcnt lgkmcnt(0)\nMAC_X0\n").check() == []
+    # the macro uses the loaded registers; the wait its first use needs covers the second
+    violations = program("ds_read_b128 v[4:7], v40\nMAC_X0\n").check()
+    assert len(violations) == 1 and "needs lgkmcnt(0) for v4" in violations[0]
+
+def test_insert_waits():
+    source = """
+ds_read_b64 v[4:5], v40 offset:0
+ds_read_b64 v[6:7], v40 offset:8
+buffer_load_dword v8, v41, s[4:7], 0 offen offset:0
+buffer_load_dword v9, v41, s[4:7], 0 offen offset:4
+s_waitcnt lgkmcnt(0) & vmcnt(0)
+v_mov_b32 v10, v8
+v_mac_f32 v0, v4, v5
+v_mac_f32 v1, v6, v7
+v_mov_b32 v11, v9
+"""
+    p = program(source)
+    assert p.check() == []
+    result = p.insertWaits()
+    assert waits(result) == ["s_waitcnt vmcnt(1)", "s_waitcnt lgkmcnt(1)", \
+        "s_waitcnt lgkmcnt(0)", "s_waitcnt vmcnt(0)"]
+    assert program(result).check() == []
+
+def test_loop():
+    # the load at the end of the loop is used at its start in the next iteration
+    source = """
+buffer_load_dword v8, v41, s[4:7], 0 offen offset:0
+s_waitcnt vmcnt(0)
+label_0001:
+v_mov_b32 v10, v8
+buffer_load_dword v8, v41, s[4:7], 0 offen offset:0
+s_cbranch_scc0 label_0001
+s_endpgm
+"""
+    violations = program(source).check()
+    assert len(violations) == 1 and "v_mov_b32 v10, v8" in violations[0]
+    result = program(source).insertWaits()
+    assert "label_0001:\ns_waitcnt vmcnt(0)" in result
+    assert program(result).check() == []
+
+def test_barrier():
+    source = """
+buffer_load_dword v8, v41, s[4:7], 0 offen offset:0
+s_waitcnt vmcnt(0)
+ds_write_b32 v42, v8
+ds_read_b32 v4, v40
+s_barrier
+"""
+    # a local read after a local write waits for nothing, a barrier for both
+    assert waits(program(source).insertWaits()) == ["s_waitcnt vmcnt(0)", "s_waitcnt lgkmcnt(0)"]
+
+def test_unordered():
+    source = """
+ds_read_b32 v4, v40
+s_load_dword s10, s[0:1], 0x0
+v_mov_b32 v10, v4
+"""
+    # scalar loads may complete before the earlier local read
+    assert waits(program(source).insertWaits()) == ["s_waitcnt lgkmcnt(0)"]
+
+def test_scalar_reload():
+    source = """
+s_load_dword s10, s[0:1], 0x3c
+s_load_dword s10, s[0:1], 0x3c
+s_mov_b32 s11, s10
+"""
+    # reloading an unread register needs no wait; reading it waits for both loads
+    assert waits(program(source).insertWaits()) == ["s_waitcnt lgkmcnt(0)"]
+    violations = program(source).check()
+    assert len(violations) == 1 and "s_mov_b32 s11, s10" in violations[0]
+
+def test_max_vmcnt():
+    source = "".join(["buffer_load_dword v%u, v41, s[4:7], 0 offen offset:0\n" % (20+i) \
+        for i in range(0, 20)]) + "v_mov_b32 v10, v20\n"
+    assert waits(program(source).insertWaits()) == ["s_waitcnt vmcnt(19)"]
+    assert waits(program(source, maxVmcnt=15).insertWaits()) == ["s_waitcnt vmcnt(15)"]
+
+def test_conditional_assembly():
+    source = """
+ds_read_b32 v4, v40
+.if 0
+v_mov_b32 v10, v4
+.else
+s_nop 0
+.endif
+"""
+    assert program(source).check() == []
+
+def test_latency():
+    source = """
+label_0001:
+buffer_load_dword v8, v41, s[4:7], 0 offen offset:0
+s_waitcnt vmcnt(0)
+v_mov_b32 v10, v8
+s_cbranch_scc0 label_0001
+"""
+    latencies = Schedule.getLatencies((9,0,6))
+    [(label, cycles, stallCycles, memoryLatency)] = program(source).latency(latencies)
+    assert label == "label_0001"
+    assert memoryLatency == latencies[Schedule.Code.GlobalReadInst][2]
+    # nothing to hide the load behind
+    assert stallCycles == memoryLatency - 4
+    assert cycles == stallCycles + 4*4
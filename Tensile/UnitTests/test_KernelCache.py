@@ -0,0 +1,90 @@
+################################################################################
+# Copyright (C) 2016-2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+import os
+from collections import OrderedDict
+from Tensile.DataType import DataType
+from Tensile.KernelCache import KernelCache
+
+def makeKernel(**kwargs):
+    kernel = {"ISA": (9,0,6), "KernelLanguage": "Assembly", "MacroTile0": 128,
+              "DataType": DataType('S'), "ThreadTile": [8, 8]}
+    kernel.update(kwargs)
+    return kernel
+
+def writeArtifacts(tmpdir, name, size):
+    files = {}
+    for ext in [".s", ".o", ".co"]:
+        f = tmpdir.join(name + ext)
+        f.write("x" * size)
+        files[ext] = str(f)
+    return files
+
+def test_key_is_canonical(tmpdir):
+    cache = KernelCache(str(tmpdir.join("cache")), 0)
+    kernel = makeKernel()
+    reordered = OrderedDict(reversed(list(kernel.items())))
+
+    assert cache.kernelKey(kernel, "K") == cache.kernelKey(reordered, "K")
+    assert cache.kernelKey(kernel, "K") != cache.kernelKey(kernel, "L")
+    assert cache.kernelKey(kernel, "K") != cache.kernelKey(makeKernel(MacroTile0=64), "K")
+    assert cache.kernelKey(kernel, "K") != cache.kernelKey(makeKernel(ISA=(9,0,0)), "K")
+    assert cache.kernelKey(kernel, "K") != cache.kernelKey(makeKernel(DataType=DataType('D')), "K")
+
+def test_store_fetch(tmpdir):
+    cache = KernelCache(str(tmpdir.join("cache")), 0)
+    key = cache.kernelKey(makeKernel(), "K")
+
+    assert not cache.fetch(key, {".co": str(tmpdir.join("out.co"))})
+    cache.store(key, writeArtifacts(tmpdir, "K", 16), 2.5)
+
+    dst = dict([(ext, str(tmpdir.join("restored" + ext))) for ext in [".s", ".o", ".co"]])
+    assert cache.fetch(key, dst)
+    for f in dst.values():
+        assert open(f).read() == "x" * 16
+
+    cache.probe([key, cache.kernelKey(makeKernel(MacroTile0=64), "K")])
+    assert (cache.hits, cache.misses, cache.timeSaved) == (1, 1, 2.5)
+
+def test_link_key(tmpdir):
+    a = KernelCache.kernelKey(makeKernel(), "A")
+    b = KernelCache.kernelKey(makeKernel(MacroTile0=64), "B")
+
+    assert KernelCache.linkKey((9,0,6), [a, b]) == KernelCache.linkKey((9,0,6), [a, b])
+    assert KernelCache.linkKey((9,0,6), [a, b]) != KernelCache.linkKey((9,0,6), [a])
+    assert KernelCache.linkKey((9,0,6), [a, b]) != KernelCache.linkKey((9,0,6), [b, a])
+    assert KernelCache.linkKey((9,0,6), [a, b]) != KernelCache.linkKey((9,0,0), [a, b])
+
+def test_evict_lru(tmpdir):
+    cache = KernelCache(str(tmpdir.join("cache")), 1)
+    keys = [cache.kernelKey(makeKernel(MacroTile0=i), "K") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.store(key, writeArtifacts(tmpdir, "K%u" % i, 150*1024), 1.0)
+        os.utime(os.path.join(cache.entryPath(key), KernelCache.MetadataFileName), (i, i))
+
+    # touch the oldest entry so that the second becomes least recently used
+    assert cache.fetch(keys[0], {".co": str(tmpdir.join("out.co"))})
+    cache.evict()
+
+    assert cache.lookup(keys[0]) is not None
+    assert cache.lookup(keys[1]) is None
+    assert cache.lookup(keys[2]) is not None
@@ -0,0 +1,171 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+import random
+import pytest
+from Tensile import ResultsIO
+from Tensile.Common import globalParameters, defaultAnalysisParameters
+from Tensile.SolutionStructs import ProblemSizes, ProblemType
+from Tensile import LibraryLogic
+from Tensile.UnitTests.LiteConfigs import distinctSolutions
+
+pytest.importorskip("numpy")
+
+def writeBenchmarkData(tmpdir, seed, numSolutions):
+    """
+    Synthetic benchmark of a batched contraction (no leading dimension indices,
+    so range logic covers every index) with ties, invalid solutions, sizes only
+    some or no solutions support, and exact sizes.
+    """
+    problemType = ProblemType({"OperationType": "TensorContraction", "DataType": "s", \
+        "NumIndicesC": 3, "IndexAssignmentsA": [0, 3, 2], "IndexAssignmentsB": [3, 1, 2], \
+        "UseBeta": True})
+    problemSizes = ProblemSizes(problemType, [ \
+        {"Range": [[64, 64, 256], [32, 96, 224], [1, 1, 2], [128, 128, 384]]}, \
+        {"Exact": [96, 96, 1, 96]}, {"Exact": [1024, 64, 1, 64]}])
+
+    solutions = distinctSolutions(numSolutions)
+
+    rng = random.Random(seed)
+    lines = [",".join(["GEMM"] + ["Size%u" % i for i in range(4)] + ["TotalFlops"] \
+        + [str(s) for s in solutions])]
+    for sizeIdx, size in enumerate(problemSizes.sizes):
+        gflops = [rng.uniform(100, 1000) for s in solutions]
+        gflops[1] = gflops[0] # tied solutions
+        gflops[-1] *= 0.01 # never wins
+        if rng.random() < 0.1:
+            gflops[2] = 0 # invalid solution
+        if rng.random() < 0.2:
+            gflops = [g if i % 3 == 0 else -2 for i, g in enumerate(gflops)]
+        if rng.random() < 0.1:
+            gflops = [-2 for g in gflops] # not benchmarked
+        lines.append(",".join([str(sizeIdx)] + [str(s) for s in size] + ["0"] \
+            + ["%.3f" % g for g in gflops]))
+
+    dataFileName = str(tmpdir.join("data%u.csv" % seed))
+    with open(dataFileName, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return (problemType, problemSizes, solutions, dataFileName)
+
+def createLogicAnalyzer(logicAnalyzerClass, benchmarkData):
+    (problemType, problemSizes, solutions, dataFileName) = benchmarkData
+    globalParameters["ExpandRanges"] = False
+    try:
+        return logicAnalyzerClass(problemType, [problemSizes], [solutions], \
+            [dataFileName], dict(defaultAnalysisParameters, SolutionImportanceMin=0.05))
+    finally:
+        globalParameters["ExpandRanges"] = True
+
+def analyze(logicAnalyzerClass, benchmarkData, solutionSelectionAlg):
+    logicAnalyzer = createLogicAnalyzer(logicAnalyzerClass, benchmarkData)
+    logicAnalyzer.removeInvalidSolutions()
+    if solutionSelectionAlg == 0:
+        logicAnalyzer.removeLeastImportantSolutions()
+    else:
+        logicAnalyzer.keepWinnerSolutions()
+    rangeLogic = logicAnalyzer.enRule(0, logicAnalyzer.globalIndexRange)
+    score = logicAnalyzer.scoreRangeForLogic(logicAnalyzer.globalIndexRange, rangeLogic)
+    logicAnalyzer.prepareLogic(rangeLogic)
+
+    data = [logicAnalyzer.getGFlops(problemSerial * logicAnalyzer.numSolutions, solutionIdx) \
+        for problemSerial in range(logicAnalyzer.totalProblems) \
+        for solutionIdx in range(logicAnalyzer.numSolutions)]
+    return ([str(s) for s in logicAnalyzer.solutions], logicAnalyzer.solutionNames, \
+        logicAnalyzer.exactWinners, rangeLogic, score, data)
+
+def writeBinaryResults(dataFileName):
+    """ The binary results file the client would have written with the csv. """
+    with open(dataFileName) as f:
+        lines = [line.strip().split(",") for line in f]
+    numSolutions = len(lines[0]) - 6
+    table = [[int(v) for v in row[:6]] + [float(v) for v in row[6:]] for row in lines[1:]]
+    ResultsIO.writeBinary(ResultsIO.binaryFileNameFor(dataFileName), lines[0], \
+        "I"*5 + "Q" + "f"*numSolutions, table)
+
+@pytest.mark.parametrize("solutionSelectionAlg", [0, 1])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_numpy_backend_matches_python(tmpdir, seed, solutionSelectionAlg):
+    benchmarkData = writeBenchmarkData(tmpdir, seed, 12)
+    python = analyze(LibraryLogic.LogicAnalyzer, benchmarkData, solutionSelectionAlg)
+    numpy = analyze(LibraryLogic.NumPyLogicAnalyzer, benchmarkData, solutionSelectionAlg)
+    assert numpy == python
+    # removals happened, and range logic was found
+    assert len(python[0]) < 12
+    assert python[3] is not None
+
+@pytest.mark.parametrize("solutionSelectionAlg", [0, 1])
+def test_binary_results_match_csv(tmpdir, solutionSelectionAlg):
+    benchmarkData = writeBenchmarkData(tmpdir, 8, 12)
+    fromCSV = analyze(LibraryLogic.LogicAnalyzer, benchmarkData, solutionSelectionAlg)
+    writeBinaryResults(benchmarkData[3])
+    for logicAnalyzerClass in [LibraryLogic.LogicAnalyzer, LibraryLogic.NumPyLogicAnalyzer]:
+        assert analyze(logicAnalyzerClass, benchmarkData, solutionSelectionAlg) == fromCSV
+
+def test_importance_matches_python(tmpdir):
+    benchmarkData = writeBenchmarkData(tmpdir, 4, 12)
+    importance = []
+    for logicAnalyzerClass in [LibraryLogic.LogicAnalyzer, LibraryLogic.NumPyLogicAnalyzer]:
+        logicAnalyzer = createLogicAnalyzer(logicAnalyzerClass, benchmarkData)
+        importance.append((logicAnalyzer.getSolutionImportance(), \
+            logicAnalyzer.scoreRangeForSolutions(logicAnalyzer.globalIndexRange)))
+    assert importance[1][0] == importance[0][0]
+    assert list(importance[1][1]) == importance[0][1]
+
+def test_remove_solution_is_lazy(tmpdir):
+    logicAnalyzer = createLogicAnalyzer(LibraryLogic.LogicAnalyzer, \
+        writeBenchmarkData(tmpdir, 5, 6))
+    solutions = list(logicAnalyzer.solutions)
+    data = logicAnalyzer.data
+    logicAnalyzer.removeSolution(1)
+    logicAnalyzer.removeSolution(4)
+    assert logicAnalyzer.data is data
+    assert logicAnalyzer.activeSolutionIdxs() == [0, 2, 3, 5]
+
+    logicAnalyzer.compactSolutions()
+    assert logicAnalyzer.solutions == [solutions[i] for i in [0, 2, 3, 5]]
+    assert logicAnalyzer.getGFlops(0, 3) == data[5]
+
+@pytest.mark.parametrize("logicAnalyzerClass", \
+    [LibraryLogic.LogicAnalyzer, LibraryLogic.NumPyLogicAnalyzer])
+def test_incremental_importance(tmpdir, logicAnalyzerClass):
+    benchmarkData = writeBenchmarkData(tmpdir, 6, 12)
+    incremental = createLogicAnalyzer(logicAnalyzerClass, benchmarkData)
+    incremental.getSolutionImportance()
+    fromScratch = createLogicAnalyzer(logicAnalyzerClass, benchmarkData)
+    for solutionIdx in [0, 3, 4, 7]:
+        incremental.removeSolution(solutionIdx)
+        fromScratch.removeSolution(solutionIdx)
+    assert incremental.problemRanking is not None
+    assert fromScratch.problemRanking is None
+    assert incremental.getSolutionImportance() == fromScratch.getSolutionImportance()
+
+@pytest.mark.parametrize("logicAnalyzerClass", \
+    [LibraryLogic.LogicAnalyzer, LibraryLogic.NumPyLogicAnalyzer])
+def test_problem_winners(tmpdir, logicAnalyzerClass):
+    logicAnalyzer = createLogicAnalyzer(logicAnalyzerClass, writeBenchmarkData(tmpdir, 7, 12))
+    problemWinners = logicAnalyzer.getProblemWinners()
+    assert -1 in problemWinners
+    for problemIdx, problemIndices in enumerate(logicAnalyzer.problemIndicesForGlobalRange):
+        indexRange = [[i, i+1] for i in problemIndices]
+        scores = logicAnalyzer.scoreRangeForSolutions(indexRange)
+        assert problemWinners[problemIdx] == logicAnalyzer.winnerForScores(scores)
+        assert logicAnalyzer.winnerForRange(indexRange) == problemWinners[problemIdx]
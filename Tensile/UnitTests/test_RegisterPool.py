@@ -0,0 +1,64 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from Tensile.KernelWriterAssembly import RegisterPool
+
+def test_checkOutAligned():
+    pool = RegisterPool(16, 'v', 0)
+    pool.add(1, 10)
+    assert pool.available() == 10
+    assert pool.checkOut(2) == 1
+    assert pool.checkOutAligned(2, 4) == 4
+    assert pool.checkOut(1) == 3
+    assert pool.state().splitlines()[-1] == "." + "#"*5 + "|"*5 + "."*5
+    assert pool.availableBlock(2) == 4
+
+    # check in merges with the runs either side
+    pool.checkIn(4)
+    assert pool.availableBlock(8) == 0
+    pool.checkIn(3)
+    assert pool.availableBlock(8) == 8
+    # the run is long enough but not once aligned, so the pool overflows
+    assert pool.checkOutAligned(8, 8) == 16
+
+def test_overflow():
+    pool = RegisterPool(4, 'v', 1)
+    pool.add(2, 2)
+    # the available tail of the pool starts the overflow
+    assert pool.checkOut(3) == 2
+    assert pool.size() == 6
+    # registers skipped for alignment stay in use
+    assert pool.checkOutAligned(2, 4) == 8
+    assert pool.state().splitlines()[-1] == ".." + "#"*8
+    assert pool.available() == 0
+    pool.checkIn(2)
+    pool.checkIn(8)
+    assert pool.state().splitlines()[-1] == ".." + "|"*3 + "###" + "||"
+    assert pool.peakInUse == 8
+    assert pool.numOverflows == 2
+
+def test_initTmps():
+    pool = RegisterPool(8, 'v', 0)
+    pool.add(0, 8)
+    pool.remove(2, 2)
+    pool.checkOut(1)
+    assert pool.initTmps(0, start=0, stop=4).count("v_mov_b32") == 2
+    assert pool.initTmps(0).count("v_mov_b32") == 5
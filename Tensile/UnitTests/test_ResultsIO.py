@@ -0,0 +1,151 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+import os
+import struct
+import pytest
+from Tensile import ResultsIO
+
+def writeResults(tmpdir, name, rows, truncate=False):
+    lines = ["GFlops, SizeI, SizeJ, TotalFlops, Cijk_A, Cijk_B"]
+    for idx, row in enumerate(rows):
+        lines.append(", ".join([str(idx)] + [str(x) for x in row]))
+    if truncate:
+        lines[-1] = lines[-1][:lines[-1].rindex(",")]
+    resultsFile = tmpdir.join(name)
+    resultsFile.write("\n".join(lines) + "\n")
+    return str(resultsFile)
+
+Rows = [[64, 64, 524288, 1234.5, -1.0], [64, 128, 1048576, 0.1, 3e3], [128, 128, 2097152, 7.25, 7.25]]
+
+def float32(value):
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+@pytest.mark.parametrize("useNumPy", [True, False])
+def test_read_csv(tmpdir, monkeypatch, useNumPy):
+    if useNumPy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ResultsIO, "np", None)
+    monkeypatch.setattr(ResultsIO, "ChunkRows", 2)
+    resultsFile = writeResults(tmpdir, "results.csv", Rows)
+
+    table = ResultsIO.readCSV(resultsFile, 6)
+    assert len(table) == 3
+    assert ResultsIO.rows(table, 0, 4) == [[i] + row[:3] for i, row in enumerate(Rows)]
+    # with numpy, gflops are the float32 values the client measured
+    gflops = float32 if useNumPy else float
+    assert ResultsIO.column(table, 4) == [1234.5, gflops(0.1), 7.25]
+    # trailing columns aren't read
+    assert ResultsIO.rows(ResultsIO.readCSV(resultsFile, 4), 0, 4) \
+        == [[i] + row[:3] for i, row in enumerate(Rows)]
+
+@pytest.mark.parametrize("useNumPy", [True, False])
+def test_read_truncated_csv(tmpdir, capsys, monkeypatch, useNumPy):
+    if useNumPy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ResultsIO, "np", None)
+    resultsFile = writeResults(tmpdir, "results.csv", Rows, truncate=True)
+
+    table = ResultsIO.readCSV(resultsFile, 6)
+    assert ResultsIO.column(table, 1) == [64, 64]
+    assert "row 4 doesn't have 6 elements" in capsys.readouterr().out
+
+Names = ["Problem", "SizeI", "SizeJ", "TotalFlops", "Cijk_A", "Cijk_B"]
+Types = "IIIQff"
+
+def writeBinaryResults(csvFileName, rows):
+    binaryFileName = ResultsIO.binaryFileNameFor(csvFileName)
+    ResultsIO.writeBinary(binaryFileName, Names, Types, [[i] + row for i, row in enumerate(rows)])
+    return binaryFileName
+
+def test_read_binary(tmpdir):
+    pytest.importorskip("numpy")
+    binaryFileName = writeBinaryResults(str(tmpdir.join("results.csv")), Rows)
+    assert binaryFileName == str(tmpdir.join("results.bin"))
+    (names, types, offset) = ResultsIO.readBinaryHeader(binaryFileName)
+    assert names == Names
+    assert types == Types
+    assert offset % ResultsIO.DataAlignment == 0
+
+    table = ResultsIO.readBinary(binaryFileName, 5)
+    assert len(table) == 3
+    assert ResultsIO.rows(table, 0, 4) == [[i] + row[:3] for i, row in enumerate(Rows)]
+    assert ResultsIO.column(table, 4) == [1234.5, float32(0.1), 7.25]
+
+    # a client which didn't finish leaves a partial last row
+    with open(binaryFileName, "ab") as binaryFile:
+        binaryFile.write(b"\0"*8)
+    assert len(ResultsIO.readBinary(binaryFileName, 6)) == 3
+    with pytest.raises(ValueError):
+        ResultsIO.readBinary(binaryFileName, 7)
+
+def test_read_results(tmpdir, capsys, monkeypatch):
+    pytest.importorskip("numpy")
+    csvFileName = writeResults(tmpdir, "results.csv", Rows)
+    binaryFileName = writeBinaryResults(csvFileName, Rows[:2])
+    assert len(ResultsIO.readResults(csvFileName, 6)) == 2
+
+    # csv written after the binary file
+    os.utime(binaryFileName, (0, 0))
+    assert len(ResultsIO.readResults(csvFileName, 6)) == 3
+    os.utime(binaryFileName)
+
+    with open(binaryFileName, "r+b") as binaryFile:
+        binaryFile.write(b"TENSILEX")
+    assert len(ResultsIO.readResults(csvFileName, 6)) == 3
+    assert "isn't a version 2 binary results file" in capsys.readouterr().out
+
+    writeBinaryResults(csvFileName, Rows[:2])
+    monkeypatch.setattr(ResultsIO, "np", None)
+    assert len(ResultsIO.readResults(csvFileName, 6)) == 3
+
+def test_read_results_files(tmpdir, capsys):
+    fileNames = [writeResults(tmpdir, "results%u.csv" % i, Rows[i:]) for i in range(3)]
+    tables = ResultsIO.readResultsFiles(fileNames, [6, 5, 4])
+    assert [len(table) for table in tables] == [3, 2, 1]
+    assert ResultsIO.column(tables[2], 2) == [128]
+    assert "Read 6 rows from 3 files" in capsys.readouterr().out
+
+    if ResultsIO.np is not None:
+        writeBinaryResults(fileNames[1], Rows[:1])
+        tables = ResultsIO.readResultsFiles(fileNames, [6, 5, 4])
+        assert [len(table) for table in tables] == [3, 1, 1]
+
+def test_binary_matches_csv(tmpdir):
+    pytest.importorskip("numpy")
+    # sizes and flops beyond float32 precision, gflops as the client prints them
+    rows = [[4097, 16777217, 2**40 + 1, 1234.56789, float32(0.1)], [8, 8, 1024, 1e-3, 7.0]]
+    csvFileName = str(tmpdir.join("results.csv"))
+    with open(csvFileName, "w") as csvFile:
+        csvFile.write(", ".join(Names) + "\n")
+        for idx, row in enumerate(rows):
+            csvFile.write(", ".join(["%u" % idx] + ["%u" % size for size in row[:3]] \
+                + ["%.9g" % float32(gflops) for gflops in row[3:]]) + "\n")
+    binaryFileName = writeBinaryResults(csvFileName, rows)
+
+    csvTable = ResultsIO.readCSV(csvFileName, 6)
+    binaryTable = ResultsIO.readBinary(binaryFileName, 6)
+    assert ResultsIO.rows(binaryTable, 0, 6) == ResultsIO.rows(csvTable, 0, 6)
+    assert ResultsIO.column(binaryTable, 3)[0] == 2**40 + 1
+    assert ResultsIO.column(binaryTable, 2)[0] == 16777217
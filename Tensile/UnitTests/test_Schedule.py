@@ -0,0 +1,90 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+from Tensile import Code, Schedule
+
+Latencies = Schedule.getLatencies((9,0,6))
+
+def localRead(i):
+    return Code.LocalReadInst("ds_read_b32", "v%u" % i, "v100", "")
+
+def globalRead(i):
+    return Code.GlobalReadInst("buffer_load_dword", "v%u" % i, "v101", "s[0:3]", "0", "")
+
+def mac(i):
+    return Code.Inst("v_mac_f32", "v%u" % (200+i), "v0", "v1", "")
+
+def test_timeline():
+    timeline = Schedule.Timeline(Latencies)
+    timeline.issue(localRead(0))
+    timeline.issue(localRead(1))
+    # the second read waits for the LDS pipeline
+    assert timeline.stallCycles == 4
+    assert timeline.cycle == 12
+
+    readLatency = Latencies[Code.LocalReadInst][2]
+    assert timeline.startCycle(Code.WaitCnt(lgkmcnt=1)) == readLatency
+    assert timeline.startCycle(Code.WaitCnt(lgkmcnt=0)) == 8 + readLatency
+    assert timeline.startCycle(Code.WaitCnt(lgkmcnt=2)) == timeline.cycle
+    assert timeline.startCycle(Code.WaitCnt(lgkmcnt=-1, vmcnt=0)) == timeline.cycle
+
+    timeline.issue(Code.WaitCnt(lgkmcnt=0))
+    assert timeline.cycle == 8 + readLatency + 4
+
+def test_instruction_count():
+    text = Code.TextBlock("/* comment */\nlabel_0001:\n.align 4\ns_nop 0 // nop\nv_mov_b32 v0, 0\n")
+    assert Schedule.instructionCount(text) == 2
+    module = Code.Module()
+    module.addCode(text)
+    module.addCode(mac(0))
+    assert Schedule.estimateCycles([module], Latencies) == (12, 0)
+
+def test_list_schedule():
+    reads = [localRead(i) for i in range(0, 4)]
+    globalReads = [globalRead(i) for i in range(0, 2)]
+    macs = [mac(i) for i in range(0, 8)]
+    pointer = Code.TextBlock("v_xor_b32 v100, 0x100, v100\n")
+    (r, g, m, p) = range(0, 4)
+    schedule = Schedule.listSchedule([reads, globalReads, macs, [pointer]], \
+        {m: [g], p: [r]}, Latencies)
+
+    assert sorted(schedule, key=id) == sorted(reads + globalReads + macs + [pointer], key=id)
+    for chain in [reads, globalReads, macs]:
+        assert [i for i in schedule if i in chain] == chain
+    assert schedule.index(macs[0]) > schedule.index(globalReads[-1])
+    assert schedule.index(pointer) > schedule.index(reads[-1])
+
+    # memory operations are issued first, with macs filling the pipeline gaps
+    assert schedule[0] is globalReads[0]
+    assert schedule.index(reads[-1]) < schedule.index(macs[-1])
+    assert Schedule.estimateCycles(schedule, Latencies)[0] < \
+        Schedule.estimateCycles(globalReads + reads + macs + [pointer], Latencies)[0]
+
+def test_list_schedule_wait_counts():
+    reads = [localRead(i) for i in range(0, 2)]
+    wait = Code.WaitCnt(lgkmcnt=0)
+    macs = [mac(i) for i in range(0, 2)]
+    counts = lambda item, items: (-1, len([i for i in items if isinstance(i, Code.LocalReadInst)]))
+    schedule = Schedule.listSchedule([reads, [wait] + macs], {}, Latencies, waitCounts=counts)
+    # only waiting on earlier operations, the wait and macs go between the reads
+    assert schedule.index(wait) < schedule.index(reads[-1])
+    assert wait.lgkmcnt == 0
@@ -0,0 +1,143 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+import copy
+import itertools
+import pickle
+import pytest
+from Tensile import YAMLIO
+from Tensile.SolutionStructs import ProblemType, Solution, rejectionCounts
+from Tensile.UnitTests.LiteConfigs import baseSolution, logicFiles
+
+def test_identity_matches_name():
+    base = baseSolution()
+    other = copy.copy(base)
+    assert other == base and hash(other) == hash(base)
+
+    # cached identities aren't pickled
+    unpickled = pickle.loads(pickle.dumps(base))
+    assert unpickled._identity is None and unpickled == base
+
+    # parameters outside the name don't change the identity
+    other["AssignedDerivedParameters"] = not other["AssignedDerivedParameters"]
+    assert other == base and str(other) == str(base)
+
+    other["WorkGroupMapping"] = base["WorkGroupMapping"] + 1
+    assert other != base and str(other) != str(base)
+    assert len(set([base, other, copy.copy(base), copy.copy(other)])) == 2
+
+    other["WorkGroupMapping"] = base["WorkGroupMapping"]
+    assert other == base and hash(other) == hash(base)
+
+    # WaitCntAlg is only named when it isn't the default
+    assert base["WaitCntAlg"] == 0 and "_WCA" not in str(base)
+    other["WaitCntAlg"] = 1
+    assert other != base and "_WCA1_" in str(other)
+    other["WaitCntAlg"] = 0
+    assert other == base and str(other) == str(base)
+
+    other["ProblemType"] = ProblemType.FromConfig( \
+        dict(base["ProblemType"].state, UseBeta=not base["ProblemType"]["UseBeta"]))
+    assert other != base and str(other) != str(base)
+
+def test_kernels():
+    solution = baseSolution()
+    kernel = solution.getKernels()[0]
+    assert kernel["Kernel"] and "Kernel" not in solution
+    assert kernel["ProblemType"] is solution["ProblemType"]
+    assert kernel["WorkGroup"] is solution["WorkGroup"]
+
+    # kernel writers replace parameters without affecting the solution
+    kernel["LSCA"] = solution["LSCA"] + 1
+    assert kernel["LSCA"] != solution["LSCA"]
+
+def test_naming():
+    solutions = YAMLIO.readLibraryLogicForSchedule(logicFiles()[0])[3]
+    kernels = [solution.getKernels()[0] for solution in solutions]
+
+    for objs in [solutions, kernels]:
+        minNaming = Solution.getMinNaming(objs)
+        names = Solution.getNamesMin(objs, minNaming)
+        assert names == [Solution.getNameMin(obj, minNaming) for obj in objs]
+        assert len(set(names)) == len(objs)
+
+        serialNaming = Solution.getSerialNaming(objs)
+        names = Solution.getNamesSerial(objs, serialNaming)
+        assert names == [Solution.getNameSerial(obj, serialNaming) for obj in objs]
+        assert len(set(names)) == len(objs)
+
+    assert Solution.getNamesMin(solutions, Solution.getMinNaming(solutions))[0] == \
+        "Cijk_Ailk_Bjlk_SB_MT64x128x16_SE_EPS1_GRVW4_PGR1_SNLL1_TT4_8_USFGRO0_VW4_WG16_16_1_WGM8"
+    assert Solution.getNamesSerial(solutions, Solution.getSerialNaming(solutions)) == \
+        ["S5422", "S4472", "S4424", "S5374", "S5517", "S1773", "S0279"]
+
+def test_prefilter():
+    problemType = {"OperationType": "GEMM", "DataType": "s", "TransposeA": False, \
+        "TransposeB": True, "UseBeta": True, "Batched": True}
+    space = {"WorkGroup": [[16,16,1], [8,8,1], [16,16,2], [64,4,1], [8,8,4]],
+             "ThreadTile": [[4,4], [8,8], [6,6], [16,16]],
+             "DepthU": [-1, 8, 32, 128],
+             "GlobalReadVectorWidth": [-1, 2, 8],
+             "VectorWidth": [-1, 4],
+             "KernelLanguage": ["Assembly"]}
+
+    rejectionCounts.clear()
+    numPrefiltered = 0
+    for values in itertools.product(*space.values()):
+        config = dict(zip(space.keys(), values))
+        config["ProblemType"] = problemType
+        state = Solution.initialState(config)
+        Solution.assignProblemIndependentDerivedParameters(state)
+        passed = Solution.prefilter(state)
+
+        # anything the cheap checks reject is also rejected after full evaluation
+        state = Solution.initialState(copy.deepcopy(config))
+        state["ProblemType"] = ProblemType(state["ProblemType"])
+        Solution.assignDerivedParameters(state)
+        assert passed or not state["Valid"]
+        assert Solution(config)["Valid"] == state["Valid"]
+        numPrefiltered += not passed
+
+    assert numPrefiltered > 0
+    assert rejectionCounts["Kernel Uses # > # bytes of LDS"] > 0
+    assert rejectionCounts["GRVW * DataType.numBytes() > #"] > 0
+
+def test_problem_type_interning():
+    base = baseSolution()
+    problemType = base["ProblemType"]
+    assert problemType.interned
+    assert ProblemType.FromConfig(dict(problemType.state)) is problemType
+    assert copy.deepcopy(problemType) is problemType
+    assert pickle.loads(pickle.dumps(problemType)) is problemType
+    assert pickle.loads(pickle.dumps(base))["ProblemType"] is problemType
+    with pytest.raises(RuntimeError):
+        problemType["UseBeta"] = not problemType["UseBeta"]
+
+    # problem types built directly are neither shared nor frozen
+    config = {"OperationType": "GEMM", "DataType": "s", "TransposeA": False, \
+        "TransposeB": True, "UseBeta": True, "Batched": True}
+    unshared = ProblemType(config)
+    assert ProblemType.FromConfig(config) == unshared
+    assert ProblemType.FromConfig(config) is not unshared
+    assert copy.deepcopy(unshared) is not unshared
+    unshared["UseBeta"] = False
+    assert ProblemType.FromConfig(unshared) != ProblemType.FromConfig(config)
+    assert ProblemType.FromConfig(dict(config, UseBeta=1)) is not ProblemType.FromConfig(config)
@@ -0,0 +1,68 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+import sys
+import pytest
+from Tensile.Common import globalParameters
+from Tensile.TensileCreateLibrary import assembleKernelBatch, getAssemblyCodeObjectLayout
+
+class NameWriter:
+    def getKernelName(self, kernel):
+        return kernel["Name"]
+
+def kernels(isa, count):
+    return [{"Name": "K%u_%u" % (isa[2], i), "ISA": isa, "KernelLanguage": "Assembly"} for i in range(count)]
+
+@pytest.fixture
+def shards():
+    default = globalParameters["CodeObjectShards"]
+    yield
+    globalParameters["CodeObjectShards"] = default
+
+def test_layout_unsharded(shards):
+    globalParameters["CodeObjectShards"] = 1
+    layout = getAssemblyCodeObjectLayout(kernels((9,0,0), 3) + kernels((9,0,6), 2), NameWriter())
+
+    assert list(layout.keys()) == ["TensileLibrary_gfx900.co", "TensileLibrary_gfx906.co"]
+    assert layout["TensileLibrary_gfx906.co"] == ((9,0,6), ["K6_0", "K6_1"])
+
+def test_layout_sharded(shards):
+    globalParameters["CodeObjectShards"] = 3
+    source = [{"Name": "S", "ISA": (0,0,0), "KernelLanguage": "Source"}]
+    layout = getAssemblyCodeObjectLayout(kernels((9,0,0), 7) + kernels((9,0,6), 2) + source, NameWriter())
+
+    assert list(layout.keys()) == ["TensileLibrary_gfx900_0.co", "TensileLibrary_gfx900_1.co",
+                                   "TensileLibrary_gfx900_2.co",
+                                   "TensileLibrary_gfx906_0.co", "TensileLibrary_gfx906_1.co"]
+    assert [len(names) for (isa, names) in layout.values()] == [3, 3, 1, 1, 1]
+    allNames = [name for (isa, names) in layout.values() for name in names]
+    assert allNames == ["K0_%u" % i for i in range(7)] + ["K6_0", "K6_1"]
+
+def exitArgs(code):
+    return [sys.executable, "-c", "import sys; sys.exit(%u)" % code]
+
+def test_assemble_batch(tmpdir):
+    assert assembleKernelBatch(["A", "B"], exitArgs(0), [exitArgs(1), exitArgs(1)], str(tmpdir)) == ["A", "B"]
+
+    # a failed batch is retried a kernel at a time, only failing kernels are dropped
+    assert assembleKernelBatch(["A", "B", "C"], exitArgs(1), [exitArgs(0), exitArgs(1), exitArgs(0)], \
+        str(tmpdir)) == ["A", "C"]
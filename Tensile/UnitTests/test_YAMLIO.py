@@ -0,0 +1,84 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+from __future__ import print_function
+import glob
+import io
+import json
+import os
+import pytest
+import yaml
+from Tensile import Utils, YAMLIO
+
+def liteConfigs():
+    return sorted(glob.glob(os.path.join(os.path.dirname(os.path.realpath(__file__)), \
+        "..", "..", "lib", "configs", "lite_configs", "*.yaml")))
+
+def test_streaming_library_writers():
+    masterLibrary = None
+    for logicFile in liteConfigs()[:2]:
+        library = YAMLIO.readLibraryLogicForSchedule(logicFile)[7]
+        if masterLibrary is None:
+            masterLibrary = library
+        else:
+            masterLibrary.merge(library)
+
+    stream = io.StringIO()
+    YAMLIO.dumpStreaming(masterLibrary, stream, explicitStart=True, explicitEnd=True)
+    assert stream.getvalue() == yaml.dump(Utils.state(masterLibrary), Dumper=YAMLIO.YAMLDumper, \
+        explicit_start=True, explicit_end=True)
+
+    stream = io.StringIO()
+    YAMLIO.dumpJSONStreaming(masterLibrary, stream)
+    assert stream.getvalue() == json.dumps(Utils.state(masterLibrary), sort_keys=True)
+
+def test_msgpack_library_writer(tmpdir):
+    msgpack = pytest.importorskip("msgpack")
+    library = YAMLIO.readLibraryLogicForSchedule(liteConfigs()[0])[7]
+
+    fileName = str(tmpdir.join("TensileLibrary.dat"))
+    YAMLIO.writeMsgPackStreaming(fileName, library)
+    with open(fileName, "rb") as f:
+        data = msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+
+    # the runtime library detects the format from the leading map marker
+    with open(fileName, "rb") as f:
+        assert f.read(1) in (b"\x82", b"\xde")
+    assert data == json.loads(json.dumps(Utils.state(library), sort_keys=True))
+
+    # arrays are written with their length up front
+    with pytest.raises(TypeError):
+        YAMLIO.dumpMsgPackStreaming(iter([library]), io.BytesIO(), msgpack.Packer())
+
+def test_streaming_logic_writer(tmpdir):
+    (scheduleName, deviceNames, problemType, solutions, indexOrder, exactLogic, rangeLogic, _) \
+        = YAMLIO.readLibraryLogicForSchedule(liteConfigs()[0])
+    # the writer converts problemType's data types to their values in place
+    logicFile = str(tmpdir.join("%s_%s.yaml" % (scheduleName, problemType)))
+    YAMLIO.writeLibraryLogicForSchedule(str(tmpdir), scheduleName, "gfx900", deviceNames, \
+        (problemType, solutions, indexOrder, dict([(tuple(k), v) for k, v in exactLogic]), rangeLogic))
+
+    # solutions read from logic files have a tuple ISA
+    with open(logicFile) as f:
+        data = yaml.load(f, yaml.FullLoader)
+    assert data[1:4] == [scheduleName, "gfx900", deviceNames]
+    assert [s["SolutionNameMin"] for s in data[5]] == [s["SolutionNameMin"] for s in solutions]
+    assert data[6:] == [indexOrder, exactLogic, rangeLogic]
@@ -23,6 +23,8 @@ try:
 except ImportError:
   printExit("You must install PyYAML to use Tensile (to parse config files). See http://pyyaml.org/wiki/PyYAML for installation instructions.")
 
+from Tensile.YAMLIO import YAMLLoader, YAMLSafeDumper
+
 def ensurePath( path ):
   if not os.path.exists(path):
     os.makedirs(path)
@@ -41,7 +43,7 @@ class LibraryLogic:
         stream = open(filename, "r")
       except IOError:
         printExit("Cannot open file: %s" % filename )
-      data = yaml.load(stream, yaml.SafeLoader)
+      data = yaml.load(stream, YAMLLoader)
 
       if isinstance(data, list):
 
@@ -219,7 +221,7 @@ class LibraryLogic:
     else:
       try:
         stream = open(filename, "w")
-        yaml.safe_dump(data, stream)
+        yaml.dump(data, stream, Dumper=YAMLSafeDumper)
         stream.close()
       except IOError:
         printExit("Cannot open file: %s" % filename)
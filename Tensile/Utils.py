@@ -20,6 +20,7 @@
 ################################################################################
 
 from .Common import ProgressBar
+import hashlib
 import sys
 
 class SpinnyThing:
@@ -78,6 +79,101 @@ def state(obj):
 
     return obj
 
+_scalarTypes = frozenset([type(None), bool, int, float, str])
+
+def canonical(obj):
+    """
+    Converts obj into nested tuples of builtin types.  Dictionaries are sorted
+    by key so the result (and its repr()) is independent of insertion order
+    and of object identity, which makes it suitable as a persistent key.
+    """
+    if type(obj) in _scalarTypes:
+        return obj
+
+    if isinstance(obj, dict):
+        return tuple(sorted([(str(k), canonical(v)) for k,v in obj.items()]))
+
+    if isinstance(obj, (bool, int, float, str)):
+        return obj
+
+    if isinstance(obj, (list, tuple)):
+        return tuple([canonical(i) for i in obj])
+
+    # ProblemType
+    if isinstance(getattr(obj, 'state', None), dict):
+        return (obj.__class__.__name__, canonical(obj.state))
+
+    # DataType
+    if hasattr(obj, 'value'):
+        return (obj.__class__.__name__, canonical(obj.value))
+
+    return (obj.__class__.__name__, str(obj))
+
+def digest(*objs):
+    """
+    Stable hex digest of the canonical form of objs.  Unlike hash(), the
+    result is the same across processes and Python invocations.
+    """
+    return hashlib.sha256(repr(canonical(objs)).encode()).hexdigest()
+
+def fileDigest(fileName):
+    """ sha256 hex digest of the contents of fileName. """
+    sha = hashlib.sha256()
+    with open(fileName, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+class OrderedRegistry:
+    """
+    Insertion-ordered collection of unique objects with O(1) membership tests,
+    replacing `if obj not in objs: objs.append(obj)` de-duplication of lists.
+
+    Objects are identified by key(obj).  The default key is the canonical form
+    of the object so that unhashable objects such as kernel dictionaries can be
+    registered; hashable objects (e.g. Solution) may use `key=None` to be
+    indexed by their own hash/equality.
+    """
+    def __init__(self, objs=(), key=canonical):
+        self.key = key
+        self._index = {}
+        self._objs = []
+        self.extend(objs)
+
+    def _key(self, obj):
+        return obj if self.key is None else self.key(obj)
+
+    def add(self, obj):
+        """ Registers obj unless an equal object exists.  Returns True if obj was added. """
+        key = self._key(obj)
+        if key in self._index:
+            return False
+        self._index[key] = len(self._objs)
+        self._objs.append(obj)
+        return True
+
+    def extend(self, objs):
+        for obj in objs:
+            self.add(obj)
+
+    def index(self, obj):
+        return self._index[self._key(obj)]
+
+    def __contains__(self, obj):
+        return self._key(obj) in self._index
+
+    def __len__(self):
+        return len(self._objs)
+
+    def __iter__(self):
+        return iter(self._objs)
+
+    def __getitem__(self, idx):
+        return self._objs[idx]
+
+    def list(self):
+        return list(self._objs)
+
 def hash_combine(*objs, **kwargs):
     shift = 1
     if 'shift' in kwargs:
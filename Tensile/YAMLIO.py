@@ -23,6 +23,9 @@ from .Common import print2, printExit, printWarning, versionIsCompatible
 from .SolutionStructs import Solution, ProblemSizes, ProblemType
 from . import __version__
 from . import SolutionLibrary
+from . import Utils
+from collections.abc import Iterator
+import json
 import os
 
 try:
@@ -30,6 +33,18 @@ try:
 except ImportError:
   printExit("You must install PyYAML to use Tensile (to parse config files). See http://pyyaml.org/wiki/PyYAML for installation instructions.")
 
+# libyaml's C parser and emitter are several times faster than the pure python
+# ones and produce the same documents; PyYAML is not always built with them
+YAMLLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAMLDumper = getattr(yaml, "CDumper", yaml.Dumper)
+YAMLSafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# only needed for MessagePack master libraries
+try:
+  import msgpack
+except ImportError:
+  msgpack = None
+
 ################################################################################
 # Read Benchmark Config from YAML Files
 ################################################################################
@@ -38,7 +53,7 @@ def readConfig( filename ):
     stream = open(filename, "r")
   except IOError:
     printExit("Cannot open file: %s" % filename )
-  config = yaml.load(stream, yaml.SafeLoader)
+  config = yaml.load(stream, YAMLLoader)
   stream.close()
   return config
 
@@ -46,7 +61,182 @@ def write(filename, data):
     """ Write data to a given file. """
 
     with open(filename, 'w') as f:
-        yaml.dump(data, f, explicit_start=True, explicit_end=True)
+        yaml.dump(data, f, Dumper=YAMLDumper, explicit_start=True, explicit_end=True)
+
+################################################################################
+# Streaming Writers
+# Write the state of a library while walking it instead of building the whole
+# state tree first: libraries, their rows, maps and tables, and iterators are
+# emitted piecewise, and each remaining object (a solution, a table entry, ...)
+# is converted to state on its own and dropped once written.  The output is
+# the same as dumping Utils.state() of the whole object.
+################################################################################
+class StreamedSequence:
+  """
+  A list written one item at a time.  Unlike an iterator it knows its length,
+  which MessagePack needs before the first item.
+  """
+  __slots__ = ["items"]
+
+  def __init__(self, items):
+    self.items = items
+
+  def __iter__(self):
+    return iter(self.items)
+
+  def __len__(self):
+    return len(self.items)
+
+StreamedClasses = (SolutionLibrary.MasterSolutionLibrary, SolutionLibrary.PredicateLibrary, \
+    SolutionLibrary.ProblemMapLibrary, SolutionLibrary.MatchingLibrary)
+StreamedSequences = (StreamedSequence, Iterator)
+
+def isStreamed(obj):
+  if isinstance(obj, StreamedSequences + StreamedClasses):
+    return True
+  if isinstance(obj, dict):
+    obj = obj.values()
+  elif not isinstance(obj, list):
+    return False
+  return any([isinstance(item, StreamedSequences + StreamedClasses) for item in obj])
+
+def streamedItems(obj):
+  """ Key, value pairs of a streamed mapping, sorted like the yaml representer. """
+  if isinstance(obj, dict):
+    items = list(obj.items())
+  elif isinstance(obj, SolutionLibrary.MasterSolutionLibrary):
+    items = [('solutions', StreamedSequence(list(obj.solutions.values()))), ('library', obj.library)]
+  else:
+    items = []
+    for key in obj.__class__.StateKeys:
+      attr = key
+      if isinstance(key, tuple):
+        (key, attr) = key
+      value = getattr(obj, attr)
+      items.append((key, StreamedSequence(value) if isinstance(value, list) else value))
+  try:
+    return sorted(items, key=lambda item: item[0])
+  except TypeError:
+    return items
+
+def writeStreaming(filename, obj):
+  """ Writes Utils.state(obj) to a file like write(). """
+  with open(filename, 'w') as f:
+    dumpStreaming(obj, f, explicitStart=True, explicitEnd=True)
+
+def dumpStreaming(obj, stream, explicitStart=False, explicitEnd=False, toState=Utils.state):
+  """
+  toState converts objects which aren't streamed before they are represented;
+  pass lambda x: x for data which is already plain.
+  """
+  dumper = YAMLDumper(stream)
+  try:
+    dumper.open()
+    dumper.emit(yaml.DocumentStartEvent(explicit=explicitStart))
+    emitState(dumper, obj, toState)
+    dumper.emit(yaml.DocumentEndEvent(explicit=explicitEnd))
+    dumper.close()
+  finally:
+    dumper.dispose()
+
+def emitState(dumper, obj, toState):
+  # Dumper.default_flow_style is False since PyYAML 5.1; containers of
+  # libraries are never written in flow style anyway
+  flowStyle = bool(dumper.default_flow_style)
+  if not isStreamed(obj):
+    emitNode(dumper, dumper.represent_data(toState(obj)))
+    # nothing represented so far can be aliased by later objects
+    dumper.represented_objects = {}
+    dumper.object_keeper = []
+    dumper.alias_key = None
+  elif isinstance(obj, (list,) + StreamedSequences):
+    dumper.emit(yaml.SequenceStartEvent(None, yaml.resolver.BaseResolver.DEFAULT_SEQUENCE_TAG, \
+        True, flow_style=flowStyle))
+    for item in obj:
+      emitState(dumper, item, toState)
+    dumper.emit(yaml.SequenceEndEvent())
+  else:
+    dumper.emit(yaml.MappingStartEvent(None, yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, \
+        True, flow_style=flowStyle))
+    for key, value in streamedItems(obj):
+      emitState(dumper, key, toState)
+      emitState(dumper, value, toState)
+    dumper.emit(yaml.MappingEndEvent())
+
+def emitNode(dumper, node):
+  """ Emits the events of a represented node, as yaml's Serializer does. """
+  if isinstance(node, yaml.ScalarNode):
+    detected = dumper.resolve(yaml.ScalarNode, node.value, (True, False))
+    default = dumper.resolve(yaml.ScalarNode, node.value, (False, True))
+    dumper.emit(yaml.ScalarEvent(None, node.tag, (node.tag == detected, node.tag == default), \
+        node.value, style=node.style))
+  elif isinstance(node, yaml.SequenceNode):
+    implicit = node.tag == dumper.resolve(yaml.SequenceNode, node.value, True)
+    dumper.emit(yaml.SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+    for item in node.value:
+      emitNode(dumper, item)
+    dumper.emit(yaml.SequenceEndEvent())
+  else:
+    implicit = node.tag == dumper.resolve(yaml.MappingNode, node.value, True)
+    dumper.emit(yaml.MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style))
+    for key, value in node.value:
+      emitNode(dumper, key)
+      emitNode(dumper, value)
+    dumper.emit(yaml.MappingEndEvent())
+
+def writeJSONStreaming(filename, obj):
+  """ Writes Utils.state(obj) to a file like json.dump(..., sort_keys=True). """
+  with open(filename, 'w') as f:
+    dumpJSONStreaming(obj, f)
+
+def dumpJSONStreaming(obj, stream):
+  if not isStreamed(obj):
+    stream.write(json.dumps(Utils.state(obj), sort_keys=True))
+  elif isinstance(obj, (list,) + StreamedSequences):
+    stream.write("[")
+    for idx, item in enumerate(obj):
+      if idx > 0:
+        stream.write(", ")
+      dumpJSONStreaming(item, stream)
+    stream.write("]")
+  else:
+    stream.write("{")
+    for idx, (key, value) in enumerate(streamedItems(obj)):
+      if idx > 0:
+        stream.write(", ")
+      # library keys are all strings
+      stream.write(json.dumps(str(key)))
+      stream.write(": ")
+      dumpJSONStreaming(value, stream)
+    stream.write("}")
+
+def writeMsgPackStreaming(filename, obj):
+  """
+  Writes Utils.state(obj) to a file in MessagePack format, which the runtime
+  library loads considerably faster than YAML.
+  """
+  if msgpack is None:
+    printExit("You must install msgpack to write MessagePack libraries. See https://pypi.org/project/msgpack")
+  with open(filename, 'wb') as f:
+    dumpMsgPackStreaming(obj, f, msgpack.Packer(use_bin_type=True))
+
+def dumpMsgPackStreaming(obj, stream, packer):
+  if not isStreamed(obj):
+    stream.write(packer.pack(Utils.state(obj)))
+  elif isinstance(obj, (list, StreamedSequence)):
+    # arrays are prefixed with their length, so plain iterators can't be written
+    stream.write(packer.pack_array_header(len(obj)))
+    for item in obj:
+      dumpMsgPackStreaming(item, stream, packer)
+  elif isinstance(obj, Iterator):
+    raise TypeError("MessagePack arrays need their length; write a StreamedSequence instead of an iterator")
+  else:
+    items = streamedItems(obj)
+    stream.write(packer.pack_map_header(len(items)))
+    for key, value in items:
+      # library keys are all strings
+      stream.write(packer.pack(str(key)))
+      dumpMsgPackStreaming(value, stream, packer)
 
 ################################################################################
 # Write List of Solutions to YAML File
@@ -56,14 +246,8 @@ def writeSolutions( filename, problemSizes, solutions ):
   solutionStates = []
   for hardcoded in solutions:
     for solution in hardcoded:
-      solutionState = solution.getAttributes()
-      solutionState["ProblemType"] = solutionState["ProblemType"].state
-      solutionState["ProblemType"]["DataType"] = \
-          solutionState["ProblemType"]["DataType"].value
-      solutionState["ProblemType"]["DestDataType"] = \
-          solutionState["ProblemType"]["DestDataType"].value
-      solutionState["ProblemType"]["ComputeDataType"] = \
-          solutionState["ProblemType"]["ComputeDataType"].value
+      solutionState = dict(solution.getAttributes())
+      solutionState["ProblemType"] = problemTypeToState(solutionState["ProblemType"])
       solutionStates.append(solutionState)
   # write dictionaries
   try:
@@ -76,7 +260,7 @@ def writeSolutions( filename, problemSizes, solutions ):
     stream.write("  - Range: %s\n" % sizeRange)
   for sizeExact in problemSizes.exacts:
     stream.write("  - Exact: %s\n" % list(sizeExact))
-  yaml.dump(solutionStates, stream, default_flow_style=False)
+  yaml.dump(solutionStates, stream, Dumper=YAMLDumper, default_flow_style=False)
   stream.close()
 
 
@@ -88,7 +272,7 @@ def readSolutions( filename ):
     stream = open(filename, "r")
   except IOError:
     printExit("Cannot open file: %s" % filename )
-  solutionStates = yaml.load(stream, yaml.SafeLoader)
+  solutionStates = yaml.load(stream, YAMLLoader)
   stream.close()
 
   # verify
@@ -139,27 +323,9 @@ def writeLibraryLogicForSchedule( filePath, schedulePrefix, architectureName, de
   # schedule device names
   data.append(deviceNames)
   # problem type
-  problemTypeState = problemType.state
-  problemTypeState["DataType"] = \
-      problemTypeState["DataType"].value
-  problemTypeState["DestDataType"] = \
-      problemTypeState["DestDataType"].value
-  problemTypeState["ComputeDataType"] = \
-      problemTypeState["ComputeDataType"].value
-  data.append(problemTypeState)
-  # solutions
-  solutionList = []
-  for solution in solutions:
-    solutionState = solution.getAttributes()
-    solutionState["ProblemType"] = solutionState["ProblemType"].state
-    solutionState["ProblemType"]["DataType"] = \
-        solutionState["ProblemType"]["DataType"].value
-    solutionState["ProblemType"]["DestDataType"] = \
-        solutionState["ProblemType"]["DestDataType"].value
-    solutionState["ProblemType"]["ComputeDataType"] = \
-        solutionState["ProblemType"]["ComputeDataType"].value
-    solutionList.append(solutionState)
-  data.append(solutionList)
+  data.append(problemTypeToState(problemType))
+  # solutions, copied one at a time while writing
+  data.append(logicSolutionStates(solutions))
   # index order
   data.append(indexOrder)
 
@@ -175,11 +341,26 @@ def writeLibraryLogicForSchedule( filePath, schedulePrefix, architectureName, de
   # open & write file
   try:
     stream = open(filename, "w")
-    yaml.dump(data, stream)
+    dumpStreaming(data, stream, toState=lambda obj: obj)
     stream.close()
   except IOError:
     printExit("Cannot open file: %s" % filename)
 
+# copy of the state of problemType, with data types as their values; problem
+# types are shared between solutions, so their states are never modified
+def problemTypeToState(problemType):
+  state = dict(problemType.state)
+  state["DataType"] = state["DataType"].value
+  state["DestDataType"] = state["DestDataType"].value
+  state["ComputeDataType"] = state["ComputeDataType"].value
+  return state
+
+def logicSolutionStates(solutions):
+  for solution in solutions:
+    solutionState = dict(solution.getAttributes())
+    solutionState["ProblemType"] = problemTypeToState(solutionState["ProblemType"])
+    yield solutionState
+
 ################################################################################
 # Read Library Logic from YAML
 ################################################################################
@@ -189,7 +370,7 @@ def readLibraryLogicForSchedule( filename ):
     stream = open(filename, "r")
   except IOError:
     printExit("Cannot open file: %s" % filename )
-  data = yaml.load(stream, yaml.SafeLoader)
+  data = yaml.load(stream, YAMLLoader)
   stream.close()
 
   # verify
@@ -215,11 +396,14 @@ def readLibraryLogicForSchedule( filename ):
         % (filename, versionString, __version__) )
 
   # unpack problemType
-  problemType = ProblemType(problemTypeState)
+  problemType = ProblemType.FromConfig(problemTypeState)
   # unpack solutions
   solutions = []
   for i in range(0, len(solutionStates)):
     solutionState = solutionStates[i]
+    # most solutions repeat the problem type of the file
+    if solutionState["ProblemType"] == problemTypeState:
+      solutionState["ProblemType"] = problemType
     if solutionState["KernelLanguage"] == "Assembly":
       isa0 = int(architectureName[3])
       isa1 = int(architectureName[4])
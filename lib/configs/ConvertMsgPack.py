@@ -0,0 +1,58 @@
+################################################################################
+# Copyright (C) 2019 Advanced Micro Devices, Inc. All rights reserved.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell cop-
+# ies of the Software, and to permit persons to whom the Software is furnished
+# to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IM-
+# PLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS
+# FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER
+# IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNE-
+# CTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+################################################################################
+
+"""
+Converts master solution library YAML files to MessagePack, as
+TensileCreateLibrary --library-format=msgpack writes them.
+
+  python ConvertMsgPack.py <output dir> <library.yaml> ...
+
+Each library.yaml is written to <output dir>/library.dat.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+
+import msgpack
+import yaml
+
+YAMLLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+def convert(outputDir, inFile):
+    with open(inFile) as f:
+        data = yaml.load(f, YAMLLoader)
+
+    outFile = os.path.join(outputDir, os.path.splitext(os.path.basename(inFile))[0] + ".dat")
+    with open(outFile, "wb") as f:
+        f.write(msgpack.packb(data, use_bin_type=True))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    if not os.path.isdir(sys.argv[1]):
+        os.makedirs(sys.argv[1])
+
+    for inFile in sys.argv[2:]:
+        convert(sys.argv[1], inFile)
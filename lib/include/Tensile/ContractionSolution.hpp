@@ -99,6 +99,8 @@ namespace Tensile
 
         int index;
         std::string kernelName;
+        /// Name of the code object file containing the kernel, if recorded.
+        std::string codeObject;
         bool debugKernel = false;
 
         std::shared_ptr<Predicates::Predicate<Problem>>  problemPredicate =
@@ -64,6 +64,8 @@ namespace Tensile
                 iot::mapRequired(io, "sizeMapping", s.sizeMapping);
                 iot::mapRequired(io, "problemType", s.problemType);
 
+                iot::mapOptional(io, "codeObject", s.codeObject);
+
             }
 
             const static bool flow = false;
@@ -0,0 +1,362 @@
+/*******************************************************************************
+ *
+ * MIT License
+ *
+ * Copyright (c) 2019 Advanced Micro Devices, Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ *
+ *******************************************************************************/
+
+#pragma once
+
+#include <Tensile/Serialization.hpp>
+#include <Tensile/Utils.hpp>
+
+#include <cstdint>
+#include <limits>
+#include <string>
+#include <type_traits>
+#include <vector>
+
+namespace Tensile
+{
+    namespace Serialization
+    {
+        /**
+         * A decoded MessagePack document.  Map keys are converted to strings
+         * since the serialization traits look members up by name.
+         */
+        struct MessagePackObject
+        {
+            enum class Type
+            {
+                Nil,
+                Bool,
+                Int,
+                UInt,
+                Float,
+                String,
+                Binary,
+                Array,
+                Map
+            };
+
+            Type type = Type::Nil;
+
+            bool     boolValue  = false;
+            int64_t  intValue   = 0;
+            uint64_t uintValue  = 0;
+            double   floatValue = 0.0;
+
+            /// String and Binary values.
+            std::string stringValue;
+
+            /// Array elements, or map values in the order of `keys`.
+            std::vector<MessagePackObject> elements;
+            std::vector<std::string>       keys;
+
+            /**
+             * Returns the value of map member `key`, or nullptr.  Members are
+             * usually looked up in the order they were written, so the search
+             * starts at `hint`, which is left just past the member found.
+             */
+            MessagePackObject const* find(std::string const& key, size_t & hint) const;
+
+            std::string typeName() const;
+        };
+
+        /**
+         * Decodes a single MessagePack object spanning all of `data`.
+         * Throws std::runtime_error if the data is malformed.
+         */
+        MessagePackObject ReadMessagePack(uint8_t const* data, size_t size);
+
+        /**
+         * True if `data` starts with a MessagePack map, which is how a master
+         * solution library begins.  YAML and JSON documents never do.
+         */
+        bool IsMessagePack(uint8_t const* data, size_t size);
+
+        /**
+         * Serialization IO reading from a decoded MessagePack document.
+         * Mirrors the semantics of llvm::yaml::Input as used by the
+         * serialization traits: required members must be present, the context
+         * is shared by the whole document and the first error aborts the rest
+         * of the input.
+         */
+        class MessagePackInput
+        {
+        public:
+            explicit MessagePackInput(MessagePackObject const& object);
+
+            template <typename T>
+            void input(T & value);
+
+            bool error() const { return !m_state->error.empty(); }
+            std::string const& errorMessage() const { return m_state->error; }
+
+            template <typename T>
+            void mapMember(const char * key, T & value, bool required);
+
+            template <typename T>
+            void enumCase(T & member, const char * key, T value);
+
+            void setError(std::string const& msg);
+
+            void setContext(void * context) { m_state->context = context; }
+            void * getContext() const { return m_state->context; }
+
+        private:
+            struct State
+            {
+                void *      context = nullptr;
+                std::string error;
+            };
+
+            MessagePackInput(MessagePackObject const& object, MessagePackInput & parent, std::string key);
+
+            template <typename T>
+            using Kind = std::integral_constant<int,
+                has_EmptyMappingTraits <T, MessagePackInput>::value ? 1 :
+                has_SequenceTraits     <T, MessagePackInput>::value ? 2 :
+                has_CustomMappingTraits<T, MessagePackInput>::value ? 3 :
+                has_EnumTraits         <T, MessagePackInput>::value ? 4 : 0>;
+
+            template <typename T> void read(T & value, std::integral_constant<int, 1>);
+            template <typename T> void read(T & value, std::integral_constant<int, 2>);
+            template <typename T> void read(T & value, std::integral_constant<int, 3>);
+            template <typename T> void read(T & value, std::integral_constant<int, 4>);
+            template <typename T> void read(T & value, std::integral_constant<int, 0>) { readScalar(value); }
+
+            void readScalar(bool & value);
+            void readScalar(std::string & value);
+
+            template <typename T>
+            typename std::enable_if<std::is_integral<T>::value>::type
+            readScalar(T & value);
+
+            template <typename T>
+            typename std::enable_if<std::is_floating_point<T>::value>::type
+            readScalar(T & value);
+
+            template <typename T>
+            void readScalar(std::vector<T> & value);
+
+            bool expect(MessagePackObject::Type type);
+            std::string path() const;
+
+            MessagePackObject const& m_object;
+            MessagePackInput const*  m_parent = nullptr;
+            std::string              m_key;
+
+            State   m_rootState;
+            State * m_state;
+
+            size_t m_hint = 0;
+            bool   m_enumMatched = false;
+        };
+
+        template <>
+        struct IOTraits<MessagePackInput>
+        {
+            using IO = MessagePackInput;
+
+            template <typename T>
+            static void mapRequired(IO & io, const char* key, T & obj)
+            {
+                io.mapMember(key, obj, true);
+            }
+
+            template <typename T>
+            static void mapOptional(IO & io, const char* key, T & obj)
+            {
+                io.mapMember(key, obj, false);
+            }
+
+            static bool outputting(IO & io)
+            {
+                return false;
+            }
+
+            static void setError(IO & io, std::string const& msg)
+            {
+                io.setError(msg);
+            }
+
+            static void setContext(IO & io, void * ctx)
+            {
+                io.setContext(ctx);
+            }
+
+            static void * getContext(IO & io)
+            {
+                return io.getContext();
+            }
+
+            template <typename T>
+            static void enumCase(IO & io, T & member, const char * key, T value)
+            {
+                io.enumCase(member, key, value);
+            }
+        };
+
+        template <typename T>
+        void MessagePackInput::input(T & value)
+        {
+            if(error())
+                return;
+
+            read(value, Kind<T>());
+        }
+
+        template <typename T>
+        void MessagePackInput::mapMember(const char * key, T & value, bool required)
+        {
+            if(error() || !expect(MessagePackObject::Type::Map))
+                return;
+
+            auto member = m_object.find(key, m_hint);
+            if(member == nullptr)
+            {
+                if(required)
+                    setError(concatenate("missing required key '", key, "'"));
+                return;
+            }
+
+            MessagePackInput child(*member, *this, key);
+            child.input(value);
+        }
+
+        template <typename T>
+        void MessagePackInput::enumCase(T & member, const char * key, T value)
+        {
+            if(!m_enumMatched
+               && m_object.type == MessagePackObject::Type::String
+               && m_object.stringValue == key)
+            {
+                member = value;
+                m_enumMatched = true;
+            }
+        }
+
+        template <typename T>
+        void MessagePackInput::read(T & value, std::integral_constant<int, 1>)
+        {
+            if(expect(MessagePackObject::Type::Map))
+                MappingTraits<T, MessagePackInput>::mapping(*this, value);
+        }
+
+        template <typename T>
+        void MessagePackInput::read(T & value, std::integral_constant<int, 2>)
+        {
+            using Impl = SequenceTraits<T, MessagePackInput>;
+
+            if(!expect(MessagePackObject::Type::Array))
+                return;
+
+            for(size_t i = 0; i < m_object.elements.size() && !error(); i++)
+            {
+                auto & element = Impl::element(*this, value, i);
+                MessagePackInput child(m_object.elements[i], *this, std::to_string(i));
+                child.input(element);
+            }
+        }
+
+        template <typename T>
+        void MessagePackInput::read(T & value, std::integral_constant<int, 3>)
+        {
+            if(!expect(MessagePackObject::Type::Map))
+                return;
+
+            for(size_t i = 0; i < m_object.keys.size() && !error(); i++)
+                CustomMappingTraits<T, MessagePackInput>::inputOne(*this, m_object.keys[i], value);
+        }
+
+        template <typename T>
+        void MessagePackInput::read(T & value, std::integral_constant<int, 4>)
+        {
+            if(!expect(MessagePackObject::Type::String))
+                return;
+
+            m_enumMatched = false;
+            EnumTraits<T, MessagePackInput>::enumeration(*this, value);
+
+            if(!m_enumMatched)
+                setError(concatenate("unknown enumerated value '", m_object.stringValue, "'"));
+        }
+
+        template <typename T>
+        typename std::enable_if<std::is_integral<T>::value>::type
+        MessagePackInput::readScalar(T & value)
+        {
+            using Limits = std::numeric_limits<T>;
+
+            bool inRange = false;
+            if(m_object.type == MessagePackObject::Type::UInt)
+            {
+                inRange = m_object.uintValue <= static_cast<uint64_t>(Limits::max());
+                value = static_cast<T>(m_object.uintValue);
+            }
+            else if(m_object.type == MessagePackObject::Type::Int)
+            {
+                inRange = Limits::is_signed && m_object.intValue >= static_cast<int64_t>(Limits::min());
+                value = static_cast<T>(m_object.intValue);
+            }
+            else
+            {
+                setError(concatenate("expected an integer, found ", m_object.typeName()));
+                return;
+            }
+
+            if(!inRange)
+                setError("integer out of range");
+        }
+
+        template <typename T>
+        typename std::enable_if<std::is_floating_point<T>::value>::type
+        MessagePackInput::readScalar(T & value)
+        {
+            if(m_object.type == MessagePackObject::Type::Float)
+                value = static_cast<T>(m_object.floatValue);
+            else if(m_object.type == MessagePackObject::Type::UInt)
+                value = static_cast<T>(m_object.uintValue);
+            else if(m_object.type == MessagePackObject::Type::Int)
+                value = static_cast<T>(m_object.intValue);
+            else
+                setError(concatenate("expected a number, found ", m_object.typeName()));
+        }
+
+        template <typename T>
+        void MessagePackInput::readScalar(std::vector<T> & value)
+        {
+            if(!expect(MessagePackObject::Type::Array))
+                return;
+
+            value.resize(m_object.elements.size());
+            for(size_t i = 0; i < m_object.elements.size() && !error(); i++)
+            {
+                MessagePackInput child(m_object.elements[i], *this, std::to_string(i));
+                T element;
+                child.input(element);
+                value[i] = element;
+            }
+        }
+    }
+}
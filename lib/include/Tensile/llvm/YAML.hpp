@@ -135,6 +135,12 @@ namespace Tensile
                 io.mapRequired(key, obj, ctx);
             }
 
+            template <typename T>
+            static void mapOptional(IO & io, const char* key, T & obj)
+            {
+                io.mapOptional(key, obj);
+            }
+
             static bool outputting(IO & io)
             {
                 return io.outputting();
@@ -32,6 +32,8 @@
 #include <Tensile/EmbeddedData.hpp>
 
 #include <Tensile/llvm/Loading.hpp>
+#include <Tensile/msgpack/Loading.hpp>
+#include <Tensile/Serialization/MessagePack.hpp>
 
 namespace Tensile
 {
@@ -43,6 +45,9 @@ namespace Tensile
         if(data.size() != 1)
             throw std::runtime_error(concatenate("Expected one data item, found ", data.size()));
 
+        if(Serialization::IsMessagePack(data[0].data(), data[0].size()))
+            return MessagePackLoadLibraryData<MyProblem, MySolution>(data[0]);
+
         return LLVMLoadLibraryData<MyProblem, MySolution>(data[0]);
     }
 
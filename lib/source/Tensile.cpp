@@ -31,6 +31,7 @@
 
 #ifdef TENSILE_DEFAULT_SERIALIZATION
 #include <Tensile/llvm/Loading.hpp>
+#include <Tensile/msgpack/Loading.hpp>
 #endif
 
 namespace Tensile
@@ -46,6 +47,9 @@ namespace Tensile
     template <typename MyProblem, typename MySolution>
     std::shared_ptr<SolutionLibrary<MyProblem, MySolution>> LoadLibraryFile(std::string const& filename)
     {
+        if(IsMessagePackLibraryFile(filename))
+            return MessagePackLoadLibraryFile<MyProblem, MySolution>(filename);
+
         return LLVMLoadLibraryFile<MyProblem, MySolution>(filename);
     }
 
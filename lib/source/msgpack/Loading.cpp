@@ -0,0 +1,94 @@
+/*******************************************************************************
+ *
+ * MIT License
+ *
+ * Copyright (c) 2019 Advanced Micro Devices, Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ *
+ *******************************************************************************/
+
+#include <Tensile/Tensile.hpp>
+#include <Tensile/ContractionLibrary.hpp>
+#include <Tensile/msgpack/Loading.hpp>
+#include <Tensile/Serialization/MessagePack.hpp>
+
+#include <fstream>
+#include <iterator>
+
+namespace Tensile
+{
+    template <typename MyProblem, typename MySolution>
+    std::shared_ptr<SolutionLibrary<MyProblem, MySolution>> MessagePackLoadLibraryFile(std::string const& filename)
+    {
+        std::ifstream inputFile(filename, std::ios::binary);
+        if(!inputFile)
+            return nullptr;
+
+        std::vector<uint8_t> data((std::istreambuf_iterator<char>(inputFile)),
+                                  std::istreambuf_iterator<char>());
+
+        try
+        {
+            return MessagePackLoadLibraryData<MyProblem, MySolution>(data);
+        }
+        catch(std::runtime_error const&)
+        {
+            return nullptr;
+        }
+    }
+
+    template <typename MyProblem, typename MySolution>
+    std::shared_ptr<SolutionLibrary<MyProblem, MySolution>> MessagePackLoadLibraryData(std::vector<uint8_t> const& data)
+    {
+        using Library = MasterSolutionLibrary<MyProblem, MySolution>;
+
+        auto object = Serialization::ReadMessagePack(data.data(), data.size());
+
+        auto rv = std::make_shared<Library>();
+
+        Serialization::MessagePackInput input(object);
+        input.input(*rv);
+
+        if(input.error())
+        {
+            throw std::runtime_error(input.errorMessage());
+        }
+
+        return rv;
+    }
+
+    bool IsMessagePackLibraryFile(std::string const& filename)
+    {
+        std::ifstream inputFile(filename, std::ios::binary);
+
+        uint8_t first = 0;
+        inputFile.read(reinterpret_cast<char *>(&first), 1);
+
+        return inputFile && Serialization::IsMessagePack(&first, 1);
+    }
+
+    template
+    std::shared_ptr<SolutionLibrary<ContractionProblem, ContractionSolution>>
+    MessagePackLoadLibraryFile<ContractionProblem, ContractionSolution>(std::string const& filename);
+
+    template
+    std::shared_ptr<SolutionLibrary<ContractionProblem, ContractionSolution>>
+    MessagePackLoadLibraryData<ContractionProblem, ContractionSolution>(std::vector<uint8_t> const& data);
+}
@@ -0,0 +1,343 @@
+/*******************************************************************************
+ *
+ * MIT License
+ *
+ * Copyright (c) 2019 Advanced Micro Devices, Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ *
+ *******************************************************************************/
+
+#include <Tensile/Serialization/MessagePack.hpp>
+
+#include <cstring>
+#include <sstream>
+#include <stdexcept>
+
+namespace Tensile
+{
+    namespace Serialization
+    {
+        namespace
+        {
+            /**
+             * Recursive descent decoder for the subset of MessagePack produced
+             * by the msgpack Python package: everything except extension types.
+             */
+            class MessagePackReader
+            {
+            public:
+                MessagePackReader(uint8_t const* data, size_t size)
+                    : m_data(data), m_size(size)
+                {
+                }
+
+                MessagePackObject readDocument()
+                {
+                    MessagePackObject rv;
+                    readObject(rv, 0);
+
+                    if(m_pos != m_size)
+                        fail("trailing data");
+
+                    return rv;
+                }
+
+            private:
+                // Nesting limit, so that malformed input can't exhaust the stack.
+                static const int MaxDepth = 256;
+
+                uint8_t const* m_data;
+                size_t         m_size;
+                size_t         m_pos = 0;
+
+                [[noreturn]] void fail(std::string const& msg) const
+                {
+                    throw std::runtime_error(concatenate("Invalid MessagePack data at offset ", m_pos, ": ", msg));
+                }
+
+                uint8_t const* take(size_t bytes)
+                {
+                    if(bytes > m_size - m_pos)
+                        fail("unexpected end of data");
+
+                    auto rv = m_data + m_pos;
+                    m_pos += bytes;
+                    return rv;
+                }
+
+                uint64_t readUnsigned(size_t bytes)
+                {
+                    auto p = take(bytes);
+
+                    // big-endian
+                    uint64_t rv = 0;
+                    for(size_t i = 0; i < bytes; i++)
+                        rv = (rv << 8) | p[i];
+                    return rv;
+                }
+
+                int64_t readSigned(size_t bytes)
+                {
+                    uint64_t value = readUnsigned(bytes);
+                    uint64_t sign = uint64_t(1) << (bytes * 8 - 1);
+
+                    if(bytes < 8 && (value & sign))
+                        value |= ~((sign << 1) - 1);
+
+                    int64_t rv;
+                    std::memcpy(&rv, &value, sizeof(rv));
+                    return rv;
+                }
+
+                void readInt(MessagePackObject & obj, int64_t value)
+                {
+                    if(value >= 0)
+                    {
+                        obj.type = MessagePackObject::Type::UInt;
+                        obj.uintValue = value;
+                    }
+                    else
+                    {
+                        obj.type = MessagePackObject::Type::Int;
+                        obj.intValue = value;
+                    }
+                }
+
+                void readString(MessagePackObject & obj, MessagePackObject::Type type, size_t length)
+                {
+                    obj.type = type;
+                    obj.stringValue.assign(reinterpret_cast<char const*>(take(length)), length);
+                }
+
+                void readArray(MessagePackObject & obj, size_t length, int depth)
+                {
+                    // each element takes at least one byte
+                    if(length > m_size - m_pos)
+                        fail("array length exceeds data");
+
+                    obj.type = MessagePackObject::Type::Array;
+                    obj.elements.resize(length);
+                    for(auto & element: obj.elements)
+                        readObject(element, depth + 1);
+                }
+
+                void readMap(MessagePackObject & obj, size_t length, int depth)
+                {
+                    if(length > (m_size - m_pos) / 2)
+                        fail("map length exceeds data");
+
+                    obj.type = MessagePackObject::Type::Map;
+                    obj.keys.resize(length);
+                    obj.elements.resize(length);
+                    for(size_t i = 0; i < length; i++)
+                    {
+                        MessagePackObject key;
+                        readObject(key, depth + 1);
+
+                        if(key.type == MessagePackObject::Type::String)
+                            obj.keys[i] = std::move(key.stringValue);
+                        else if(key.type == MessagePackObject::Type::UInt)
+                            obj.keys[i] = std::to_string(key.uintValue);
+                        else if(key.type == MessagePackObject::Type::Int)
+                            obj.keys[i] = std::to_string(key.intValue);
+                        else
+                            fail(concatenate("unsupported map key type ", key.typeName()));
+
+                        readObject(obj.elements[i], depth + 1);
+                    }
+                }
+
+                void readObject(MessagePackObject & obj, int depth)
+                {
+                    using Type = MessagePackObject::Type;
+
+                    if(depth > MaxDepth)
+                        fail("nesting too deep");
+
+                    uint8_t marker = *take(1);
+
+                    if(marker <= 0x7f)   return readInt(obj, marker);
+                    if(marker >= 0xe0)   return readInt(obj, static_cast<int8_t>(marker));
+                    if(marker <= 0x8f)   return readMap(obj, marker & 0x0f, depth);
+                    if(marker <= 0x9f)   return readArray(obj, marker & 0x0f, depth);
+                    if(marker <= 0xbf)   return readString(obj, Type::String, marker & 0x1f);
+
+                    switch(marker)
+                    {
+                        case 0xc0: obj.type = Type::Nil; return;
+                        case 0xc2: obj.type = Type::Bool; obj.boolValue = false; return;
+                        case 0xc3: obj.type = Type::Bool; obj.boolValue = true;  return;
+
+                        case 0xc4: return readString(obj, Type::Binary, readUnsigned(1));
+                        case 0xc5: return readString(obj, Type::Binary, readUnsigned(2));
+                        case 0xc6: return readString(obj, Type::Binary, readUnsigned(4));
+
+                        case 0xca:
+                        {
+                            uint32_t bits = readUnsigned(4);
+                            float value;
+                            std::memcpy(&value, &bits, sizeof(value));
+                            obj.type = Type::Float;
+                            obj.floatValue = value;
+                            return;
+                        }
+                        case 0xcb:
+                        {
+                            uint64_t bits = readUnsigned(8);
+                            std::memcpy(&obj.floatValue, &bits, sizeof(bits));
+                            obj.type = Type::Float;
+                            return;
+                        }
+
+                        case 0xcc: obj.type = Type::UInt; obj.uintValue = readUnsigned(1); return;
+                        case 0xcd: obj.type = Type::UInt; obj.uintValue = readUnsigned(2); return;
+                        case 0xce: obj.type = Type::UInt; obj.uintValue = readUnsigned(4); return;
+                        case 0xcf: obj.type = Type::UInt; obj.uintValue = readUnsigned(8); return;
+
+                        case 0xd0: return readInt(obj, readSigned(1));
+                        case 0xd1: return readInt(obj, readSigned(2));
+                        case 0xd2: return readInt(obj, readSigned(4));
+                        case 0xd3: return readInt(obj, readSigned(8));
+
+                        case 0xd9: return readString(obj, Type::String, readUnsigned(1));
+                        case 0xda: return readString(obj, Type::String, readUnsigned(2));
+                        case 0xdb: return readString(obj, Type::String, readUnsigned(4));
+
+                        case 0xdc: return readArray(obj, readUnsigned(2), depth);
+                        case 0xdd: return readArray(obj, readUnsigned(4), depth);
+                        case 0xde: return readMap(obj, readUnsigned(2), depth);
+                        case 0xdf: return readMap(obj, readUnsigned(4), depth);
+                    }
+
+                    fail(concatenate("unsupported type marker ", static_cast<int>(marker)));
+                }
+            };
+        }
+
+        MessagePackObject const* MessagePackObject::find(std::string const& key, size_t & hint) const
+        {
+            for(size_t i = 0; i < keys.size(); i++)
+            {
+                size_t idx = (hint + i) % keys.size();
+                if(keys[idx] == key)
+                {
+                    hint = idx + 1;
+                    return &elements[idx];
+                }
+            }
+
+            return nullptr;
+        }
+
+        std::string MessagePackObject::typeName() const
+        {
+            switch(type)
+            {
+                case Type::Nil:    return "nil";
+                case Type::Bool:   return "bool";
+                case Type::Int:
+                case Type::UInt:   return "integer";
+                case Type::Float:  return "float";
+                case Type::String: return "string";
+                case Type::Binary: return "binary";
+                case Type::Array:  return "array";
+                case Type::Map:    return "map";
+            }
+
+            return "unknown";
+        }
+
+        MessagePackObject ReadMessagePack(uint8_t const* data, size_t size)
+        {
+            MessagePackReader reader(data, size);
+            return reader.readDocument();
+        }
+
+        bool IsMessagePack(uint8_t const* data, size_t size)
+        {
+            return size > 0 && ((data[0] & 0xf0) == 0x80 || data[0] == 0xde || data[0] == 0xdf);
+        }
+
+        MessagePackInput::MessagePackInput(MessagePackObject const& object)
+            : m_object(object),
+              m_state(&m_rootState)
+        {
+        }
+
+        MessagePackInput::MessagePackInput(MessagePackObject const& object, MessagePackInput & parent, std::string key)
+            : m_object(object),
+              m_parent(&parent),
+              m_key(std::move(key)),
+              m_state(parent.m_state)
+        {
+        }
+
+        void MessagePackInput::setError(std::string const& msg)
+        {
+            if(error())
+                return;
+
+            m_state->error = concatenate(path(), ": ", msg);
+        }
+
+        bool MessagePackInput::expect(MessagePackObject::Type type)
+        {
+            if(m_object.type == type)
+                return true;
+
+            MessagePackObject expected;
+            expected.type = type;
+            setError(concatenate("expected ", expected.typeName(), ", found ", m_object.typeName()));
+            return false;
+        }
+
+        std::string MessagePackInput::path() const
+        {
+            if(m_parent == nullptr)
+                return "<root>";
+
+            return concatenate(m_parent->path(), "/", m_key);
+        }
+
+        void MessagePackInput::readScalar(bool & value)
+        {
+            if(m_object.type == MessagePackObject::Type::Bool)
+                value = m_object.boolValue;
+            else
+                setError(concatenate("expected a bool, found ", m_object.typeName()));
+        }
+
+        void MessagePackInput::readScalar(std::string & value)
+        {
+            // Scalars in YAML libraries can always be read as strings, e.g. info values.
+            switch(m_object.type)
+            {
+                case MessagePackObject::Type::String: value = m_object.stringValue; break;
+                case MessagePackObject::Type::Nil:    value = "null"; break;
+                case MessagePackObject::Type::Bool:   value = m_object.boolValue ? "true" : "false"; break;
+                case MessagePackObject::Type::Int:    value = std::to_string(m_object.intValue); break;
+                case MessagePackObject::Type::UInt:   value = std::to_string(m_object.uintValue); break;
+                case MessagePackObject::Type::Float:  value = concatenate(m_object.floatValue); break;
+                default:
+                    setError(concatenate("expected a string, found ", m_object.typeName()));
+            }
+        }
+    }
+}
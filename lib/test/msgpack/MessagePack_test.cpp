@@ -0,0 +1,144 @@
+/*******************************************************************************
+ *
+ * MIT License
+ *
+ * Copyright (c) 2019 Advanced Micro Devices, Inc.
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in all
+ * copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+ * SOFTWARE.
+ *
+ *******************************************************************************/
+
+#include <gtest/gtest.h>
+
+#include <Tensile/Tensile.hpp>
+#include <Tensile/ContractionLibrary.hpp>
+#include <Tensile/AMDGPU.hpp>
+#include <Tensile/msgpack/Loading.hpp>
+#include <Tensile/Serialization/MessagePack.hpp>
+#include <TestUtils.hpp>
+
+#include "TestData.hpp"
+
+#include <chrono>
+#include <iostream>
+
+using namespace Tensile;
+using Serialization::MessagePackObject;
+
+TEST(MessagePackTest, ReadScalars)
+{
+    // {"a": [1, -1, 300, 1.5, true, nil], 7: "xyz"}
+    std::vector<uint8_t> data = {0x82,
+                                 0xa1, 'a',
+                                 0x96, 0x01, 0xff, 0xcd, 0x01, 0x2c,
+                                       0xcb, 0x3f, 0xf8, 0, 0, 0, 0, 0, 0,
+                                       0xc3, 0xc0,
+                                 0x07, 0xa3, 'x', 'y', 'z'};
+
+    ASSERT_TRUE(Serialization::IsMessagePack(data.data(), data.size()));
+
+    auto obj = Serialization::ReadMessagePack(data.data(), data.size());
+    ASSERT_EQ(obj.type, MessagePackObject::Type::Map);
+    ASSERT_EQ(obj.keys, std::vector<std::string>({"a", "7"}));
+
+    auto const& a = obj.elements[0].elements;
+    ASSERT_EQ(a.size(), 6u);
+    EXPECT_EQ(a[0].uintValue, 1u);
+    EXPECT_EQ(a[1].intValue, -1);
+    EXPECT_EQ(a[2].uintValue, 300u);
+    EXPECT_EQ(a[3].floatValue, 1.5);
+    EXPECT_EQ(a[4].boolValue, true);
+    EXPECT_EQ(a[5].type, MessagePackObject::Type::Nil);
+
+    EXPECT_EQ(obj.elements[1].stringValue, "xyz");
+
+    data.pop_back();
+    EXPECT_THROW(Serialization::ReadMessagePack(data.data(), data.size()), std::runtime_error);
+}
+
+TEST(MessagePackTest, NotYAML)
+{
+    std::string yaml = "---\nsolutions: []\n";
+    EXPECT_FALSE(Serialization::IsMessagePack(reinterpret_cast<uint8_t const*>(yaml.data()), yaml.size()));
+    EXPECT_FALSE(IsMessagePackLibraryFile(TestData::File("KernelsLite.yaml").native()));
+}
+
+TEST(MessagePackTest, LoadErrors)
+{
+    // {"solutions": 1}
+    std::vector<uint8_t> data = {0x81, 0xa9, 's', 'o', 'l', 'u', 't', 'i', 'o', 'n', 's', 0x01};
+
+    try
+    {
+        MessagePackLoadLibraryData<ContractionProblem, ContractionSolution>(data);
+        FAIL() << "Expected an error.";
+    }
+    catch(std::runtime_error const& exc)
+    {
+        EXPECT_EQ(std::string(exc.what()), "<root>/solutions: expected array, found integer");
+    }
+}
+
+#ifdef TENSILE_DEFAULT_SERIALIZATION
+class LibraryFormatTest: public ::testing::TestWithParam<std::string>
+{
+};
+
+TEST_P(LibraryFormatTest, SameAsYAML)
+{
+    auto datFile = TestData::File(GetParam() + ".dat");
+    if(!boost::filesystem::exists(datFile))
+    {
+        std::cout << "Skipping: " << datFile << " wasn't generated." << std::endl;
+        return;
+    }
+
+    ASSERT_TRUE(IsMessagePackLibraryFile(datFile.native()));
+
+    auto start = std::chrono::steady_clock::now();
+    auto yamlLibrary = LoadLibraryFile<ContractionProblem>(TestData::File(GetParam() + ".yaml").native());
+    auto middle = std::chrono::steady_clock::now();
+    auto datLibrary = LoadLibraryFile<ContractionProblem>(datFile.native());
+    auto end = std::chrono::steady_clock::now();
+
+    ASSERT_NE(yamlLibrary, nullptr);
+    ASSERT_NE(datLibrary, nullptr);
+
+    std::cout << GetParam() << ": YAML "
+              << std::chrono::duration<double, std::milli>(middle - start).count() << " ms, MessagePack "
+              << std::chrono::duration<double, std::milli>(end - middle).count() << " ms" << std::endl;
+
+    AMDGPU hardware(AMDGPU::Processor::gfx900, 64, "Vega 10");
+
+    for(int i = 0; i < 1000; i++)
+    {
+        auto problem = RandomGEMM();
+
+        auto yamlSolution = yamlLibrary->findBestSolution(problem, hardware);
+        auto datSolution = datLibrary->findBestSolution(problem, hardware);
+
+        ASSERT_EQ(yamlSolution == nullptr, datSolution == nullptr);
+        if(yamlSolution)
+            EXPECT_EQ(yamlSolution->name(), datSolution->name());
+    }
+}
+
+INSTANTIATE_TEST_CASE_P(MessagePackTest, LibraryFormatTest,
+                        ::testing::Values("KernelsLite", "KernelsLiteMixed", "SampleTensileKernels"));
+#endif